@@ -24,6 +24,16 @@ class Settings:
         os.getenv("SQLALCHEMY_DATABASE_URI", "sqlite:///instance/portfolio_pro.db"),
     )
 
+    # Contenu : surveillance en tâche de fond (off | poll | watchdog)
+    CONTENT_WATCH_MODE: str = os.getenv("CONTENT_WATCH_MODE", "off").strip().lower()
+    CONTENT_WATCH_INTERVAL: float = float(os.getenv("CONTENT_WATCH_INTERVAL", "2.0"))
+    # Snapshot binaire précompilé (python -m backend.data.snapshot build) ; vide = désactivé
+    CONTENT_SNAPSHOT_PATH: str = os.getenv("CONTENT_SNAPSHOT_PATH", "").strip()
+    # Préchauffage parallèle du Markdown au démarrage : nombre de processus, "auto" ou 0 (désactivé)
+    CONTENT_WARMUP_WORKERS: str = os.getenv("CONTENT_WARMUP_WORKERS", "0").strip()
+    # Réponses articles pré-rendues (python -m backend.data.prerender build) ; vide = désactivé
+    CONTENT_PRERENDER_DIR: str = os.getenv("CONTENT_PRERENDER_DIR", "").strip()
+
     # CORS
     CORS_ORIGINS: str = os.getenv("CORS_ORIGINS", "http://localhost:3000")
     CORS_ORIGINS_LIST: list = None  # rempli à la demande
@@ -31,7 +41,28 @@ class Settings:
     # Rate limiting (FastAPI)
     RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
     RATE_LIMIT_STORAGE_URL: str = os.getenv("RATE_LIMIT_STORAGE_URL", os.getenv("REDIS_URL", "memory://"))
-
+    # Backend mémoire : nombre max de compteurs par worker (éviction LRU au-delà)
+    RATE_LIMIT_MEMORY_MAX_ENTRIES: int = int(os.getenv("RATE_LIMIT_MEMORY_MAX_ENTRIES", "100000"))
+    # Backend Redis : "script" (un EVALSHA pour tous les tiers) ou "pipeline"
+    RATE_LIMIT_REDIS_MODE: str = os.getenv("RATE_LIMIT_REDIS_MODE", "script").strip().lower()
+    # Client redis.asyncio (pool partagé) dans le middleware ; délai max avant repli
+    RATE_LIMIT_REDIS_ASYNC: bool = os.getenv("RATE_LIMIT_REDIS_ASYNC", "true").lower() in ("1", "true", "yes")
+    RATE_LIMIT_REDIS_TIMEOUT_MS: int = int(os.getenv("RATE_LIMIT_REDIS_TIMEOUT_MS", "50"))
+    RATE_LIMIT_REDIS_MAX_CONNECTIONS: int = int(os.getenv("RATE_LIMIT_REDIS_MAX_CONNECTIONS", "50"))
+    # Repli si Redis ne répond pas à temps : true = laisser passer, false = 429
+    RATE_LIMIT_FAIL_OPEN: bool = os.getenv("RATE_LIMIT_FAIL_OPEN", "true").lower() in ("1", "true", "yes")
+
+    # Algorithme par défaut (fixed | sliding | gcra), surchargeable par tier (RATE_LIMIT_<TIER>_ALGORITHM)
+    RATE_LIMIT_ALGORITHM: str = os.getenv("RATE_LIMIT_ALGORITHM", "fixed")
+    RATE_LIMIT_GLOBAL_ALGORITHM: str = os.getenv("RATE_LIMIT_GLOBAL_ALGORITHM", "")
+    RATE_LIMIT_IP_ALGORITHM: str = os.getenv("RATE_LIMIT_IP_ALGORITHM", "")
+    RATE_LIMIT_SEARCH_ALGORITHM: str = os.getenv("RATE_LIMIT_SEARCH_ALGORITHM", "")
+    RATE_LIMIT_CHAT_ALGORITHM: str = os.getenv("RATE_LIMIT_CHAT_ALGORITHM", "")
+    RATE_LIMIT_UPLOAD_ALGORITHM: str = os.getenv("RATE_LIMIT_UPLOAD_ALGORITHM", "")
+
+    # Tier global : compteur réparti sur N clés, réservé par blocs de K unités par worker (1 = désactivé)
+    RATE_LIMIT_GLOBAL_SHARDS: int = int(os.getenv("RATE_LIMIT_GLOBAL_SHARDS", "1"))
+    RATE_LIMIT_GLOBAL_LEASE: int = int(os.getenv("RATE_LIMIT_GLOBAL_LEASE", "1"))
     RATE_LIMIT_GLOBAL_REQUESTS: int = int(os.getenv("RATE_LIMIT_GLOBAL_REQUESTS", "1000"))
     RATE_LIMIT_GLOBAL_WINDOW: int = int(os.getenv("RATE_LIMIT_GLOBAL_WINDOW", "3600"))
     RATE_LIMIT_GLOBAL_BURST: int = int(os.getenv("RATE_LIMIT_GLOBAL_BURST", "100"))
@@ -55,7 +86,7 @@ class Settings:
     RATE_LIMIT_CHAT_PATHS: str = os.getenv("RATE_LIMIT_CHAT_PATHS", "/api/chat,/api/v1/chat")
     RATE_LIMIT_SEARCH_PATHS: str = os.getenv(
         "RATE_LIMIT_SEARCH_PATHS",
-        "/api/search,/api/eval,/api/v1/articles,/api/v1/projects,/api/v1/experiences",
+        "/api/search,/api/eval,/api/v1/search,/api/v1/articles,/api/v1/projects,/api/v1/experiences",
     )
     RATE_LIMIT_UPLOAD_PATHS: str = os.getenv("RATE_LIMIT_UPLOAD_PATHS", "/api/ingest,/api/ingest-batch,/api/upload")
 
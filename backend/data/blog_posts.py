@@ -3,6 +3,14 @@ Découverte et parsing des articles Markdown sous backend/public (posts/ et blog
 """
 from __future__ import annotations
 
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping
+from itertools import chain
 from pathlib import Path
 from typing import Any
 
@@ -16,6 +24,18 @@ try:
 except ImportError:
     markdown = None  # type: ignore
 
+try:
+    from markdown_it import MarkdownIt
+except ImportError:
+    MarkdownIt = None  # type: ignore
+
+try:
+    import mistune
+except ImportError:
+    mistune = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
 _BACKEND_DIR = Path(__file__).resolve().parent.parent
 _PUBLIC_DIR = _BACKEND_DIR / "public"
 
@@ -36,8 +56,12 @@ def _str_list(values: Any) -> list[str]:
 
 
 def _excerpt_from_body(body: str, max_len: int = 280) -> str:
-    text = body.replace("\r\n", "\n").strip()
-    for line in text.split("\n"):
+    return _excerpt_from_lines(body.replace("\r\n", "\n").split("\n"), max_len)
+
+
+def _excerpt_from_lines(lines: Iterable[str], max_len: int = 280) -> str:
+    """Premier paragraphe hors titres et clôtures de code ; n'itère pas au-delà."""
+    for line in lines:
         s = line.strip()
         if not s or s.startswith("#") or s.startswith("```"):
             continue
@@ -68,6 +92,63 @@ def _split_front_matter(raw: str) -> tuple[dict[str, Any], str]:
     return fm, body
 
 
+_BOM = b"\xef\xbb\xbf"
+
+
+def _decode(data: bytes) -> str:
+    # Mêmes fins de ligne que path.read_text() (newlines universels).
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def read_front_matter(path: Path) -> tuple[dict[str, Any], str | None, int, int] | None:
+    """
+    Lecture en flux pour les listings : s'arrête au `---` fermant, puis (si le front matter
+    n'a ni excerpt ni description) au premier paragraphe du corps. Même résultat que
+    _split_front_matter sur le fichier entier.
+
+    Retourne (front matter, extrait du corps ou None si inutile, offset en octets du corps
+    (0 : pas de front matter, le fichier entier est le corps), mtime_ns du fichier lu).
+    """
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return None
+    with f:
+        mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+        first = f.readline()
+        head = first
+        while head.startswith(_BOM):
+            head = head[len(_BOM):]
+        fm: dict[str, Any] = {}
+        offset = 0
+        lines: Iterable[bytes] | None = None
+        if head.startswith(b"---") and yaml:
+            pos = len(first)
+            fm_lines = [head[3:]]
+            for line in f:
+                if line.startswith(b"---"):
+                    offset = pos + 3
+                    lines = chain([line[3:]], f)
+                    break
+                fm_lines.append(line)
+                pos += len(line)
+        if lines is None:
+            # Pas de front matter exploitable : le corps est le fichier entier.
+            f.seek(0)
+            lines = f
+        else:
+            try:
+                fm = yaml.safe_load(_decode(b"".join(fm_lines))) or {}
+            except Exception:
+                fm = {}
+            if not isinstance(fm, dict):
+                fm = {}
+        excerpt = None
+        if not (fm.get("excerpt") or fm.get("description")):
+            excerpt = _excerpt_from_lines(part for line in lines for part in _decode(line).split("\n"))
+    return fm, excerpt, offset, mtime_ns
+
+
 def _lang_from_filename(path: Path) -> str:
     stem = path.stem
     return "en" if stem.endswith(".en") else "fr"
@@ -80,9 +161,10 @@ def _slug_from_path(path: Path) -> str:
     return stem
 
 
-def iter_markdown_post_files() -> list[Path]:
+def _iter_post_files() -> list[tuple[Path, Path]]:
+    """(chemin, chemin résolu) de chaque post, dédupliqués par chemin résolu."""
     seen: set[Path] = set()
-    out: list[Path] = []
+    out: list[tuple[Path, Path]] = []
     for root in POSTS_ROOTS:
         if not root.is_dir():
             continue
@@ -91,34 +173,52 @@ def iter_markdown_post_files() -> list[Path]:
             if rp in seen:
                 continue
             seen.add(rp)
-            out.append(p)
+            out.append((p, rp))
     return out
 
 
-def posts_tree_fingerprint() -> int:
-    """Fingerprint pour invalider le cache quand un fichier change."""
-    total = 0
-    for p in iter_markdown_post_files():
+def iter_markdown_post_files() -> list[Path]:
+    return [p for p, _rp in _iter_post_files()]
+
+
+def scan_posts_tree() -> tuple[int, dict[str, int]]:
+    """
+    Un stat par fichier : (fingerprint de l'arbre, mtime_ns par chemin résolu, i.e. par
+    `_md_path`). Le watcher publie les deux ; les requêtes n'ont alors plus à stat les posts.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    mtimes: dict[str, int] = {}
+    for p, rp in _iter_post_files():
         try:
-            total += p.stat().st_mtime_ns
+            st = p.stat()
         except OSError:
-            pass
-    return total
+            continue
+        digest.update(f"{p}\0{st.st_mtime_ns}\0{st.st_size}\n".encode("utf-8", "surrogateescape"))
+        mtimes[str(rp)] = st.st_mtime_ns
+    # Stable d'un processus à l'autre (contrairement à hash()) : sert aussi aux ETags.
+    return int.from_bytes(digest.digest(), "big"), mtimes
+
+
+def posts_tree_fingerprint() -> int:
+    """
+    Fingerprint pour invalider le cache quand un fichier change, est ajouté, supprimé
+    ou renommé (chemin, mtime_ns et taille de chaque fichier).
+    """
+    return scan_posts_tree()[0]
 
 
 def parse_markdown_article(path: Path) -> dict[str, Any] | None:
-    try:
-        raw = path.read_text(encoding="utf-8")
-    except OSError:
+    head = read_front_matter(path)
+    if head is None:
         return None
-    fm, body = _split_front_matter(raw)
+    fm, body_excerpt, body_offset, mtime_ns = head
     slug = _slug_from_path(path)
     title = fm.get("title") or slug.replace("-", " ").title()
     categories = _str_list(fm.get("categories"))
     if not categories and fm.get("category") is not None:
         categories = _str_list([fm.get("category")])
     tags = _str_list(fm.get("tags"))
-    excerpt = fm.get("excerpt") or fm.get("description") or _excerpt_from_body(body)
+    excerpt = fm.get("excerpt") or fm.get("description") or body_excerpt
     excerpt = str(excerpt).strip() if excerpt else None
     date_val = fm.get("date")
     date_str = str(date_val) if date_val is not None else None
@@ -139,34 +239,232 @@ def parse_markdown_article(path: Path) -> dict[str, Any] | None:
         "lang": _lang_from_filename(path),
         "source": "markdown",
         "_md_path": str(path.resolve()),
+        "_md_mtime_ns": mtime_ns,
+        "_body_offset": body_offset,
     }
 
 
+_MARKDOWN_EXTENSIONS = ["fenced_code", "tables", "nl2br"]
+
+
+def _new_python_markdown() -> Callable[[str], str]:
+    md = markdown.Markdown(extensions=_MARKDOWN_EXTENSIONS, output_format="html")
+    # reset() entre deux documents : l'instance (et ses extensions chargées) est réutilisée.
+    return lambda body: md.reset().convert(body)
+
+
+def _new_markdown_it() -> Callable[[str], str]:
+    # CommonMark + tables ; breaks=True équivaut à l'extension nl2br.
+    md = MarkdownIt("commonmark", {"breaks": True, "html": True}).enable("table")
+    return md.render
+
+
+def _new_mistune() -> Callable[[str], str]:
+    return mistune.create_markdown(escape=False, hard_wrap=True, plugins=["table"])
+
+
+# Moteur -> (disponible, fabrique d'un moteur de rendu)
+MARKDOWN_ENGINES: dict[str, tuple[bool, Callable[[], Callable[[str], str]]]] = {
+    "markdown": (markdown is not None, _new_python_markdown),
+    "markdown-it": (MarkdownIt is not None, _new_markdown_it),
+    "mistune": (mistune is not None, _new_mistune),
+}
+
+# Moteur actif ; une instance par thread (aucune n'est thread-safe), recréée si le moteur change.
+_RENDERER: dict[str, Any] = {"engine": "markdown"}
+_THREAD_RENDERERS = threading.local()
+
+
+def available_markdown_engines() -> list[str]:
+    return [name for name, (ok, _factory) in MARKDOWN_ENGINES.items() if ok]
+
+
+def set_markdown_engine(name: str | None) -> str:
+    """
+    Sélectionne le moteur de rendu ("markdown" par défaut). Un moteur inconnu ou non
+    installé retombe sur "markdown". Vide le cache HTML. Retourne le moteur effectif.
+    """
+    engine = (name or "markdown").strip().lower()
+    if engine not in MARKDOWN_ENGINES or not MARKDOWN_ENGINES[engine][0]:
+        if engine != "markdown":
+            logger.warning("Moteur Markdown %r indisponible : repli sur 'markdown'", engine)
+        engine = "markdown"
+    if engine != _RENDERER["engine"]:
+        _RENDERER["engine"] = engine
+        _HTML_CACHE["current"].clear()
+    return engine
+
+
+def get_markdown_engine() -> str:
+    return _RENDERER["engine"]
+
+
+def _thread_renderer(engine: str) -> Callable[[str], str]:
+    cached = getattr(_THREAD_RENDERERS, "renderer", None)
+    if cached is None or cached[0] != engine:
+        cached = (engine, MARKDOWN_ENGINES[engine][1]())
+        _THREAD_RENDERERS.renderer = cached
+    return cached[1]
+
+
 def markdown_body_to_html(body: str) -> str:
-    if not markdown:
+    engine = _RENDERER["engine"]
+    if not MARKDOWN_ENGINES[engine][0]:
         escaped = body.replace("&", "&amp;").replace("<", "&lt;")
         return f"<pre>{escaped}</pre>"
-    return markdown.markdown(
-        body,
-        extensions=["fenced_code", "tables", "nl2br"],
-        output_format="html",
-    )
+    return _thread_renderer(engine)(body)
+
+
+def read_markdown_body(
+    path: Path, offset: int | None = None, mtime_ns: int | None = None
+) -> str | None:
+    """
+    Corps Markdown ; avec `offset` (voir read_front_matter), lecture directe depuis cet octet.
+    Avec `mtime_ns`, l'offset n'est suivi que si le fichier ouvert a toujours ce mtime.
+    """
+    try:
+        with open(path, "rb") as f:
+            if offset is not None and mtime_ns is not None and os.fstat(f.fileno()).st_mtime_ns != mtime_ns:
+                offset = None  # modifié depuis le parsing : relecture complète
+            if offset is not None:
+                f.seek(offset)
+            data = f.read()
+    except OSError:
+        return None
+    text = _decode(data)
+    if offset is None:
+        _fm, body = _split_front_matter(text)
+        return body
+    return text.lstrip("\n") if offset else text
+
+
+def _row_body(row: Mapping[str, Any], mtime_ns: int) -> str | None:
+    # L'offset n'est fiable que pour la version du fichier qui a été parsée ; un mtime publié
+    # par le watcher peut précéder une modification, d'où la revérification à l'ouverture.
+    offset = row.get("_body_offset") if row.get("_md_mtime_ns") == mtime_ns else None
+    return read_markdown_body(Path(row["_md_path"]), offset, mtime_ns)
 
 
-def read_markdown_body(path: Path) -> str | None:
+def _md_mtime_ns(path_str: str) -> int | None:
+    """mtime_ns d'un post : celui relevé par le watcher s'il est actif, sinon os.stat."""
+    from backend.data.loader import watched_md_mtime_ns
+
+    mtime_ns = watched_md_mtime_ns(path_str)
+    if mtime_ns is not None:
+        return mtime_ns
     try:
-        raw = path.read_text(encoding="utf-8")
+        return os.stat(path_str).st_mtime_ns
     except OSError:
         return None
-    _fm, body = _split_front_matter(raw)
-    return body
 
 
-def html_for_article_row(row: dict[str, Any]) -> str:
+def read_article_body(row: Mapping[str, Any]) -> str | None:
+    """Corps Markdown d'une ligne d'article (seek direct si le fichier n'a pas changé)."""
+    path_str = row.get("_md_path")
+    if not path_str:
+        return None
+    mtime_ns = _md_mtime_ns(path_str)
+    if mtime_ns is None:
+        return None
+    return _row_body(row, mtime_ns)
+
+
+class RenderedHtmlCache:
+    """
+    LRU du HTML rendu, borné en octets, par chemin et validé par mtime_ns : une entrée
+    dont le fichier a changé est un miss et est remplacée. Corps stockés en UTF-8,
+    ou compressés en gzip (`compress=True`) pour réduire la mémoire résidente.
+    """
+
+    def __init__(self, max_bytes: int, compress: bool = False) -> None:
+        self.max_bytes = max(int(max_bytes), 0)
+        self.compress = compress
+        self._entries: OrderedDict[str, tuple[int, bytes]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, path: str, mtime_ns: int) -> str | None:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != mtime_ns:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(path)
+            self._counters["hits"] += 1
+            blob = entry[1]
+        return (gzip.decompress(blob) if self.compress else blob).decode("utf-8")
+
+    def put(self, path: str, mtime_ns: int, html: str) -> None:
+        blob = html.encode("utf-8")
+        if self.compress:
+            blob = gzip.compress(blob, compresslevel=6, mtime=0)
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+            self._entries[path] = (mtime_ns, blob)
+            self._bytes += len(blob)
+            while self._bytes > self.max_bytes:
+                _path, (_mtime, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "compress": self.compress,
+            }
+
+
+def _env_html_cache() -> RenderedHtmlCache:
+    max_bytes = int(os.getenv("CONTENT_HTML_CACHE_BYTES", str(16 * 1024 * 1024)))
+    compress = os.getenv("CONTENT_HTML_CACHE_GZIP", "false").strip().lower() in {"1", "true", "yes", "on"}
+    return RenderedHtmlCache(max_bytes, compress=compress)
+
+
+_HTML_CACHE: dict[str, RenderedHtmlCache] = {"current": _env_html_cache()}
+
+
+def configure_html_cache(max_bytes: int, compress: bool = False) -> RenderedHtmlCache:
+    """Remplace le cache HTML (taille 0 : désactivé)."""
+    cache = RenderedHtmlCache(max_bytes, compress=compress)
+    _HTML_CACHE["current"] = cache
+    return cache
+
+
+def html_cache_stats() -> dict[str, Any]:
+    return _HTML_CACHE["current"].stats()
+
+
+def html_for_article_row(row: Mapping[str, Any]) -> str:
     path_str = row.get("_md_path")
     if not path_str:
         return ""
-    body = read_markdown_body(Path(path_str))
+    mtime_ns = _md_mtime_ns(path_str)
+    if mtime_ns is None:
+        return ""
+    cache = _HTML_CACHE["current"]
+    html = cache.get(path_str, mtime_ns)
+    if html is not None:
+        return html
+    body = _row_body(row, mtime_ns)
     if body is None:
         return ""
-    return markdown_body_to_html(body)
+    html = markdown_body_to_html(body)
+    cache.put(path_str, mtime_ns, html)
+    return html
+
+
+set_markdown_engine(os.getenv("CONTENT_MARKDOWN_ENGINE"))
@@ -2,15 +2,30 @@
 Charge les données YAML pour servir l'API FastAPI sans dépendance DB.
 Priorité aux données canoniques dans backend/data.
 """
+from bisect import bisect_left, insort
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from contextvars import ContextVar
+from functools import cmp_to_key
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
+import base64
+import hashlib
+import json
+import logging
 import os
+import re
+import threading
+import time
+import unicodedata
 
 try:
     import yaml
 except ImportError:
     yaml = None  # type: ignore
 
+logger = logging.getLogger(__name__)
+
 # Chemins possibles pour les YAML (ordre de priorité : ceux avec articles.yml ou projects.yml)
 _BACKEND_DIR = Path(__file__).resolve().parent.parent
 _REPO_ROOT = _BACKEND_DIR.parent
@@ -23,18 +38,151 @@ _DATA_DIRS = [
     _REPO_ROOT / "backend_old" / "data",
 ]
 
-# Cache mémoire simple: path -> (mtime_ns, parsed_rows)
-_YAML_CACHE: dict[str, tuple[int, list[dict[str, Any]]]] = {}
+# Cache mémoire simple: path -> (mtime_ns, parsed_rows) ; les lignes ne sont jamais mutées
+_YAML_CACHE: dict[str, tuple[int, tuple[dict[str, Any], ...]]] = {}
+
+# Index inversé vide (tag/catégorie/langue -> positions triées + texte de recherche normalisé)
+_EMPTY_ARTICLE_INDEX: dict[str, Any] = {
+    "tag": {}, "category": {}, "lang": {}, "year": {}, "labels": {"tag": {}, "category": {}},
+    "search": (), "slug": {}, "permalink": {},
+}
+
+# Articles fusionnés (YAML + Markdown), invalidé par mtime articles.yml + arborescence posts.
+# "snapshot" = (lignes immuables triées, index) : remplacé d'un bloc, partageable entre threads.
+_MERGED_ARTICLES: dict[str, Any] = {"fp": None, "snapshot": ((), _EMPTY_ARTICLE_INDEX)}
+
+# Facettes par snapshot : "rows" = snapshot de référence, "entries" = filtres normalisés -> facettes
+_FACETS_CACHE: dict[str, Any] = {"rows": None, "entries": {}}
+_FACETS_CACHE_MAX = 256
+
+# Cache de parsing Markdown : chemin résolu -> ((mtime_ns, taille), ligne figée ou None)
+_MD_PARSE_CACHE: dict[str, tuple[tuple[int, int], Mapping[str, Any] | None]] = {}
+
+# Dernière liste fusionnée triée (sans id), base des reconstructions incrémentales
+_MERGE_STATE: dict[str, Any] = {"yaml_key": None, "seen_perm": set(), "rows": None, "stats": {}}
+
+# Collections YAML normalisées et immuables (projets, expériences) : fichier -> snapshot indexé
+_COLLECTIONS: dict[str, dict[str, Any]] = {}
 
-# Articles fusionnés (YAML + Markdown), invalidé par mtime articles.yml + arborescence posts
-_MERGED_ARTICLES: dict[str, Any] = {"fp": None, "rows": []}
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+# Snapshot binaire précompilé (backend/data/snapshot.py) : quand actif, seule source servie
+_COMPILED: dict[str, Any] = {"active": None}
+
+# Fichiers YAML dont le mtime participe aux fingerprints
+_WATCHED_FILES = ("articles.yml", "projects.yml", "experiences.yml")
+
+# Mode watcher (backend/data/watcher.py) : état disque publié par un thread de fond.
+# Quand "state" est renseigné, le chemin de requête ne fait aucun appel au système de fichiers.
+_WATCHED: dict[str, Any] = {"state": None}
+
+# Fingerprint articles épinglé pour la requête en cours (dépendance ETag de l'API) : la version
+# annoncée et le snapshot servi reposent sur un seul parcours de l'arborescence des posts.
+_PINNED_ARTICLES_FP: ContextVar[tuple[int, int] | None] = ContextVar("pinned_articles_fp", default=None)
+
+# Portées de content_version : fichiers YAML seuls, sans les articles
+_VERSION_SCOPES = {"projects": "projects.yml", "experiences": "experiences.yml"}
 
 
 def _env_true(name: str, default: str = "false") -> bool:
     return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "on"}
 
 
+class _SingleFlight:
+    """
+    Reconstruction « single-flight » d'une valeur en cache invalidée par fingerprint :
+    un seul thread reconstruit, les autres servent l'ancienne valeur (stale-while-revalidate).
+    Sans valeur précédente, les appelants attendent la première construction.
+    Avec CONTENT_BACKGROUND_REFRESH=true, la reconstruction part dans un thread de fond
+    et même le thread qui la déclenche sert l'ancienne valeur.
+    """
+
+    registry: dict[str, "_SingleFlight"] = {}
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self.metrics: dict[str, Any] = {
+            "rebuilds": 0,
+            "rebuild_seconds_total": 0.0,
+            "last_rebuild_seconds": 0.0,
+            "stale_serves": 0,
+            "errors": 0,
+        }
+        _SingleFlight.registry[name] = self
+
+    def get(self, cache: dict[str, Any], key: str, fp: Any, build: Callable[[], Any]) -> Any:
+        if cache["fp"] == fp:
+            return cache[key]
+        if cache["fp"] is None:
+            with self._lock:
+                return self._rebuild(cache, key, fp, build)
+        if not self._lock.acquire(blocking=False):
+            self._count_stale()
+            return cache[key]
+        if _env_true("CONTENT_BACKGROUND_REFRESH"):
+            # Le verrou est relâché par le thread de fond à la fin de la reconstruction.
+            threading.Thread(
+                target=self._rebuild_in_background,
+                args=(cache, key, fp, build),
+                name=f"refresh-{self.name}",
+                daemon=True,
+            ).start()
+            self._count_stale()
+            return cache[key]
+        try:
+            return self._rebuild(cache, key, fp, build)
+        finally:
+            self._lock.release()
+
+    def _count_stale(self) -> None:
+        with self._metrics_lock:
+            self.metrics["stale_serves"] += 1
+
+    def _rebuild(self, cache: dict[str, Any], key: str, fp: Any, build: Callable[[], Any]) -> Any:
+        if cache["fp"] == fp:
+            return cache[key]
+        started = time.perf_counter()
+        try:
+            value = build()
+        except Exception:
+            self.metrics["errors"] += 1
+            raise
+        elapsed = time.perf_counter() - started
+        cache[key] = value
+        cache["fp"] = fp
+        self.metrics["rebuilds"] += 1
+        self.metrics["last_rebuild_seconds"] = round(elapsed, 6)
+        self.metrics["rebuild_seconds_total"] = round(self.metrics["rebuild_seconds_total"] + elapsed, 6)
+        return value
+
+    def _rebuild_in_background(self, cache: dict[str, Any], key: str, fp: Any, build: Callable[[], Any]) -> None:
+        try:
+            self._rebuild(cache, key, fp, build)
+        except Exception:
+            logger.exception("Échec de la reconstruction en tâche de fond (%s)", self.name)
+        finally:
+            self._lock.release()
+
+
+def get_refresh_metrics() -> dict[str, dict[str, Any]]:
+    """Durées de reconstruction et nombre de réponses servies depuis un snapshot périmé."""
+    return {name: dict(flight.metrics) for name, flight in _SingleFlight.registry.items()}
+
+
+_ARTICLES_FLIGHT = _SingleFlight("articles")
+
+
 def _data_dir() -> Path:
+    """Dossier data/ actif : celui publié par le watcher, sinon résolu sur disque."""
+    state = _WATCHED["state"]
+    if state is not None:
+        return state["data_dir"]
+    return _scan_data_dir()
+
+
+def _scan_data_dir() -> Path:
     """Premier dossier data/ existant (priorité aux dossiers contenant articles.yml ou projects.yml)."""
     forced = os.getenv("BACKEND_DATA_DIR")
     if forced:
@@ -66,60 +214,146 @@ def _load_yaml(path: Path) -> list[dict[str, Any]]:
         return []
 
 
-def _load_yaml_cached(path: Path) -> list[dict[str, Any]]:
+def _load_yaml_cached(path: Path) -> Sequence[dict[str, Any]]:
     """
     Retourne le YAML depuis un cache en mémoire invalidé par mtime.
     Réduit les lectures disque répétées sur les endpoints liste + détail.
+    Le tuple renvoyé est partagé (pas de copie) : les appelants le lisent sans le muter.
     """
     if not path.exists() or not yaml:
-        return []
+        return ()
     try:
         mtime_ns = path.stat().st_mtime_ns
     except OSError:
-        return []
+        return ()
 
     cache_key = str(path.resolve())
     cached = _YAML_CACHE.get(cache_key)
     if cached and cached[0] == mtime_ns:
-        # copie défensive pour éviter des mutations externes
-        return list(cached[1])
+        return cached[1]
 
-    rows = _load_yaml(path)
+    rows = tuple(_load_yaml(path))
     _YAML_CACHE[cache_key] = (mtime_ns, rows)
-    return list(rows)
+    return rows
 
 
 def clear_yaml_cache() -> None:
-    """Efface les caches YAML et articles fusionnés (utile en tests)."""
+    """Efface les caches YAML, Markdown, articles fusionnés et collections (utile en tests)."""
     _YAML_CACHE.clear()
     _MERGED_ARTICLES["fp"] = None
-    _MERGED_ARTICLES["rows"] = []
+    _MERGED_ARTICLES["snapshot"] = ((), _EMPTY_ARTICLE_INDEX)
+    _MD_PARSE_CACHE.clear()
+    _MERGE_STATE.update({"yaml_key": None, "seen_perm": set(), "rows": None, "stats": {}})
+    _COLLECTIONS.clear()
+    _FACETS_CACHE.update({"rows": None, "entries": {}})
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    return value
+
+
+def _public_item(item: Mapping[str, Any]) -> dict[str, Any]:
+    """Matérialise un item de snapshot immuable en dict JSON-compatible."""
+    return {k: _thaw(v) for k, v in item.items()}
+
+
+def _public_article_dict(row: Mapping[str, Any]) -> dict[str, Any]:
+    """Matérialise une ligne du snapshot en dict, sans les clés internes (préfixe _)."""
+    return {k: _thaw(v) for k, v in row.items() if not str(k).startswith("_")}
+
+
+def _file_mtime_ns(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
 
 
-def _public_article_dict(row: dict[str, Any]) -> dict[str, Any]:
-    """Retire les clés internes (préfixe _)."""
-    return {k: v for k, v in row.items() if not str(k).startswith("_")}
+def _yaml_mtime_ns(filename: str) -> tuple[Path, int]:
+    """(chemin, mtime_ns) d'un YAML du dossier data, lu depuis l'état du watcher si actif."""
+    state = _WATCHED["state"]
+    if state is not None:
+        return state["data_dir"] / filename, state["yaml_mtimes"].get(filename, 0)
+    path = _data_dir() / filename
+    return path, _file_mtime_ns(path)
 
 
 def _merged_articles_fingerprint() -> tuple[int, int]:
-    yml = _data_dir() / "articles.yml"
-    ym = 0
-    if yml.exists():
-        try:
-            ym = yml.stat().st_mtime_ns
-        except OSError:
-            pass
+    pinned = _PINNED_ARTICLES_FP.get()
+    if pinned is not None:
+        return pinned
+    state = _WATCHED["state"]
+    if state is not None:
+        return state["articles_fp"]
     from backend.data.blog_posts import posts_tree_fingerprint
 
-    return (ym, posts_tree_fingerprint())
+    return (_yaml_mtime_ns("articles.yml")[1], posts_tree_fingerprint())
+
+
+def scan_content_state() -> dict[str, Any]:
+    """Parcourt le disque une fois : dossier data, mtimes des YAML et des posts, fingerprint."""
+    from backend.data.blog_posts import scan_posts_tree
+
+    data_dir = _scan_data_dir()
+    mtimes = {name: _file_mtime_ns(data_dir / name) for name in _WATCHED_FILES}
+    posts_fp, md_mtimes = scan_posts_tree()
+    return {
+        "data_dir": data_dir,
+        "yaml_mtimes": mtimes,
+        "md_mtimes": md_mtimes,
+        "articles_fp": (mtimes["articles.yml"], posts_fp),
+    }
 
 
-def _build_merged_article_rows() -> list[dict[str, Any]]:
-    """Construit la liste triée des articles avec id stable (YAML puis Markdown)."""
-    from backend.data.blog_posts import iter_markdown_post_files, parse_markdown_article
+def watched_md_mtime_ns(path: str) -> int | None:
+    """mtime_ns d'un post (`_md_path`) relevé par le watcher, ou None sans watcher actif."""
+    state = _WATCHED["state"]
+    if state is None:
+        return None
+    return state["md_mtimes"].get(path)
+
+
+def published_content_state() -> Any:
+    """
+    État publié dont dépend content_version() (snapshot compilé, sinon état du watcher),
+    ou None quand la version ne s'obtient qu'en sondant le disque. Remplacé à chaque publication.
+    """
+    return _COMPILED["active"] or _WATCHED["state"]
+
 
-    path = _data_dir() / "articles.yml"
-    raw = _load_yaml_cached(path)
+def use_compiled_snapshot(compiled: dict[str, Any] | None) -> None:
+    """
+    Active un snapshot précompilé : {"articles": (rows, index), "collections": {fichier: snapshot},
+    "html": lecteur(span) -> str}. None : retour aux sources YAML/Markdown.
+    """
+    _COMPILED["active"] = compiled
+
+
+def set_watched_state(state: dict[str, Any] | None) -> bool:
+    """
+    Publie l'état calculé par le watcher (None : retour aux stats disque par requête).
+    Retourne True si l'état diffère du précédent, i.e. les snapshots deviennent obsolètes.
+    """
+    previous = _WATCHED["state"]
+    _WATCHED["state"] = state
+    return previous != state
+
+
+def _yaml_article_rows() -> tuple[list[dict[str, Any]], set[str]]:
+    """Lignes articles.yml dédupliquées (par permalink/titre) + permaliens déjà pris."""
+    raw = _load_yaml_cached(_data_dir() / "articles.yml")
     seen_perm: set[str] = set()
     yaml_rows: list[dict[str, Any]] = []
     for item in raw:
@@ -140,45 +374,233 @@ def _build_merged_article_rows() -> list[dict[str, Any]]:
             "slug": item.get("slug"),
             "lang": str(item.get("lang") or "fr").lower(),
             "source": "yaml",
+            "_yaml_index": len(yaml_rows),
         })
+    return yaml_rows, seen_perm
+
+
+def _sort_key(r: Mapping[str, Any]) -> tuple[str, str]:
+    return (str(r.get("date") or ""), str(r.get("title") or ""))
+
+
+def _merge_order(md_order: dict[str, int]) -> Callable[[Mapping[str, Any]], Any]:
+    """
+    Clé d'insertion équivalente au tri complet : (date, titre) décroissants, puis ordre
+    d'origine (YAML d'abord, puis fichiers Markdown dans l'ordre de iter_markdown_post_files).
+    """
+
+    def origin(r: Mapping[str, Any]) -> tuple[int, int]:
+        if "_yaml_index" in r:
+            return (0, r["_yaml_index"])
+        return (1, md_order[r["_md_path"]])
+
+    def compare(a: Mapping[str, Any], b: Mapping[str, Any]) -> int:
+        ka, kb = _sort_key(a), _sort_key(b)
+        if ka != kb:
+            return -1 if ka > kb else 1
+        oa, ob = origin(a), origin(b)
+        return (oa > ob) - (oa < ob)
+
+    return cmp_to_key(compare)
+
+
+def _parse_markdown_cached(path: Path, stats: dict[str, int]) -> tuple[str, bool]:
+    """
+    Parse un fichier via le cache (chemin, mtime_ns, taille).
+    Retourne (clé du fichier, True si (re)parsé).
+    """
+    from backend.data.blog_posts import parse_markdown_article
+
+    key = str(path.resolve())
+    try:
+        st = path.stat()
+        sig = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        sig = (0, -1)
+    cached = _MD_PARSE_CACHE.get(key)
+    if cached is not None and cached[0] == sig:
+        stats["reused"] += 1
+        return key, False
+    row = parse_markdown_article(path)
+    _MD_PARSE_CACHE[key] = (sig, _freeze(row) if row else None)
+    stats["parsed"] += 1
+    return key, True
+
+
+def _build_merged_article_rows() -> tuple[Mapping[str, Any], ...]:
+    """
+    Construit la liste triée des articles avec id stable (YAML puis Markdown).
+
+    Seuls les fichiers Markdown ajoutés/modifiés sont (re)parsés ; si articles.yml n'a pas
+    changé, ils sont insérés dans la liste triée précédente au lieu de tout retrier.
+    Le résultat est identique à une reconstruction complète.
+    """
+    from backend.data.blog_posts import iter_markdown_post_files
 
-    md_rows: list[dict[str, Any]] = []
+    stats = {"parsed": 0, "reused": 0}
+    yaml_key = _yaml_mtime_ns("articles.yml")
+    md_order: dict[str, int] = {}
+    changed: set[str] = set()
     for fp in iter_markdown_post_files():
-        row = parse_markdown_article(fp)
-        if not row:
-            continue
-        p = row.get("permalink")
-        if p and str(p) in seen_perm:
-            continue
-        md_rows.append(row)
+        key, reparsed = _parse_markdown_cached(fp, stats)
+        md_order[key] = len(md_order)
+        if reparsed:
+            changed.add(key)
+    for key in [k for k in _MD_PARSE_CACHE if k not in md_order]:
+        del _MD_PARSE_CACHE[key]
+
+    incremental = _MERGE_STATE["yaml_key"] == yaml_key and _MERGE_STATE["rows"] is not None
+    if incremental:
+        seen_perm = _MERGE_STATE["seen_perm"]
+        previous = _MERGE_STATE["rows"]
+        merged = [
+            r for r in previous
+            if "_yaml_index" in r or (r["_md_path"] in md_order and r["_md_path"] not in changed)
+        ]
+        order = _merge_order(md_order)
+        for key in sorted(changed, key=md_order.__getitem__):
+            row = _MD_PARSE_CACHE[key][1]
+            if row is None or (row.get("permalink") and str(row["permalink"]) in seen_perm):
+                continue
+            insort(merged, row, key=order)
+    else:
+        yaml_rows, seen_perm = _yaml_article_rows()
+        md_rows = []
+        for key in md_order:
+            row = _MD_PARSE_CACHE[key][1]
+            if row is None:
+                continue
+            p = row.get("permalink")
+            if p and str(p) in seen_perm:
+                continue
+            md_rows.append(row)
+        merged = [_freeze(r) for r in yaml_rows] + md_rows
+        merged.sort(key=_sort_key, reverse=True)
+
+    _MERGE_STATE.update({
+        "yaml_key": yaml_key,
+        "seen_perm": seen_perm,
+        "rows": merged,
+        "stats": {**stats, "mode": "incremental" if incremental else "full"},
+    })
+    return tuple(MappingProxyType({**r, "id": i + 1}) for i, r in enumerate(merged))
+
+
+def _article_year(r: Mapping[str, Any]) -> str | None:
+    year = str(r.get("date") or "")[:4]
+    return year if len(year) == 4 and year.isdigit() else None
+
+
+def _build_article_index(rows: Sequence[Mapping[str, Any]]) -> dict[str, Any]:
+    """
+    Listes de postings (positions croissantes dans `rows`) par tag, catégorie et langue,
+    le texte de recherche déjà normalisé pour le filtre `q`, et les index slug/permalink.
+    """
+    by_tag: dict[str, list[int]] = {}
+    by_category: dict[str, list[int]] = {}
+    by_lang: dict[str, list[int]] = {}
+    by_year: dict[str, list[int]] = {}
+    labels: dict[str, dict[str, str]] = {"tag": {}, "category": {}}
+    by_slug: dict[str, list[int]] = {}
+    by_permalink: dict[str, int] = {}
+    search: list[str] = []
+    for pos, r in enumerate(rows):
+        slug = str(r.get("slug") or "").lower()
+        if slug:
+            by_slug.setdefault(slug, []).append(pos)
+        if r.get("permalink"):
+            by_permalink.setdefault(str(r["permalink"]), pos)
+        # Libellé affiché = première graphie rencontrée (ordre du snapshot).
+        for t in r.get("tags") or []:
+            labels["tag"].setdefault(str(t).lower(), str(t))
+        for c in r.get("categories") or []:
+            labels["category"].setdefault(str(c).lower(), str(c))
+        tags = list(dict.fromkeys(str(t).lower() for t in (r.get("tags") or [])))
+        categories = list(dict.fromkeys(str(c).lower() for c in (r.get("categories") or [])))
+        for t in tags:
+            by_tag.setdefault(t, []).append(pos)
+        for c in categories:
+            by_category.setdefault(c, []).append(pos)
+        by_lang.setdefault(str(r.get("lang") or "fr").lower(), []).append(pos)
+        year = _article_year(r)
+        if year:
+            by_year.setdefault(year, []).append(pos)
+        fields = [
+            str(r.get(k) or "").lower() for k in ("title", "excerpt", "slug", "author")
+        ]
+        search.append(" ".join(fields + tags + categories))
+    return {
+        "tag": {k: tuple(v) for k, v in by_tag.items()},
+        "category": {k: tuple(v) for k, v in by_category.items()},
+        "lang": {k: tuple(v) for k, v in by_lang.items()},
+        "year": {k: tuple(v) for k, v in by_year.items()},
+        "labels": labels,
+        "search": tuple(search),
+        "slug": {k: tuple(v) for k, v in by_slug.items()},
+        "permalink": by_permalink,
+    }
 
-    combined = yaml_rows + md_rows
-    combined.sort(
-        key=lambda r: (str(r.get("date") or ""), str(r.get("title") or "")),
-        reverse=True,
+
+def _article_snapshot() -> tuple[tuple[Mapping[str, Any], ...], dict[str, Any]]:
+    """
+    Retourne (lignes triées en lecture seule, index inversé), reconstruits si le
+    fingerprint a changé. Aucune copie : le même snapshot est partagé par toutes les requêtes.
+    Pendant une reconstruction, les autres threads servent le snapshot précédent.
+    """
+    compiled = _COMPILED["active"]
+    if compiled is not None:
+        return compiled["articles"]
+    return _ARTICLES_FLIGHT.get(
+        _MERGED_ARTICLES, "snapshot", _merged_articles_fingerprint(), _build_article_snapshot
     )
-    for i, r in enumerate(combined):
-        r["id"] = i + 1
-    return combined
 
 
-def _all_article_rows() -> list[dict[str, Any]]:
-    fp = _merged_articles_fingerprint()
-    if _MERGED_ARTICLES["fp"] == fp:
-        return _MERGED_ARTICLES["rows"]
+def _served_articles_fingerprint() -> Any:
+    """
+    Fingerprint du snapshot d'articles que _article_snapshot() sert réellement : l'ancien
+    tant qu'une reconstruction est en cours, pas celui calculé sur le disque.
+    """
+    _article_snapshot()
+    # Le snapshot est publié avant son fingerprint : les lignes lues ensuite sont au moins
+    # aussi récentes que ce fingerprint, jamais plus anciennes.
+    return _MERGED_ARTICLES["fp"]
+
+
+def _build_article_snapshot() -> tuple[tuple[Mapping[str, Any], ...], dict[str, Any]]:
     rows = _build_merged_article_rows()
-    _MERGED_ARTICLES["fp"] = fp
-    _MERGED_ARTICLES["rows"] = rows
-    return rows
+    return rows, _build_article_index(rows)
+
+
+def _all_article_rows() -> tuple[Mapping[str, Any], ...]:
+    return _article_snapshot()[0]
+
+
+def _sorted_contains(postings: Sequence[int], pos: int) -> bool:
+    i = bisect_left(postings, pos)
+    return i < len(postings) and postings[i] == pos
+
+
+def _iter_intersection(postings: list[Sequence[int]]) -> Iterator[int]:
+    """Intersection paresseuse de listes triées : parcourt la plus courte, bisect dans les autres."""
+    ordered = sorted(postings, key=len)
+    base, others = ordered[0], ordered[1:]
+    for pos in base:
+        if all(_sorted_contains(p, pos) for p in others):
+            yield pos
 
 
 def get_data_source_info() -> dict[str, Any]:
     """Expose la source de données active et les candidats (debug/ops)."""
+    from backend.data.blog_posts import html_cache_stats
+
     return {
         "selected_dir": str(_data_dir().resolve()),
         "strict_mode": _env_true("BACKEND_DATA_DIR_STRICT"),
         "forced_dir": os.getenv("BACKEND_DATA_DIR"),
         "candidates": [str(p.resolve()) for p in _DATA_DIRS],
+        "compiled_snapshot": (_COMPILED["active"] or {}).get("path"),
+        "refresh": get_refresh_metrics(),
+        "html_cache": html_cache_stats(),
     }
 
 
@@ -191,6 +613,105 @@ def _str_list(values: Any) -> list[str]:
     return [value] if value else []
 
 
+def _filter_postings(
+    index: Mapping[str, Any], tag: str | None, category: str | None, lang: str | None
+) -> list[Sequence[int]]:
+    """Listes de postings des filtres exacts actifs (vide : aucun filtre)."""
+    postings: list[Sequence[int]] = []
+    for field, value in (("lang", lang), ("tag", tag), ("category", category)):
+        value_norm = (value or "").strip().lower()
+        if value_norm:
+            postings.append(index[field].get(value_norm, ()))
+    return postings
+
+
+def _iter_matches(n: int, index: Mapping[str, Any], q_norm: str, postings: list[Sequence[int]]) -> Iterator[int]:
+    """Positions croissantes satisfaisant les filtres exacts puis la sous-chaîne `q_norm`."""
+    candidates: Iterator[int] = _iter_intersection(postings) if postings else iter(range(n))
+    if not q_norm:
+        return candidates
+    search = index["search"]
+    return (pos for pos in candidates if q_norm in search[pos])
+
+
+def encode_article_cursor(rows: Sequence[Mapping[str, Any]], pos: int) -> str:
+    """
+    Curseur opaque après la ligne `pos` : clé de tri (date, titre) + rang parmi les ex æquo.
+    Indépendant des ids positionnels, qui se décalent quand un article plus récent est publié.
+    """
+    key = _sort_key(rows[pos])
+    first = bisect_left(range(len(rows)), True, key=lambda i: _sort_key(rows[i]) <= key)
+    raw = json.dumps([key[0], key[1], pos - first + 1], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_article_cursor(cursor: str) -> tuple[str, str, int]:
+    """Inverse de encode_article_cursor ; ValueError si le curseur est invalide."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        date, title, rank = json.loads(raw)
+        return str(date), str(title), int(rank)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Curseur invalide") from exc
+
+
+def _cursor_start(rows: Sequence[Mapping[str, Any]], cursor: str) -> int:
+    """
+    Première position strictement après le curseur dans l'ordre du snapshot
+    ((date, titre) décroissants, puis ordre d'origine) : recherche binaire, O(log n).
+    """
+    date, title, rank = decode_article_cursor(cursor)
+    key = (date, title)
+    first = bisect_left(range(len(rows)), True, key=lambda i: _sort_key(rows[i]) <= key)
+    end = bisect_left(range(len(rows)), True, key=lambda i: _sort_key(rows[i]) < key)
+    return min(first + max(rank, 0), end)
+
+
+def load_articles_page(
+    skip: int = 0,
+    limit: int = 20,
+    q: str | None = None,
+    tag: str | None = None,
+    category: str | None = None,
+    lang: str | None = None,
+    cursor: str | None = None,
+) -> dict[str, Any]:
+    """
+    Page d'articles filtrés : {"items", "total", "next_cursor"}.
+    `cursor` (voir encode_article_cursor) reprend après le dernier article vu, de façon stable
+    même si de nouveaux articles sont publiés ; `skip` s'applique ensuite. `total` compte
+    tous les articles filtrés, curseur ignoré.
+    """
+    rows, index = _article_snapshot()
+    start = _cursor_start(rows, cursor) if cursor else 0
+    q_norm = (q or "").strip().lower()
+    postings = _filter_postings(index, tag=tag, category=category, lang=lang)
+
+    if not q_norm and len(postings) <= 1:
+        # Aucun filtre ou un seul : la liste de postings est directement paginable.
+        positions: Sequence[int] = postings[0] if postings else range(len(rows))
+        first = bisect_left(positions, start) + skip
+        selected = positions[first : first + limit]
+        has_more = first + limit < len(positions)
+        total = len(positions)
+    else:
+        total = 0
+        after_cursor = 0
+        selected = []
+        for pos in _iter_matches(len(rows), index, q_norm, postings):
+            total += 1
+            if pos < start:
+                continue
+            if skip <= after_cursor < skip + limit:
+                selected.append(pos)
+            after_cursor += 1
+        has_more = after_cursor > skip + limit
+
+    page = [_public_article_dict(rows[pos]) for pos in selected]
+    next_cursor = encode_article_cursor(rows, selected[-1]) if selected and has_more else None
+    return {"items": page, "total": total, "next_cursor": next_cursor}
+
+
 def load_articles(
     skip: int = 0,
     limit: int = 20,
@@ -204,39 +725,214 @@ def load_articles(
     backend/public/posts/ et backend/public/blog_content/posts/.
     Retourne (liste d'items sans clés internes, total après filtres).
     """
-    rows = [dict(r) for r in _all_article_rows()]
+    page = load_articles_page(skip=skip, limit=limit, q=q, tag=tag, category=category, lang=lang)
+    return page["items"], page["total"]
+
+
+def _facet_list(counts: Mapping[str, int], labels: Mapping[str, str] | None = None) -> list[dict[str, Any]]:
+    labels = labels or {}
+    ordered = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    return [{"value": k, "label": labels.get(k, k), "count": c} for k, c in ordered]
+
+
+def _compute_facets(
+    rows: Sequence[Mapping[str, Any]], index: Mapping[str, Any], q_norm: str, postings: list[Sequence[int]]
+) -> dict[str, Any]:
+    fields = ("tag", "category", "year", "lang")
+    if not q_norm and not postings:
+        # Corpus entier : les comptes sont les longueurs des postings.
+        counts = {f: {k: len(v) for k, v in index[f].items()} for f in fields}
+        total = len(rows)
+    else:
+        counts = {f: {} for f in fields}
+        total = 0
+        for pos in _iter_matches(len(rows), index, q_norm, postings):
+            r = rows[pos]
+            total += 1
+            for t in dict.fromkeys(str(t).lower() for t in (r.get("tags") or [])):
+                counts["tag"][t] = counts["tag"].get(t, 0) + 1
+            for c in dict.fromkeys(str(c).lower() for c in (r.get("categories") or [])):
+                counts["category"][c] = counts["category"].get(c, 0) + 1
+            year = _article_year(r)
+            if year:
+                counts["year"][year] = counts["year"].get(year, 0) + 1
+            article_lang = str(r.get("lang") or "fr").lower()
+            counts["lang"][article_lang] = counts["lang"].get(article_lang, 0) + 1
+    years = sorted(counts["year"].items(), reverse=True)
+    return {
+        "total": total,
+        "tags": _facet_list(counts["tag"], index["labels"]["tag"]),
+        "categories": _facet_list(counts["category"], index["labels"]["category"]),
+        "years": [{"value": y, "label": y, "count": c} for y, c in years],
+        "langs": _facet_list(counts["lang"]),
+    }
 
-    lang_norm = (lang or "").strip().lower()
-    if lang_norm:
-        rows = [r for r in rows if str(r.get("lang") or "fr").lower() == lang_norm]
 
-    q_norm = (q or "").strip().lower()
-    tag_norm = (tag or "").strip().lower()
-    category_norm = (category or "").strip().lower()
-
-    if q_norm or tag_norm or category_norm:
-        filtered: list[dict[str, Any]] = []
-        for art in rows:
-            tags = [str(t).lower() for t in (art.get("tags") or [])]
-            categories = [str(c).lower() for c in (art.get("categories") or [])]
-            title = str(art.get("title") or "").lower()
-            excerpt = str(art.get("excerpt") or "").lower()
-            slug = str(art.get("slug") or "").lower()
-            author = str(art.get("author") or "").lower()
-            searchable = " ".join([title, excerpt, slug, author] + tags + categories)
-
-            if tag_norm and tag_norm not in tags:
-                continue
-            if category_norm and category_norm not in categories:
-                continue
-            if q_norm and q_norm not in searchable:
-                continue
-            filtered.append(art)
-        rows = filtered
+def article_facets(
+    q: str | None = None,
+    tag: str | None = None,
+    category: str | None = None,
+    lang: str | None = None,
+) -> dict[str, Any]:
+    """
+    Comptes par tag, catégorie, année et langue des articles correspondant aux filtres
+    (mêmes règles que load_articles). Calculés une fois par snapshot et par jeu de filtres.
+    """
+    rows, index = _article_snapshot()
+    key = tuple((v or "").strip().lower() for v in (q, tag, category, lang))
+    cache = _FACETS_CACHE
+    if cache["rows"] is not rows:
+        cache["rows"], cache["entries"] = rows, {}
+    entries = cache["entries"]
+    facets = entries.get(key)
+    if facets is None:
+        facets = _freeze(_compute_facets(rows, index, key[0], _filter_postings(index, *key[1:])))
+        if len(entries) >= _FACETS_CACHE_MAX:
+            entries.clear()
+        entries[key] = facets
+    return _thaw(facets)
+
+
+def content_version(scope: str | None = None) -> str:
+    """
+    Version du contenu servi (fingerprints articles/projets/expériences, ou snapshot compilé).
+    Stable entre workers et répliques : base des ETags de l'API. `scope` ("projects",
+    "experiences") limite la version au YAML concerné, sans parcourir les posts.
+    """
+    compiled = _COMPILED["active"]
+    if compiled is not None:
+        raw: Any = ("compiled", compiled["version"], compiled["created_at"])
+    elif scope is not None:
+        raw = (scope, _yaml_mtime_ns(_VERSION_SCOPES[scope])[1])
+    else:
+        raw = (
+            _merged_articles_fingerprint(),
+            _yaml_mtime_ns("projects.yml")[1],
+            _yaml_mtime_ns("experiences.yml")[1],
+        )
+    return hashlib.blake2b(repr(raw).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def request_content_version(scope: str | None = None) -> tuple[tuple[int, int] | None, str]:
+    """
+    (fingerprint articles à épingler ou None, version) en un seul parcours disque.
+    Appelé hors de la boucle ; l'appelant épingle le fingerprint dans son propre contexte.
+    """
+    if scope is not None or _COMPILED["active"] is not None:
+        return None, content_version(scope)
+    fp = _merged_articles_fingerprint()
+    token = _PINNED_ARTICLES_FP.set(fp)
+    try:
+        return fp, content_version()
+    finally:
+        _PINNED_ARTICLES_FP.reset(token)
 
-    total = len(rows)
-    page = [_public_article_dict(r) for r in rows[skip : skip + limit]]
-    return page, total
+
+def pin_articles_fingerprint(fp: tuple[int, int] | None) -> None:
+    """
+    Réutilise `fp` pour le reste du contexte courant (une requête : chaque requête ASGI
+    s'exécute dans son propre contexte, copié vers le threadpool des handlers).
+    """
+    _PINNED_ARTICLES_FP.set(fp)
+
+
+def _slugify(value: Any) -> str:
+    text = unicodedata.normalize("NFKD", str(value or ""))
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return _SLUG_RE.sub("-", text).strip("-")
+
+
+def _normalize_project(item_id: int, item: dict[str, Any]) -> dict[str, Any]:
+    name = item.get("name") or item.get("title")
+    return {
+        "id": item_id,
+        "name": name,
+        "title": item.get("title") or item.get("name"),
+        "slug": item.get("slug") or _slugify(name) or None,
+        "description": item.get("description"),
+        "tags": _str_list(item.get("tags")),
+        "categories": _str_list(item.get("categories")),
+        "github": item.get("github"),
+        "github_url": item.get("github_url"),
+        "website": item.get("website") or item.get("website_url"),
+        "website_url": item.get("website_url") or item.get("website"),
+        "permalink": item.get("permalink"),
+    }
+
+
+def _normalize_experience(item_id: int, item: dict[str, Any]) -> dict[str, Any]:
+    title = item.get("title", "")
+    company = item.get("company", "")
+    return {
+        "id": item_id,
+        "title": title,
+        "company": company,
+        "slug": item.get("slug") or _slugify(f"{title} {company}") or None,
+        "company_url": item.get("company_url"),
+        "location": item.get("location"),
+        "description": item.get("description"),
+        "skills": item.get("skills") or [],
+        "start_date": str(item["start_date"]) if item.get("start_date") else None,
+        "end_date": str(item["end_date"]) if item.get("end_date") else None,
+        "current": item.get("current", False),
+        "employment_type": item.get("employment_type"),
+        "permalink": item.get("permalink"),
+    }
+
+
+def _collection_snapshot(
+    filename: str,
+    normalize: Callable[[int, dict[str, Any]], dict[str, Any]],
+) -> dict[str, Any]:
+    """
+    Snapshot immuable d'un YAML (items MappingProxyType + index id/slug/permalink),
+    invalidé par le chemin et le mtime du fichier.
+    """
+    compiled = _COMPILED["active"]
+    if compiled is not None:
+        return compiled["collections"][filename]
+    path, mtime_ns = _yaml_mtime_ns(filename)
+    fp = (str(path), mtime_ns)
+    cached = _COLLECTIONS.get(filename)
+    if cached and cached["fp"] == fp:
+        return cached
+
+    items: list[Mapping[str, Any]] = []
+    for i, item in enumerate(_load_yaml_cached(path)):
+        if not isinstance(item, dict):
+            continue
+        items.append(_freeze(normalize(i + 1, item)))
+    snap = _index_collection(items, fp)
+    _COLLECTIONS[filename] = snap
+    return snap
+
+
+def _index_collection(items: Sequence[Mapping[str, Any]], fp: Any) -> dict[str, Any]:
+    """Index id/slug/permalink d'une collection d'items figés."""
+    by_id: dict[int, Mapping[str, Any]] = {}
+    by_slug: dict[str, Mapping[str, Any]] = {}
+    by_permalink: dict[str, Mapping[str, Any]] = {}
+    for it in items:
+        by_id[it["id"]] = it
+        if it.get("slug"):
+            by_slug.setdefault(str(it["slug"]).lower(), it)
+        if it.get("permalink"):
+            by_permalink.setdefault(str(it["permalink"]), it)
+    return {
+        "fp": fp,
+        "items": tuple(items),
+        "by_id": by_id,
+        "by_slug": by_slug,
+        "by_permalink": by_permalink,
+    }
+
+
+def _projects_snapshot() -> dict[str, Any]:
+    return _collection_snapshot("projects.yml", _normalize_project)
+
+
+def _experiences_snapshot() -> dict[str, Any]:
+    return _collection_snapshot("experiences.yml", _normalize_experience)
 
 
 def load_projects(skip: int = 0, limit: int = 20) -> tuple[list[dict], int]:
@@ -244,73 +940,74 @@ def load_projects(skip: int = 0, limit: int = 20) -> tuple[list[dict], int]:
     Charge les projets depuis projects.yml (backend/app/data, backend_old/data ou app/data).
     Normalise name/title, description, tags, github/website.
     """
-    path = _data_dir() / "projects.yml"
-    raw = _load_yaml_cached(path)
-    items = []
-    for i, item in enumerate(raw):
-        if not isinstance(item, dict):
-            continue
-        items.append({
-            "id": i + 1,
-            "name": item.get("name") or item.get("title"),
-            "title": item.get("title") or item.get("name"),
-            "description": item.get("description"),
-            "tags": _str_list(item.get("tags")),
-            "categories": _str_list(item.get("categories")),
-            "github": item.get("github"),
-            "github_url": item.get("github_url"),
-            "website": item.get("website") or item.get("website_url"),
-            "website_url": item.get("website_url") or item.get("website"),
-            "permalink": item.get("permalink"),
-        })
-    total = len(items)
-    return items[skip : skip + limit], total
+    items = _projects_snapshot()["items"]
+    return [_public_item(it) for it in items[skip : skip + limit]], len(items)
 
 
 def load_experiences(skip: int = 0, limit: int = 20) -> tuple[list[dict], int]:
     """
     Charge les expériences depuis experiences.yml si présent.
     """
-    path = _data_dir() / "experiences.yml"
-    raw = _load_yaml_cached(path)
-    items = []
-    for i, item in enumerate(raw):
-        if not isinstance(item, dict):
-            continue
-        items.append({
-            "id": i + 1,
-            "title": item.get("title", ""),
-            "company": item.get("company", ""),
-            "company_url": item.get("company_url"),
-            "location": item.get("location"),
-            "description": item.get("description"),
-            "skills": item.get("skills") or [],
-            "start_date": str(item["start_date"]) if item.get("start_date") else None,
-            "end_date": str(item["end_date"]) if item.get("end_date") else None,
-            "current": item.get("current", False),
-            "employment_type": item.get("employment_type"),
-        })
-    total = len(items)
-    return items[skip : skip + limit], total
+    items = _experiences_snapshot()["items"]
+    return [_public_item(it) for it in items[skip : skip + limit]], len(items)
 
 
-def get_article_by_id(article_id: int) -> dict[str, Any] | None:
-    row = next((r for r in _all_article_rows() if r.get("id") == article_id), None)
-    if not row:
-        return None
+def _article_detail(row: Mapping[str, Any]) -> dict[str, Any]:
     from backend.data.blog_posts import html_for_article_row
 
     out = _public_article_dict(row)
-    if row.get("_md_path"):
+    compiled = _COMPILED["active"]
+    html = compiled["html"](row["_html"]) if compiled is not None and row.get("_html") else None
+    if html is not None:
+        out["content_html"] = html
+    elif row.get("_md_path"):
         out["content_html"] = html_for_article_row(row)
     return out
 
 
+def get_article_by_id(article_id: int) -> dict[str, Any] | None:
+    rows, _ = _article_snapshot()
+    # id = position + 1 dans le snapshot trié : accès direct.
+    if not 1 <= article_id <= len(rows):
+        return None
+    return _article_detail(rows[article_id - 1])
+
+
+def get_article_by_slug(slug: str, lang: str | None = None) -> dict[str, Any] | None:
+    """Article par slug ; `lang` départage les traductions qui partagent un slug."""
+    rows, index = _article_snapshot()
+    positions = index["slug"].get(slug.strip().lower(), ())
+    if not positions:
+        return None
+    lang_norm = (lang or "").strip().lower()
+    if lang_norm:
+        positions = [p for p in positions if str(rows[p].get("lang") or "fr").lower() == lang_norm]
+        if not positions:
+            return None
+    return _article_detail(rows[positions[0]])
+
+
+def get_article_by_permalink(permalink: str) -> dict[str, Any] | None:
+    rows, index = _article_snapshot()
+    pos = index["permalink"].get(permalink)
+    return _article_detail(rows[pos]) if pos is not None else None
+
+
 def get_project_by_id(project_id: int) -> dict[str, Any] | None:
-    items, _ = load_projects(skip=0, limit=10_000)
-    return next((it for it in items if it.get("id") == project_id), None)
+    it = _projects_snapshot()["by_id"].get(project_id)
+    return _public_item(it) if it else None
+
+
+def get_project_by_slug(slug: str) -> dict[str, Any] | None:
+    it = _projects_snapshot()["by_slug"].get(slug.strip().lower())
+    return _public_item(it) if it else None
 
 
 def get_experience_by_id(experience_id: int) -> dict[str, Any] | None:
-    items, _ = load_experiences(skip=0, limit=10_000)
-    return next((it for it in items if it.get("id") == experience_id), None)
+    it = _experiences_snapshot()["by_id"].get(experience_id)
+    return _public_item(it) if it else None
+
+
+def get_experience_by_slug(slug: str) -> dict[str, Any] | None:
+    it = _experiences_snapshot()["by_slug"].get(slug.strip().lower())
+    return _public_item(it) if it else None
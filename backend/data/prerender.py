@@ -0,0 +1,279 @@
+"""
+Pré-rendu statique des réponses articles (JSON liste/détail), précompressées.
+
+Le CLI parcourt les articles fusionnés et écrit, pour la version de contenu courante :
+    articles/list/<paramètres>.json   une page de GET /api/v1/articles/ par combinaison
+                                      langue x (aucun filtre | un tag | une catégorie)
+    articles/<id>.json                GET /api/v1/articles/{id} (content_html inclus)
+chacun avec ses variantes .gz (et .br si le paquet `brotli` est installé), puis
+manifest.json. Au runtime, si le manifest correspond à loader.content_version(), ces
+fichiers sont servis tels quels (FileResponse : sendfile / pathsend quand le serveur le
+permet) sans passer par load_articles ni le moteur Markdown.
+
+La version est comparée à l'état publié par le watcher ou le snapshot compilé (aucun accès
+disque par requête) ; sans l'un ni l'autre, elle est revérifiée sur disque au plus toutes
+les `recheck` secondes (CONTENT_WATCH_INTERVAL), comme le ferait un watcher en mode poll.
+
+Usage :
+    python -m backend.data.prerender build [--output backend/prerendered] [--limit 10 --limit 20]
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterator, Mapping
+from urllib.parse import quote
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import FileResponse, Response
+
+from backend.data import loader
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT = Path(__file__).resolve().parent.parent / "prerendered"
+DEFAULT_LIMITS = (10, 20)
+MANIFEST = "manifest.json"
+
+_LIST_PATH = "/api/v1/articles/"
+_DETAIL_RE = re.compile(r"^/api/v1/articles/(\d+)$")
+# Ordre canonique des paramètres dans les noms de fichiers de liste.
+_LIST_PARAMS = ("lang", "tag", "category", "skip", "limit")
+_LIST_DEFAULTS = {"skip": "0", "limit": "20"}
+
+
+def list_artifact_name(params: dict[str, str]) -> str:
+    """Nom de fichier d'une page de liste (valeurs brutes, encodées pour le système de fichiers)."""
+    values = {**_LIST_DEFAULTS, **params}
+    return "&".join(f"{k}={quote(values[k], safe='')}" for k in _LIST_PARAMS if values.get(k) is not None)
+
+
+def _write_artifact(root: Path, relative: str, body: bytes) -> int:
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(body)
+    path.with_name(path.name + ".gz").write_bytes(gzip.compress(body, compresslevel=9, mtime=0))
+    written = 2
+    if brotli is not None:
+        path.with_name(path.name + ".br").write_bytes(brotli.compress(body, quality=11))
+        written += 1
+    return written
+
+
+def _list_requests(limits: tuple[int, ...]) -> Iterator[dict[str, str]]:
+    """Pages exposées : langue (ou aucune) x (aucun filtre | un tag | une catégorie), toutes les pages."""
+    langs = [None] + [f["value"] for f in loader.article_facets()["langs"]]
+    for lang in langs:
+        facets = loader.article_facets(lang=lang)
+        filters: list[dict[str, str]] = [{}]
+        filters += [{"tag": f["value"]} for f in facets["tags"]]
+        filters += [{"category": f["value"]} for f in facets["categories"]]
+        for extra in filters:
+            base = {**({"lang": lang} if lang else {}), **extra}
+            total = loader.article_facets(**base)["total"]
+            for limit in limits:
+                for skip in range(0, max(total, 1), limit):
+                    yield {**base, "skip": str(skip), "limit": str(limit)}
+
+
+def build_artifacts(output: Path = DEFAULT_OUTPUT, limits: tuple[int, ...] = DEFAULT_LIMITS) -> dict[str, Any]:
+    """Écrit tous les artefacts dans `output` (remplacé d'un bloc en fin de build)."""
+    from backend.routers import api_v1
+    from backend.schemas import ArticleOut, ArticlesListOut
+
+    version = loader.content_version()
+    output = Path(output)
+    tmp = output.with_name(output.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    files = pages = 0
+    for params in _list_requests(limits):
+        payload = api_v1.list_articles(
+            skip=int(params["skip"]), limit=int(params["limit"]), q=None,
+            tag=params.get("tag"), category=params.get("category"), lang=params.get("lang"), cursor=None,
+        )
+        body = ArticlesListOut.model_validate(payload).model_dump_json().encode("utf-8")
+        files += _write_artifact(tmp, f"articles/list/{list_artifact_name(params)}.json", body)
+        pages += 1
+
+    rows = loader._all_article_rows()
+    for row in rows:
+        detail = ArticleOut.model_validate(api_v1.get_article(row["id"]))
+        files += _write_artifact(tmp, f"articles/{detail.id}.json", detail.model_dump_json().encode("utf-8"))
+
+    if loader.content_version() != version:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise RuntimeError("Le contenu a changé pendant le pré-rendu : relancer le build")
+    manifest = {"version": version, "created_at": int(time.time()), "pages": pages, "articles": len(rows), "files": files}
+    (tmp / MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    previous = output.with_name(output.name + ".old")
+    shutil.rmtree(previous, ignore_errors=True)
+    if output.exists():
+        os.replace(output, previous)
+    os.replace(tmp, output)
+    shutil.rmtree(previous, ignore_errors=True)
+    return {"path": str(output), "brotli": brotli is not None, **manifest}
+
+
+class PrerenderedArtifacts:
+    """Résolution requête -> fichier pré-rendu, valable tant que la version du contenu correspond."""
+
+    def __init__(self, root: Path, recheck: float = 2.0) -> None:
+        self.root = Path(root)
+        manifest = json.loads((self.root / MANIFEST).read_text(encoding="utf-8"))
+        self.version = str(manifest["version"])
+        self.etag = f'W/"{self.version}"'
+        self.recheck = max(float(recheck), 0.0)
+        self.stats = {"served": 0, "not_modified": 0, "stale": 0}
+        # (état publié, instant monotone, version à jour) de la dernière vérification
+        self._checked: tuple[Any, float, bool] | None = None
+
+    def is_current(self) -> bool:
+        """Le contenu servi a-t-il toujours la version du manifest ?"""
+        state = loader.published_content_state()
+        now = time.monotonic()
+        checked = self._checked
+        if checked is not None and checked[0] is state and (state is not None or now - checked[1] < self.recheck):
+            return checked[2]
+        current = loader.content_version() == self.version
+        self._checked = (state, now, current)
+        return current
+
+    def relative_path(self, path: str, query: dict[str, str]) -> str | None:
+        if path == _LIST_PATH:
+            # Recherche texte, curseur et paramètres inconnus : réponse dynamique.
+            if any(k not in _LIST_PARAMS for k in query):
+                return None
+            return f"articles/list/{list_artifact_name(query)}.json"
+        match = _DETAIL_RE.match(path)
+        if match and not query:
+            return f"articles/{int(match.group(1))}.json"
+        return None
+
+    def lookup(self, path: str, query: dict[str, str]) -> Path | None:
+        """Fichier à servir, ou None (pas d'artefact, ou contenu modifié depuis le build)."""
+        relative = self.relative_path(path, query)
+        return self.locate(relative) if relative is not None else None
+
+    def locate(self, relative: str) -> Path | None:
+        """Artefact `relative` (voir relative_path) s'il existe et que le contenu est à jour."""
+        candidate = self.root / relative
+        if not candidate.is_file():
+            return None
+        if not self.is_current():
+            self.stats["stale"] += 1
+            return None
+        return candidate
+
+
+def artifact_response(artifacts: PrerenderedArtifacts, path: Path, headers: Mapping[str, str]) -> Response:
+    """Réponse fichier (variante .br/.gz selon Accept-Encoding) ou 304, mêmes en-têtes de cache que l'API."""
+    from backend.routers.api_v1 import etag_matches
+
+    out = {"ETag": artifacts.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(headers.get("if-none-match"), artifacts.etag):
+        artifacts.stats["not_modified"] += 1
+        return Response(status_code=304, headers=out)
+    accepted = set()
+    for token in (headers.get("accept-encoding") or "").split(","):
+        coding, _, params = token.strip().partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(coding.strip().lower())
+    for coding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        variant = path.with_name(path.name + suffix)
+        if coding in accepted and variant.is_file():
+            out["Content-Encoding"] = coding
+            path = variant
+            break
+    artifacts.stats["served"] += 1
+    return FileResponse(path, media_type="application/json", headers=out)
+
+
+_ACTIVE: dict[str, PrerenderedArtifacts | None] = {"current": None}
+
+
+def activate_prerendered(path: str | Path | None, recheck: float = 2.0) -> bool:
+    """
+    Sert les artefacts de `path` ; False si vide, absent ou sans manifest lisible.
+    `recheck` : intervalle de revérification de la version sans watcher ni snapshot.
+    """
+    _ACTIVE["current"] = None
+    if not path:
+        return False
+    root = Path(path).expanduser()
+    try:
+        _ACTIVE["current"] = PrerenderedArtifacts(root, recheck)
+    except (OSError, ValueError, KeyError) as exc:
+        logger.info("Artefacts pré-rendus ignorés (%s) : %s", root, exc)
+        return False
+    return True
+
+
+def active_prerendered() -> PrerenderedArtifacts | None:
+    return _ACTIVE["current"]
+
+
+class PrerenderedMiddleware:
+    """
+    Middleware ASGI pur : lectures anonymes (GET/HEAD) de contenu inchangé servies depuis
+    le fichier pré-rendu, sans loader ni Markdown. Sans artefacts actifs, l'application est
+    appelée directement (ni tâche, ni flux mémoire, ni mise en tampon des réponses).
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        artifacts = active_prerendered()
+        if artifacts is None or scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        query = dict(QueryParams(scope.get("query_string", b"")))
+        # Résolution en mémoire d'abord : seules les requêtes candidates (liste/détail
+        # articles) paient le passage au threadpool pour is_file() / is_current().
+        relative = artifacts.relative_path(scope["path"], query)
+        path = await run_in_threadpool(artifacts.locate, relative) if relative is not None else None
+        if path is None:
+            await self.app(scope, receive, send)
+            return
+        await artifact_response(artifacts, path, Headers(scope=scope))(scope, receive, send)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.data.prerender", description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="pré-rend les réponses articles de la version courante")
+    build.add_argument("--output", "-o", type=Path, default=DEFAULT_OUTPUT)
+    build.add_argument("--limit", type=int, action="append", help="taille(s) de page (défaut : 10 et 20)")
+    build.add_argument("--snapshot", type=Path, help="snapshot compilé à servir au runtime (même version de contenu)")
+    args = parser.parse_args(argv)
+
+    if args.snapshot:
+        from backend.data.snapshot import activate_snapshot
+
+        if not activate_snapshot(args.snapshot):
+            print(f"Snapshot invalide : {args.snapshot}", file=sys.stderr)
+            return 1
+    result = build_artifacts(args.output, tuple(args.limit or DEFAULT_LIMITS))
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
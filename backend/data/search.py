@@ -0,0 +1,367 @@
+"""
+Index de recherche plein texte (BM25) en mémoire : corps des articles, projets et expériences.
+
+Construit à côté du snapshot fusionné du loader et reconstruit quand le fingerprint change.
+La reconstruction est incrémentale : seuls les documents dont la signature a changé
+(mtime du Markdown, valeurs YAML) sont relus et re-tokenisés.
+"""
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+from collections import Counter
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from backend.data import loader
+
+# Paramètres BM25 classiques
+_K1 = 1.2
+_B = 0.75
+
+# Pondération des champs (répétition de tf)
+_TITLE_WEIGHT = 3
+_TAG_WEIGHT = 2
+
+_SNIPPET_LEN = 180
+
+# Mots vides FR + EN (déjà sans accents), élisions incluses (l', d', qu'...)
+_STOPWORDS = frozenset(
+    """
+    au aux avec ce ces cet cette dans de des du elle en est et il ils je la le les leur lui
+    ma mais me meme mes mon ne nos notre nous ou par pas pour qu que qui sa se ses son sur
+    ta te tes toi ton tu un une vos votre vous etre avoir sont ont ete plus comme tout
+    an and are as at be by for from has have in is it its of on or that the this to was
+    were will with not but can you your we our they their which what how
+    """.split()
+)
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+_HTML_TAG_RE = re.compile(r"<[^>]*>")
+_MD_LINK_RE = re.compile(r"\]\([^)]*\)")
+_MD_SYMBOLS_RE = re.compile(r"[#*_`>|~\[\]]+")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def _fold_char(c: str) -> str:
+    """Minuscule sans accent, toujours un seul caractère (positions préservées pour les snippets)."""
+    base = unicodedata.normalize("NFKD", c)[:1] or c
+    return base.lower()[:1] or c
+
+
+def fold(text: str) -> str:
+    """Minuscules + suppression des accents, longueur identique à l'entrée."""
+    if text.isascii():
+        return text.lower()
+    return "".join(_fold_char(c) for c in text)
+
+
+def _stem(token: str) -> str:
+    # Pluriel léger FR/EN : « donnees » -> « donnee », « pipelines » -> « pipeline ».
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Tokens normalisés (accents repliés, mots vides FR/EN retirés, pluriel simple)."""
+    out: list[str] = []
+    for m in _TOKEN_RE.finditer(fold(text)):
+        tok = m.group()
+        if len(tok) < 2 or tok in _STOPWORDS:
+            continue
+        out.append(_stem(tok))
+    return out
+
+
+def _plain_text(markdown_body: str) -> str:
+    text = _HTML_TAG_RE.sub(" ", markdown_body)
+    text = _MD_LINK_RE.sub("]", text)
+    text = _MD_SYMBOLS_RE.sub(" ", text)
+    return _SPACES_RE.sub(" ", text).strip()
+
+
+@dataclass(frozen=True)
+class SearchDoc:
+    kind: str
+    ref_id: int
+    title: str
+    lang: str | None
+    slug: str | None
+    permalink: str | None
+    text: str
+
+
+@dataclass
+class _DocTerms:
+    signature: Any
+    text: str
+    tf: Counter
+    length: int
+
+
+@dataclass
+class SearchIndex:
+    docs: list[SearchDoc] = field(default_factory=list)
+    postings: dict[str, list[tuple[int, int]]] = field(default_factory=dict)
+    lengths: list[int] = field(default_factory=list)
+    avgdl: float = 0.0
+    stats: dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Forme JSON compacte (postings aplatis [doc, tf, doc, tf, ...])."""
+        return {
+            "docs": [
+                [d.kind, d.ref_id, d.title, d.lang, d.slug, d.permalink, d.text] for d in self.docs
+            ],
+            "postings": {t: [x for pair in plist for x in pair] for t, plist in self.postings.items()},
+            "lengths": self.lengths,
+            "avgdl": self.avgdl,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SearchIndex":
+        postings = {
+            t: list(zip(flat[0::2], flat[1::2])) for t, flat in data["postings"].items()
+        }
+        return cls(
+            docs=[SearchDoc(*d) for d in data["docs"]],
+            postings=postings,
+            lengths=list(data["lengths"]),
+            avgdl=float(data["avgdl"]),
+            stats={"docs": len(data["docs"]), "parsed": 0, "reused": 0},
+        )
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        n = len(self.docs)
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def search(
+        self,
+        q: str,
+        kind: str | None = None,
+        lang: str | None = None,
+    ) -> list[tuple[float, int]]:
+        """Retourne [(score, doc_idx)] triés par score décroissant."""
+        terms = list(dict.fromkeys(tokenize(q)))
+        if not terms or not self.docs:
+            return []
+        kind_norm = (kind or "").strip().lower() or None
+        lang_norm = (lang or "").strip().lower() or None
+        avgdl = self.avgdl or 1.0
+        scores: dict[int, float] = {}
+        for term in terms:
+            plist = self.postings.get(term)
+            if not plist:
+                continue
+            idf = self.idf(term)
+            for doc_idx, tf in plist:
+                doc = self.docs[doc_idx]
+                if kind_norm and doc.kind != kind_norm:
+                    continue
+                if lang_norm and doc.kind == "article" and doc.lang != lang_norm:
+                    continue
+                norm = _K1 * (1 - _B + _B * self.lengths[doc_idx] / avgdl)
+                scores[doc_idx] = scores.get(doc_idx, 0.0) + idf * tf * (_K1 + 1) / (tf + norm)
+        return sorted(((s, i) for i, s in scores.items()), key=lambda x: (-x[0], x[1]))
+
+    def snippet(self, doc_idx: int, q: str, length: int = _SNIPPET_LEN) -> str:
+        """Extrait centré sur la première occurrence d'un terme de la requête."""
+        text = self.docs[doc_idx].text
+        if len(text) <= length:
+            return text
+        folded = fold(text)
+        start = -1
+        for term in dict.fromkeys(tokenize(q)):
+            m = re.search(r"\b" + re.escape(term), folded)
+            if m and (start == -1 or m.start() < start):
+                start = m.start()
+        if start == -1:
+            return text[: length - 1].rstrip() + "…"
+        begin = max(start - length // 3, 0)
+        end = min(begin + length, len(text))
+        out = text[begin:end].strip()
+        if begin > 0:
+            out = "…" + out
+        if end < len(text):
+            out = out + "…"
+        return out
+
+
+# Cache des termes par document (clé stable) + index courant
+_DOC_TERMS: dict[str, _DocTerms] = {}
+_SEARCH_INDEX: dict[str, Any] = {"fp": None, "index": SearchIndex(), "compiled": None}
+_SEARCH_FLIGHT = loader._SingleFlight("search")
+
+
+def clear_search_index() -> None:
+    _DOC_TERMS.clear()
+    _SEARCH_INDEX["fp"] = None
+    _SEARCH_INDEX["index"] = SearchIndex()
+
+
+def _weighted_tf(title: str, tags: list[str], text: str) -> tuple[Counter, int]:
+    tf: Counter = Counter()
+    for tok in tokenize(title):
+        tf[tok] += _TITLE_WEIGHT
+    for tok in tokenize(" ".join(tags)):
+        tf[tok] += _TAG_WEIGHT
+    for tok in tokenize(text):
+        tf[tok] += 1
+    return tf, sum(tf.values())
+
+
+def _article_source(row: dict[str, Any]) -> tuple[str, Any]:
+    md_path = row.get("_md_path")
+    if md_path:
+        return f"article:{md_path}", ("md", md_path, loader._file_mtime_ns(Path(md_path)))
+    key = f"article:yaml:{row.get('permalink') or row.get('title')}"
+    return key, ("yaml", row.get("title"), row.get("excerpt"), tuple(row.get("tags") or ()))
+
+
+def _article_text(row: dict[str, Any]) -> str:
+    md_path = row.get("_md_path")
+    if md_path:
+        from backend.data.blog_posts import read_article_body
+
+        body = read_article_body(row)
+        if body is not None:
+            return _plain_text(body)
+    return str(row.get("excerpt") or "")
+
+
+def _project_text(item: Mapping[str, Any]) -> str:
+    return str(item.get("description") or "")
+
+
+def _experience_text(item: Mapping[str, Any]) -> str:
+    parts = [item.get("company"), item.get("location"), item.get("description")]
+    return " ".join(str(p) for p in parts if p)
+
+
+def _collection_sources() -> list[tuple[str, Mapping[str, Any]]]:
+    rows, _ = loader._article_snapshot()
+    projects = loader._projects_snapshot()["items"]
+    experiences = loader._experiences_snapshot()["items"]
+    out: list[tuple[str, Mapping[str, Any]]] = [("article", r) for r in rows]
+    out += [("project", p) for p in projects]
+    out += [("experience", e) for e in experiences]
+    return out
+
+
+def _doc_terms(kind: str, item: Mapping[str, Any], stats: dict[str, int]) -> tuple[str, _DocTerms]:
+    if kind == "article":
+        key, signature = _article_source(item)
+        title = str(item.get("title") or "")
+        tags = list(item.get("tags") or []) + list(item.get("categories") or [])
+        make_text = lambda: _article_text(item)  # noqa: E731
+    elif kind == "project":
+        title = str(item.get("title") or item.get("name") or "")
+        tags = list(item.get("tags") or []) + list(item.get("categories") or [])
+        key = f"project:{item.get('id')}"
+        signature = (title, item.get("description"), tuple(tags))
+        make_text = lambda: _project_text(item)  # noqa: E731
+    else:
+        title = str(item.get("title") or "")
+        tags = [str(s) for s in item.get("skills") or []]
+        key = f"experience:{item.get('id')}"
+        signature = (title, item.get("company"), item.get("location"), item.get("description"), tuple(tags))
+        make_text = lambda: _experience_text(item)  # noqa: E731
+
+    cached = _DOC_TERMS.get(key)
+    if cached and cached.signature == signature:
+        stats["reused"] += 1
+        return key, cached
+    text = make_text()
+    tf, length = _weighted_tf(title, tags, text)
+    stats["parsed"] += 1
+    return key, _DocTerms(signature=signature, text=text, tf=tf, length=length)
+
+
+def _search_fingerprint() -> tuple[Any, Any, Any]:
+    # Fingerprint des lignes effectivement servies, pas celui du disque : pendant une
+    # reconstruction des articles, un index construit sur l'ancien snapshot ne doit pas
+    # être mis en cache sous le nouveau fingerprint (il ne serait jamais reconstruit).
+    return (
+        loader._served_articles_fingerprint(),
+        loader._yaml_mtime_ns("projects.yml"),
+        loader._yaml_mtime_ns("experiences.yml"),
+    )
+
+
+def build_search_index() -> SearchIndex:
+    """(Re)construit l'index en réutilisant les termes des documents inchangés."""
+    stats = {"parsed": 0, "reused": 0}
+    docs: list[SearchDoc] = []
+    lengths: list[int] = []
+    postings: dict[str, list[tuple[int, int]]] = {}
+    live: dict[str, _DocTerms] = {}
+
+    for kind, item in _collection_sources():
+        key, terms = _doc_terms(kind, item, stats)
+        live[key] = terms
+        doc_idx = len(docs)
+        lang = item.get("lang") if kind == "article" else None
+        docs.append(SearchDoc(
+            kind=kind,
+            ref_id=int(item.get("id") or 0),
+            title=str(item.get("title") or item.get("name") or ""),
+            lang=str(lang).lower() if lang else None,
+            slug=item.get("slug"),
+            permalink=item.get("permalink"),
+            text=terms.text,
+        ))
+        lengths.append(terms.length)
+        for term, tf in terms.tf.items():
+            postings.setdefault(term, []).append((doc_idx, tf))
+
+    _DOC_TERMS.clear()
+    _DOC_TERMS.update(live)
+    stats["docs"] = len(docs)
+    avgdl = (sum(lengths) / len(lengths)) if lengths else 0.0
+    return SearchIndex(docs=docs, postings=postings, lengths=lengths, avgdl=avgdl, stats=stats)
+
+
+def use_compiled_index(index: SearchIndex | None) -> None:
+    """Sert un index chargé depuis le snapshot précompilé (None : index construit à la demande)."""
+    _SEARCH_INDEX["compiled"] = index
+
+
+def get_search_index() -> SearchIndex:
+    compiled = _SEARCH_INDEX["compiled"]
+    if compiled is not None:
+        return compiled
+    return _SEARCH_FLIGHT.get(_SEARCH_INDEX, "index", _search_fingerprint(), build_search_index)
+
+
+def search(
+    q: str,
+    skip: int = 0,
+    limit: int = 20,
+    kind: str | None = None,
+    lang: str | None = None,
+) -> tuple[list[dict[str, Any]], int]:
+    """
+    Recherche classée BM25. Retourne (hits de la page avec snippet, total).
+    `kind` : article | project | experience ; `lang` ne filtre que les articles.
+    """
+    index = get_search_index()
+    ranked = index.search(q, kind=kind, lang=lang)
+    page = []
+    for score, doc_idx in ranked[skip : skip + limit]:
+        doc = index.docs[doc_idx]
+        page.append({
+            "type": doc.kind,
+            "id": doc.ref_id,
+            "title": doc.title,
+            "score": round(score, 4),
+            "snippet": index.snippet(doc_idx, q),
+            "lang": doc.lang,
+            "slug": doc.slug,
+            "permalink": doc.permalink,
+        })
+    return page, len(ranked)
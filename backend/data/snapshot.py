@@ -0,0 +1,231 @@
+"""
+Snapshot binaire précompilé du contenu (articles, projets, expériences, index de recherche, HTML).
+
+Construit hors ligne puis mappé en mémoire (mmap) au démarrage de l'API : pas de parsing
+YAML/Markdown au cold start, et le HTML pré-rendu est partagé entre workers via le page cache.
+Les sources YAML/Markdown restent le fallback si le fichier est absent ou d'une autre version.
+
+Limite : seul le HTML est lu paresseusement dans le mmap, à chaque requête de détail. Les
+sections "meta" et "search" sont des JSON désérialisés en entier au chargement : chaque worker
+en garde sa propre copie en objets Python (pas de partage via le page cache pour celles-ci).
+
+Usage :
+    python -m backend.data.snapshot build [--output backend/content.snap]
+    python -m backend.data.snapshot info backend/content.snap
+
+Format (little-endian) :
+    en-tête  : magic (8 octets) | version (u32) | taille de la table des sections (u32)
+    table    : JSON {"version", "created_at", "counts", "sections": {nom: [offset, taille]}}
+    sections : "meta" (JSON), "search" (JSON), "html" (blob UTF-8 concaténé)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from backend.data import loader, search
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+DEFAULT_SNAPSHOT_PATH = Path(__file__).resolve().parent.parent / "content.snap"
+
+_MAGIC = b"PFSNAP\x00\x00"
+_HEADER = struct.Struct("<8sII")
+
+
+class SnapshotError(ValueError):
+    """Fichier snapshot illisible, corrompu ou d'une version incompatible."""
+
+
+def _json_bytes(value: Any) -> bytes:
+    # Les dates YAML (datetime.date) sont sérialisées en chaîne, comme dans les réponses JSON.
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def build_snapshot(output: Path = DEFAULT_SNAPSHOT_PATH) -> dict[str, Any]:
+    """Compile le contenu courant (sources YAML/Markdown) dans `output`, de façon atomique."""
+    from backend.data.blog_posts import html_for_article_row
+
+    previous = loader._COMPILED["active"]
+    previous_index = search._SEARCH_INDEX["compiled"]
+    loader.use_compiled_snapshot(None)
+    search.use_compiled_index(None)
+    try:
+        rows = loader._all_article_rows()
+        projects = loader._projects_snapshot()["items"]
+        experiences = loader._experiences_snapshot()["items"]
+        index = search.get_search_index()
+
+        html = bytearray()
+        articles: list[dict[str, Any]] = []
+        for row in rows:
+            out = loader._thaw(row)
+            if row.get("_md_path"):
+                body = html_for_article_row(row).encode("utf-8")
+                out["_html"] = [len(html), len(body)]
+                html += body
+            articles.append(out)
+        meta = _json_bytes({
+            "articles": articles,
+            "projects": [loader._thaw(p) for p in projects],
+            "experiences": [loader._thaw(e) for e in experiences],
+        })
+        search_blob = _json_bytes(index.to_dict())
+    finally:
+        loader.use_compiled_snapshot(previous)
+        search.use_compiled_index(previous_index)
+
+    counts = {"articles": len(articles), "projects": len(projects), "experiences": len(experiences)}
+    sections: dict[str, list[int]] = {}
+    blobs = [("meta", meta), ("search", search_blob), ("html", bytes(html))]
+    # Point fixe : la taille de la table dépend des offsets qu'elle contient.
+    created_at = int(time.time())
+    toc = b""
+    while True:
+        offset = _HEADER.size + len(toc)
+        for name, blob in blobs:
+            sections[name] = [offset, len(blob)]
+            offset += len(blob)
+        encoded = _json_bytes({
+            "version": FORMAT_VERSION,
+            "created_at": created_at,
+            "counts": counts,
+            "sections": sections,
+        })
+        if len(encoded) == len(toc):
+            toc = encoded
+            break
+        toc = encoded
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_suffix(output.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, FORMAT_VERSION, len(toc)))
+        f.write(toc)
+        for _name, blob in blobs:
+            f.write(blob)
+    os.replace(tmp, output)
+    return {"path": str(output), "bytes": output.stat().st_size, "version": FORMAT_VERSION, **counts}
+
+
+def read_table(mm: mmap.mmap | bytes) -> dict[str, Any]:
+    if len(mm) < _HEADER.size:
+        raise SnapshotError("fichier tronqué")
+    magic, version, toc_len = _HEADER.unpack_from(mm, 0)
+    if magic != _MAGIC:
+        raise SnapshotError("magic invalide")
+    if version != FORMAT_VERSION:
+        raise SnapshotError(f"version {version} non supportée (attendu {FORMAT_VERSION})")
+    toc = json.loads(mm[_HEADER.size : _HEADER.size + toc_len])
+    for name, (offset, size) in toc["sections"].items():
+        if offset + size > len(mm):
+            raise SnapshotError(f"section {name} hors du fichier")
+    return toc
+
+
+def load_snapshot(path: Path) -> dict[str, Any]:
+    """Mappe le fichier en mémoire et reconstruit les structures servies par le loader."""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        toc = read_table(mm)
+        meta_off, meta_len = toc["sections"]["meta"]
+        search_off, search_len = toc["sections"]["search"]
+        html_off, _html_len = toc["sections"]["html"]
+        meta = json.loads(mm[meta_off : meta_off + meta_len])
+        index = search.SearchIndex.from_dict(json.loads(mm[search_off : search_off + search_len]))
+    except Exception:
+        mm.close()
+        raise
+
+    def read_html(span: tuple[int, int]) -> str | None:
+        # deactivate_snapshot() ferme le mmap alors qu'une requête peut encore tenir cette
+        # fermeture : None, et l'appelant retombe sur la source Markdown.
+        start = html_off + span[0]
+        try:
+            return mm[start : start + span[1]].decode("utf-8")
+        except ValueError:
+            return None
+
+    fp = ("compiled", str(path), toc["created_at"])
+    rows = tuple(loader._freeze(r) for r in meta["articles"])
+    return {
+        "path": str(path),
+        "version": toc["version"],
+        "created_at": toc["created_at"],
+        "articles": (rows, loader._build_article_index(rows)),
+        "collections": {
+            "projects.yml": loader._index_collection([loader._freeze(p) for p in meta["projects"]], fp),
+            "experiences.yml": loader._index_collection([loader._freeze(e) for e in meta["experiences"]], fp),
+        },
+        "html": read_html,
+        "search": index,
+        "mmap": mm,
+    }
+
+
+def activate_snapshot(path: str | Path | None) -> bool:
+    """
+    Sert le contenu depuis le snapshot `path`. Retourne False (sources YAML/Markdown
+    conservées) si le chemin est vide, absent ou invalide.
+    """
+    if not path:
+        return False
+    path = Path(path).expanduser()
+    if not path.is_file():
+        logger.info("Snapshot de contenu absent (%s) : fallback YAML/Markdown", path)
+        return False
+    try:
+        compiled = load_snapshot(path)
+    except (OSError, ValueError, KeyError) as exc:
+        logger.warning("Snapshot de contenu ignoré (%s) : %s", path, exc)
+        return False
+    deactivate_snapshot()
+    loader.use_compiled_snapshot(compiled)
+    search.use_compiled_index(compiled["search"])
+    return True
+
+
+def deactivate_snapshot() -> None:
+    compiled = loader._COMPILED["active"]
+    loader.use_compiled_snapshot(None)
+    search.use_compiled_index(None)
+    if compiled is not None:
+        compiled["mmap"].close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.data.snapshot", description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="compile le contenu dans un snapshot binaire")
+    build.add_argument("--output", "-o", type=Path, default=DEFAULT_SNAPSHOT_PATH)
+    info = sub.add_parser("info", help="affiche la table des sections d'un snapshot")
+    info.add_argument("path", type=Path, nargs="?", default=DEFAULT_SNAPSHOT_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        result = build_snapshot(args.output)
+        print(json.dumps(result, indent=2))
+        return 0
+    try:
+        with open(args.path, "rb") as f:
+            toc = read_table(f.read())
+    except (OSError, SnapshotError) as exc:
+        print(f"Snapshot invalide : {exc}", file=sys.stderr)
+        return 1
+    print(json.dumps(toc, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
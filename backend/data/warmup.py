@@ -0,0 +1,113 @@
+"""
+Préchauffage du contenu Markdown en parallèle (optionnel).
+
+Le parsing du front matter et le rendu Markdown sont du Python pur, liés au CPU : au
+démarrage, les fichiers de iter_markdown_post_files() sont répartis sur un
+ProcessPoolExecutor, puis les résultats alimentent le cache de parsing du loader et le
+cache HTML de blog_posts. Le snapshot d'articles est ensuite fusionné sans aucun parse.
+
+Usage :
+    python -m backend.data.warmup [--workers auto] [--no-render]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from backend.data import blog_posts, loader
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_workers(value: str | int | None) -> int:
+    """"auto" -> nombre de CPU ; 0 ou vide -> préchauffage désactivé."""
+    if value is None:
+        return 0
+    text = str(value).strip().lower()
+    if text == "auto":
+        return os.cpu_count() or 1
+    return max(int(text or 0), 0)
+
+
+def _parse_and_render(path_str: str, render: bool) -> tuple[str, tuple[int, int], dict | None, str | None]:
+    """Travail d'un fichier (exécuté dans un worker) : (clé, signature, ligne, HTML)."""
+    path = Path(path_str)
+    try:
+        st = path.stat()
+        sig = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        sig = (0, -1)
+    row = blog_posts.parse_markdown_article(path)
+    html = None
+    if row is not None and render:
+        body = blog_posts.read_markdown_body(path, row["_body_offset"])
+        html = blog_posts.markdown_body_to_html(body) if body is not None else None
+    return str(path.resolve()), sig, row, html
+
+
+def _run_tasks(paths: list[str], workers: int, render: bool):
+    if workers <= 1 or len(paths) < 2:
+        return [_parse_and_render(p, render) for p in paths]
+    # Lots assez gros pour amortir le pickling, assez petits pour équilibrer la charge.
+    chunksize = max(1, len(paths) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_parse_and_render, paths, [render] * len(paths), chunksize=chunksize))
+
+
+def warm_content(workers: int = 1, render: bool = True) -> dict[str, Any]:
+    """
+    Parse (et rend si `render`) les fichiers Markdown absents ou périmés des caches,
+    sur `workers` processus, puis construit le snapshot d'articles.
+    """
+    started = time.perf_counter()
+    paths: list[str] = []
+    for p in blog_posts.iter_markdown_post_files():
+        key = str(p.resolve())
+        try:
+            st = p.stat()
+            sig = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            continue
+        cached = loader._MD_PARSE_CACHE.get(key)
+        if cached is None or cached[0] != sig:
+            paths.append(str(p))
+
+    html_cache = blog_posts._HTML_CACHE["current"]
+    rendered = 0
+    for key, sig, row, html in _run_tasks(paths, workers, render):
+        loader._MD_PARSE_CACHE[key] = (sig, loader._freeze(row) if row else None)
+        if html is not None:
+            html_cache.put(key, sig[0], html)
+            rendered += 1
+    parsed_at = time.perf_counter()
+
+    rows = loader._all_article_rows()
+    return {
+        "workers": max(workers, 1),
+        "files": len(paths),
+        "rendered": rendered,
+        "articles": len(rows),
+        "parse_seconds": round(parsed_at - started, 3),
+        "total_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.data.warmup", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", default="auto", help="nombre de processus ou 'auto' (défaut)")
+    parser.add_argument("--no-render", action="store_true", help="parse seulement, sans rendu HTML")
+    args = parser.parse_args(argv)
+    result = warm_content(workers=resolve_workers(args.workers), render=not args.no_render)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
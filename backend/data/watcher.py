@@ -0,0 +1,138 @@
+"""
+Surveillance du contenu en tâche de fond (optionnelle).
+
+Modes :
+- "poll"     : un seul thread recalcule les fingerprints toutes les `interval` secondes ;
+- "watchdog" : événements inotify/FSEvents via le paquet `watchdog` (repli sur "poll" s'il est absent).
+
+L'état calculé est publié dans le loader : les requêtes lisent les fingerprints en mémoire
+au lieu de parcourir POSTS_ROOTS et de sonder les dossiers data à chaque appel.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any
+
+from backend.data import loader
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object  # type: ignore
+    Observer = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+WATCH_MODES = ("off", "poll", "watchdog")
+
+
+class _WakeHandler(FileSystemEventHandler):  # type: ignore[misc]
+    def __init__(self, wake: threading.Event) -> None:
+        super().__init__()
+        self._wake = wake
+
+    def on_any_event(self, event: Any) -> None:
+        self._wake.set()
+
+
+class ContentWatcher:
+    def __init__(self, mode: str = "poll", interval: float = 2.0) -> None:
+        if mode == "watchdog" and Observer is None:
+            logger.warning("watchdog non installé : repli sur le mode poll")
+            mode = "poll"
+        self.mode = mode
+        self.interval = max(float(interval), 0.01)
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._observer: Any = None
+        self.stats: dict[str, Any] = {"scans": 0, "changes": 0, "last_scan_ms": 0.0}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def refresh(self) -> bool:
+        """Un parcours disque ; publie l'état et retourne True s'il a changé."""
+        started = time.perf_counter()
+        changed = loader.set_watched_state(loader.scan_content_state())
+        self.stats["scans"] += 1
+        self.stats["last_scan_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        if changed:
+            self.stats["changes"] += 1
+        return changed
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self.refresh()
+        if self.mode == "watchdog":
+            self._start_observer()
+        self._thread = threading.Thread(target=self._run, name="content-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        loader.set_watched_state(None)
+
+    def _start_observer(self) -> None:
+        from backend.data.blog_posts import POSTS_ROOTS
+
+        observer = Observer()
+        handler = _WakeHandler(self._wake)
+        roots = [r for r in POSTS_ROOTS if r.is_dir()] + [loader._scan_data_dir()]
+        for root in dict.fromkeys(roots):
+            if root.is_dir():
+                observer.schedule(handler, str(root), recursive=True)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+
+    def _run(self) -> None:
+        # En mode watchdog, on ne se réveille que sur événement (ou arrêt).
+        timeout = None if self.mode == "watchdog" else self.interval
+        while not self._stop.is_set():
+            self._wake.wait(timeout)
+            if self._stop.is_set():
+                break
+            self._wake.clear()
+            try:
+                self.refresh()
+            except Exception:  # pragma: no cover - ne jamais tuer le thread
+                logger.exception("Échec du rafraîchissement du contenu")
+
+
+_WATCHER: dict[str, ContentWatcher | None] = {"current": None}
+
+
+def start_content_watcher(mode: str, interval: float = 2.0) -> ContentWatcher | None:
+    """Démarre le watcher global (mode "off" : rien, fingerprints calculés par requête)."""
+    mode = (mode or "off").strip().lower()
+    if mode == "inotify":
+        mode = "watchdog"
+    if mode not in WATCH_MODES or mode == "off":
+        return None
+    stop_content_watcher()
+    watcher = ContentWatcher(mode=mode, interval=interval)
+    watcher.start()
+    _WATCHER["current"] = watcher
+    return watcher
+
+
+def stop_content_watcher() -> None:
+    watcher = _WATCHER["current"]
+    if watcher is not None:
+        watcher.stop()
+        _WATCHER["current"] = None
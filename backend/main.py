@@ -2,6 +2,7 @@
 Backend FastAPI — API REST pour le portfolio.
 Point d'entrée : uvicorn backend.main:app --reload --port 8080
 """
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request
@@ -11,7 +12,11 @@ from fastapi.responses import FileResponse, JSONResponse
 
 from backend.config import get_settings
 from backend.data.loader import get_data_source_info
-from backend.rate_limiter import rate_limit_middleware
+from backend.data.prerender import PrerenderedMiddleware, activate_prerendered, active_prerendered
+from backend.data.snapshot import activate_snapshot, deactivate_snapshot
+from backend.data.warmup import resolve_workers, warm_content
+from backend.data.watcher import start_content_watcher, stop_content_watcher
+from backend.rate_limiter import RateLimiter, RateLimitMiddleware
 from backend.routers import api_v1, health
 
 settings = get_settings()
@@ -19,14 +24,40 @@ BACKEND_DIR = Path(__file__).resolve().parent
 BACKEND_INDEX = BACKEND_DIR / "index.html"
 BACKEND_MONITORING = BACKEND_DIR / "monitoring.html"
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Snapshot précompilé (mmap) si configuré, sinon sources YAML/Markdown.
+    compiled = activate_snapshot(settings.CONTENT_SNAPSHOT_PATH)
+    # Sans snapshot : parsing/rendu Markdown répartis sur plusieurs processus avant la 1re requête.
+    workers = resolve_workers(settings.CONTENT_WARMUP_WORKERS)
+    if workers and not compiled:
+        warm_content(workers=workers)
+    # Artefacts pré-rendus : servis seulement s'ils correspondent à la version du contenu.
+    activate_prerendered(settings.CONTENT_PRERENDER_DIR, settings.CONTENT_WATCH_INTERVAL)
+    # Watcher optionnel : fingerprints du contenu maintenus hors du chemin de requête.
+    start_content_watcher(settings.CONTENT_WATCH_MODE, settings.CONTENT_WATCH_INTERVAL)
+    try:
+        yield
+    finally:
+        stop_content_watcher()
+        await _limiter.aclose()
+        activate_prerendered(None)
+        deactivate_snapshot()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     description="API REST du portfolio (articles, projets, expériences)",
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
+# Artefacts pré-rendus (ASGI pur) : lectures de contenu inchangé servies depuis le fichier
+app.add_middleware(PrerenderedMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS_LIST,
@@ -35,21 +66,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Rate limiting middleware (global + IP + endpoint)
-_rl_mw = rate_limit_middleware(settings)
-app.middleware("http")(_rl_mw)
+# Rate limiting middleware (global + IP + endpoint), ASGI pur
+_limiter = RateLimiter(settings)
+app.add_middleware(RateLimitMiddleware, limiter=_limiter)
 
 app.include_router(health.router, tags=["health"])
 app.include_router(api_v1.router, prefix="/api/v1", tags=["api"])
 
 
 @app.get("/api/rate-limit", tags=["rate-limit"])
-def rate_limit_status(request: Request):
-    limiter = getattr(_rl_mw, "limiter", None)
-    if limiter is None:
-        return {"rate_limits": {}, "backend": "unknown", "client_ip": "unknown"}
+async def rate_limit_status(request: Request):
+    limiter = _limiter
     ip = limiter.get_client_ip(request)
-    decisions, endpoint_tier = limiter.check_with_context(request)
+    # Lecture seule : consulter le statut ne consomme pas de quota.
+    decisions, endpoint_tier = await limiter.peek_with_context_async(request)
     return {
         "rate_limits": {
             k: {
@@ -62,6 +92,9 @@ def rate_limit_status(request: Request):
             for k, v in decisions.items()
         },
         "backend": limiter.backend,
+        "storage": await limiter.storage.stats_async(),
+        "fallbacks": limiter.fallbacks,
+        "global_counter": limiter.global_counter.stats() if limiter.global_counter else None,
         "client_ip": ip,
         "endpoint_limit_type": endpoint_tier,
     }
@@ -86,4 +119,5 @@ def debug_data_source():
     # Endpoint de debug limité aux environnements non production.
     if settings.is_production:
         raise HTTPException(status_code=404, detail="Not found")
-    return get_data_source_info()
+    artifacts = active_prerendered()
+    return {**get_data_source_info(), "prerendered": artifacts.stats if artifacts else None}
@@ -14,26 +14,38 @@ from dataclasses import dataclass
 from backend.config import Settings
 
 
+# fixed: fixed window (+ burst); sliding: two-bucket sliding window; gcra: one timestamp per key.
+ALGORITHMS = ("fixed", "sliding", "gcra")
+
+
 @dataclass(frozen=True)
 class Limit:
     requests: int
     window_seconds: int
     burst: int
+    algorithm: str = "fixed"
 
 
 def _scale(limit: Limit, multiplier: float) -> Limit:
     req = max(int(limit.requests * multiplier), 1)
     burst = max(int(limit.burst * multiplier), 0)
-    return Limit(requests=req, window_seconds=limit.window_seconds, burst=burst)
+    return Limit(requests=req, window_seconds=limit.window_seconds, burst=burst, algorithm=limit.algorithm)
+
+
+def _algorithm(settings: Settings, tier: str) -> str:
+    name = (getattr(settings, f"RATE_LIMIT_{tier.upper()}_ALGORITHM") or settings.RATE_LIMIT_ALGORITHM).strip().lower()
+    if name not in ALGORITHMS:
+        raise ValueError(f"Unknown rate limit algorithm for {tier}: {name!r} (expected one of {', '.join(ALGORITHMS)})")
+    return name
 
 
 def get_limits(settings: Settings) -> dict[str, Limit]:
     mult = settings.rate_limit_multiplier
     base = {
-        "global": Limit(settings.RATE_LIMIT_GLOBAL_REQUESTS, settings.RATE_LIMIT_GLOBAL_WINDOW, settings.RATE_LIMIT_GLOBAL_BURST),
-        "ip": Limit(settings.RATE_LIMIT_IP_REQUESTS, settings.RATE_LIMIT_IP_WINDOW, settings.RATE_LIMIT_IP_BURST),
-        "chat": Limit(settings.RATE_LIMIT_CHAT_REQUESTS, settings.RATE_LIMIT_CHAT_WINDOW, settings.RATE_LIMIT_CHAT_BURST),
-        "search": Limit(settings.RATE_LIMIT_SEARCH_REQUESTS, settings.RATE_LIMIT_SEARCH_WINDOW, settings.RATE_LIMIT_SEARCH_BURST),
-        "upload": Limit(settings.RATE_LIMIT_UPLOAD_REQUESTS, settings.RATE_LIMIT_UPLOAD_WINDOW, settings.RATE_LIMIT_UPLOAD_BURST),
+        "global": Limit(settings.RATE_LIMIT_GLOBAL_REQUESTS, settings.RATE_LIMIT_GLOBAL_WINDOW, settings.RATE_LIMIT_GLOBAL_BURST, _algorithm(settings, "global")),
+        "ip": Limit(settings.RATE_LIMIT_IP_REQUESTS, settings.RATE_LIMIT_IP_WINDOW, settings.RATE_LIMIT_IP_BURST, _algorithm(settings, "ip")),
+        "chat": Limit(settings.RATE_LIMIT_CHAT_REQUESTS, settings.RATE_LIMIT_CHAT_WINDOW, settings.RATE_LIMIT_CHAT_BURST, _algorithm(settings, "chat")),
+        "search": Limit(settings.RATE_LIMIT_SEARCH_REQUESTS, settings.RATE_LIMIT_SEARCH_WINDOW, settings.RATE_LIMIT_SEARCH_BURST, _algorithm(settings, "search")),
+        "upload": Limit(settings.RATE_LIMIT_UPLOAD_REQUESTS, settings.RATE_LIMIT_UPLOAD_WINDOW, settings.RATE_LIMIT_UPLOAD_BURST, _algorithm(settings, "upload")),
     }
     return {k: (_scale(v, mult) if not settings.is_production else v) for k, v in base.items()}
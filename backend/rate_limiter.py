@@ -2,7 +2,8 @@
 FastAPI rate limiter (global + per-IP + per-endpoint).
 
 Backends:
-- Redis (recommended for prod) via `redis` package
+- Redis (recommended for prod) via `redis` package; `redis.asyncio` from the middleware
+- SQLite file in WAL mode, shared by the worker processes of one host (no Redis)
 - In-memory fallback (dev/testing)
 
 Features:
@@ -13,8 +14,16 @@ Features:
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import itertools
+import logging
+import os
+import sqlite3
+import sys
+import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Any, Optional
 
@@ -23,12 +32,24 @@ try:
 except Exception:  # pragma: no cover
     redis = None  # type: ignore
 
+try:
+    import redis.asyncio as redis_asyncio  # type: ignore
+except Exception:  # pragma: no cover
+    redis_asyncio = None  # type: ignore
+
 from fastapi import Request
-from starlette.responses import Response, JSONResponse
+from starlette.responses import Response
 
 from backend.config import Settings
 from backend.rate_limit_config import Limit, get_limits
 
+logger = logging.getLogger(__name__)
+
+# Errors that trigger the configured fallback instead of a 500.
+_STORAGE_ERRORS: tuple[type[BaseException], ...] = (asyncio.TimeoutError, OSError, sqlite3.Error)
+if redis is not None:
+    _STORAGE_ERRORS += (redis.RedisError,)
+
 
 @dataclass
 class Decision:
@@ -40,8 +61,12 @@ class Decision:
     retry_after: int
 
 
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
 def _now() -> int:
-    return int(time.time())
+    return _now_ms() // 1000
 
 
 def _window_key(window_seconds: int, ts: int) -> int:
@@ -52,40 +77,675 @@ def _hash_ip(ip: str) -> str:
     return hashlib.sha256(ip.encode("utf-8")).hexdigest()[:16]
 
 
+@dataclass(frozen=True)
+class Hit:
+    """
+    One tier's storage operation; every kind answers a pair of ints:
+    - "fixed":   INCRBY key `amount` (TTL `a` seconds on first hit) -> (count, ttl remaining)
+    - "sliding": same on the current window key, read `prev_key`  -> (current count, previous count)
+    - "gcra":    theoretical arrival time in key, emission interval `a` ms,
+                 burst tolerance `b` ms; stored only when allowed  -> (allowed 0/1, TAT in ms)
+    """
+
+    kind: str
+    key: str
+    a: int
+    b: int = 0
+    prev_key: str = ""
+    amount: int = 1
+
+
 class Storage:
-    def incr(self, key: str, ttl_seconds: int) -> int:
+    def hit_many(self, hits: list[Hit], now_ms: int) -> list[tuple[int, int]]:
         raise NotImplementedError
 
+    async def hit_many_async(self, hits: list[Hit], now_ms: int) -> list[tuple[int, int]]:
+        """Awaitable variant used by the middleware; in-process storages answer inline."""
+        return self.hit_many(hits, now_ms)
 
-class MemoryStorage(Storage):
-    def __init__(self) -> None:
-        self._data: dict[str, tuple[int, int]] = {}  # key -> (count, expires_at)
+    def read_many(self, keys: list[str], now_ms: int) -> list[int]:
+        """Current values (0 if absent or expired), without writing."""
+        raise NotImplementedError
+
+    async def read_many_async(self, keys: list[str], now_ms: int) -> list[int]:
+        return self.read_many(keys, now_ms)
+
+    def peek(self, hits: list[Hit], now_ms: int) -> list[tuple[int, int]]:
+        """What hit_many would answer now, without writing (one read_many: GET/MGET in Redis)."""
+        return _peek_pairs(hits, self.read_many(_peek_keys(hits), now_ms), now_ms)
+
+    async def peek_async(self, hits: list[Hit], now_ms: int) -> list[tuple[int, int]]:
+        return _peek_pairs(hits, await self.read_many_async(_peek_keys(hits), now_ms), now_ms)
+
+    def incr_many(self, items: list[tuple[str, int]]) -> list[tuple[int, int]]:
+        """Increment several (key, ttl_seconds) counters; returns (count, ttl remaining) per key."""
+        return self.hit_many([Hit("fixed", key, ttl) for key, ttl in items], _now_ms())
 
     def incr(self, key: str, ttl_seconds: int) -> int:
-        ts = _now()
-        count, exp = self._data.get(key, (0, ts + ttl_seconds))
-        if exp <= ts:
-            count, exp = 0, ts + ttl_seconds
-        count += 1
-        self._data[key] = (count, exp)
-        return count
+        return self.incr_many([(key, ttl_seconds)])[0][0]
+
+    def stats(self) -> dict[str, Any]:
+        return {}
+
+    async def stats_async(self) -> dict[str, Any]:
+        return self.stats()
+
+
+def _peek_keys(hits: list[Hit]) -> list[str]:
+    return [k for hit in hits for k in ((hit.key, hit.prev_key) if hit.kind == "sliding" else (hit.key,))]
+
+
+def _peek_pairs(hits: list[Hit], values: list[int], now_ms: int) -> list[tuple[int, int]]:
+    """Replies of hit_many computed from stored values (counter, previous counter or TAT)."""
+    out = []
+    it = iter(values)
+    for hit in hits:
+        value = next(it)
+        if hit.kind == "gcra":
+            tat = max(value or now_ms, now_ms)
+            out.append((0, tat) if tat - now_ms > hit.b else (1, tat + hit.a))
+        elif hit.kind == "sliding":
+            out.append((value + hit.amount, next(it)))
+        else:
+            out.append((value + hit.amount, hit.a))
+    return out
+
+
+# Approximate per-entry overhead (OrderedDict node, list, set slot) for the bytes gauge.
+_ENTRY_OVERHEAD_BYTES = 200
+
+
+class MemoryStorage(Storage):
+    """
+    In-process counters, bounded in memory.
+
+    Entries are grouped in buckets by expiry time (= end of their window); a bucket is
+    dropped wholesale once expired. On top of that, a hard cap on the number of entries
+    evicts the least recently used key. Safe to call from the threadpool handlers.
+    """
+
+    def __init__(self, max_entries: int = 100_000) -> None:
+        self.max_entries = max(int(max_entries), 1)
+        self._data: OrderedDict[str, list[int]] = OrderedDict()  # key -> [value, expires_at], LRU order
+        self._buckets: dict[int, set[str]] = {}  # expires_at -> keys
+        self._next_expiry: int | None = None
+        self._bytes = 0
+        self._evictions = 0
+        self._expired = 0
+        self._lock = threading.Lock()
+
+    def hit_many(self, hits: list[Hit], now_ms: int) -> list[tuple[int, int]]:
+        ts = now_ms // 1000
+        out = []
+        with self._lock:
+            if self._next_expiry is not None and self._next_expiry <= ts:
+                self._drop_expired(ts)
+            for hit in hits:
+                entry = self._live(hit.key, ts)
+                if hit.kind == "gcra":
+                    tat = max(entry[0] if entry is not None else now_ms, now_ms)
+                    if tat - now_ms > hit.b:
+                        out.append((0, tat))
+                        continue
+                    tat += hit.a
+                    if entry is not None:
+                        self._remove(hit.key)
+                    self._add(hit.key, [tat, -(-tat // 1000)])
+                    out.append((1, tat))
+                    continue
+                if entry is None:
+                    entry = [0, ts + hit.a]
+                    self._add(hit.key, entry)
+                else:
+                    self._data.move_to_end(hit.key)
+                entry[0] += hit.amount
+                if hit.kind == "sliding":
+                    prev = self._live(hit.prev_key, ts)
+                    out.append((entry[0], prev[0] if prev is not None else 0))
+                else:
+                    out.append((entry[0], entry[1] - ts))
+        return out
+
+    def read_many(self, keys: list[str], now_ms: int) -> list[int]:
+        ts = now_ms // 1000
+        with self._lock:
+            out = []
+            for key in keys:
+                entry = self._data.get(key)
+                out.append(entry[0] if entry is not None and entry[1] > ts else 0)
+            return out
+
+    def _live(self, key: str, ts: int) -> list[int] | None:
+        entry = self._data.get(key)
+        if entry is not None and entry[1] <= ts:
+            self._remove(key)
+            return None
+        return entry
+
+    def _add(self, key: str, entry: list[int]) -> None:
+        while len(self._data) >= self.max_entries:
+            self._remove(next(iter(self._data)))
+            self._evictions += 1
+        self._data[key] = entry
+        self._buckets.setdefault(entry[1], set()).add(key)
+        self._bytes += sys.getsizeof(key) + _ENTRY_OVERHEAD_BYTES
+        if self._next_expiry is None or entry[1] < self._next_expiry:
+            self._next_expiry = entry[1]
+
+    def _remove(self, key: str) -> None:
+        _value, expires_at = self._data.pop(key)
+        bucket = self._buckets.get(expires_at)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[expires_at]
+        self._bytes -= sys.getsizeof(key) + _ENTRY_OVERHEAD_BYTES
+
+    def _drop_expired(self, ts: int) -> None:
+        for expires_at in [e for e in self._buckets if e <= ts]:
+            for key in self._buckets.pop(expires_at):
+                del self._data[key]
+                self._bytes -= sys.getsizeof(key) + _ENTRY_OVERHEAD_BYTES
+                self._expired += 1
+        self._next_expiry = min(self._buckets) if self._buckets else None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "buckets": len(self._buckets),
+                "evictions": self._evictions,
+                "expired": self._expired,
+            }
+
+
+class SQLiteStorage(Storage):
+    """
+    Counters in a SQLite file (WAL mode), shared by every worker process on the host.
+
+    One connection per thread; each call runs in a single BEGIN IMMEDIATE transaction,
+    so the read-modify-write of every hit is atomic across processes. Expired rows are
+    swept at most once per second. The async variants run in a worker thread: waiting
+    on another process's write lock (up to `busy_timeout`) never blocks the event loop.
+    The row count is kept in the `meta` table by the same transactions (no COUNT scan).
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 1.0) -> None:
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.busy_timeout = busy_timeout
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._local = threading.local()
+        self._last_sweep = 0
+        self._swept = 0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters ("
+            "key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS counters_expires_at ON counters (expires_at)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID")
+        conn.execute("INSERT OR IGNORE INTO meta VALUES ('entries', (SELECT COUNT(*) FROM counters))")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit: transactions are explicit (BEGIN IMMEDIATE).
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            # Counters are disposable: no fsync on commit.
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _get(conn: sqlite3.Connection, key: str, ts: int) -> int | None:
+        row = conn.execute("SELECT value FROM counters WHERE key = ? AND expires_at > ?", (key, ts)).fetchone()
+        return row[0] if row is not None else None
+
+    @staticmethod
+    def _row(conn: sqlite3.Connection, key: str) -> tuple[int, int] | None:
+        """(value, expires_at) even if expired: an expired row is replaced, not added."""
+        return conn.execute("SELECT value, expires_at FROM counters WHERE key = ?", (key,)).fetchone()
+
+    def hit_many(self, hits: list[Hit], now_ms: int) -> list[tuple[int, int]]:
+        ts = now_ms // 1000
+        conn = self._conn()
+        out = []
+        added = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if ts > self._last_sweep:
+                swept = conn.execute("DELETE FROM counters WHERE expires_at <= ?", (ts,)).rowcount
+                self._swept += swept
+                added -= swept
+                self._last_sweep = ts
+            for hit in hits:
+                row = self._row(conn, hit.key)
+                live = row is not None and row[1] > ts
+                if hit.kind == "gcra":
+                    tat = max(row[0] if live else now_ms, now_ms)
+                    if tat - now_ms > hit.b:
+                        out.append((0, tat))
+                        continue
+                    tat += hit.a
+                    conn.execute("INSERT OR REPLACE INTO counters VALUES (?, ?, ?)", (hit.key, tat, -(-tat // 1000)))
+                    added += row is None
+                    out.append((1, tat))
+                    continue
+                count, expires_at = (row[0] + hit.amount, row[1]) if live else (hit.amount, ts + hit.a)
+                conn.execute("INSERT OR REPLACE INTO counters VALUES (?, ?, ?)", (hit.key, count, expires_at))
+                added += row is None
+                if hit.kind == "sliding":
+                    out.append((count, self._get(conn, hit.prev_key, ts) or 0))
+                else:
+                    out.append((count, expires_at - ts))
+            if added:
+                conn.execute("UPDATE meta SET value = value + ? WHERE name = 'entries'", (added,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return out
+
+    async def hit_many_async(self, hits: list[Hit], now_ms: int) -> list[tuple[int, int]]:
+        return await asyncio.to_thread(self.hit_many, hits, now_ms)
+
+    def read_many(self, keys: list[str], now_ms: int) -> list[int]:
+        conn = self._conn()
+        ts = now_ms // 1000
+        return [self._get(conn, key, ts) or 0 for key in keys]
+
+    async def read_many_async(self, keys: list[str], now_ms: int) -> list[int]:
+        return await asyncio.to_thread(self.read_many, keys, now_ms)
+
+    def stats(self) -> dict[str, Any]:
+        """Rows (including expired ones not swept yet) and main file size, both O(1)."""
+        conn = self._conn()
+        entries = conn.execute("SELECT value FROM meta WHERE name = 'entries'").fetchone()[0]
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return {"entries": entries, "bytes": pages * page_size, "expired": self._swept}
+
+    async def stats_async(self) -> dict[str, Any]:
+        return await asyncio.to_thread(self.stats)
+
+
+# All tiers in one atomic round trip (see Hit for the semantics of each kind).
+# KEYS: 2 per hit (key, previous window key); ARGV[1] = now (ms), then 4 per hit: kind, a, b, amount.
+_HIT_MANY_LUA = """
+local now = tonumber(ARGV[1])
+local out = {}
+for i = 1, #KEYS / 2 do
+    local key = KEYS[2 * i - 1]
+    local kind = ARGV[4 * i - 2]
+    local a = tonumber(ARGV[4 * i - 1])
+    local b = tonumber(ARGV[4 * i])
+    if kind == 'gcra' then
+        local tat = tonumber(redis.call('GET', key) or now)
+        if tat < now then tat = now end
+        if tat - now <= b then
+            tat = tat + a
+            redis.call('SET', key, tat, 'PX', tat - now)
+            out[#out + 1] = 1
+        else
+            out[#out + 1] = 0
+        end
+        out[#out + 1] = tat
+    else
+        local count = redis.call('INCRBY', key, ARGV[4 * i + 1])
+        local ttl = redis.call('TTL', key)
+        if ttl < 0 then
+            ttl = a
+            redis.call('EXPIRE', key, ttl)
+        end
+        out[#out + 1] = count
+        if kind == 'sliding' then
+            out[#out + 1] = tonumber(redis.call('GET', KEYS[2 * i]) or 0)
+        else
+            out[#out + 1] = ttl
+        end
+    end
+end
+return out
+"""
+
+REDIS_MODES = ("script", "pipeline")
 
 
 class RedisStorage(Storage):
-    def __init__(self, url: str) -> None:
-        if redis is None:
-            raise RuntimeError("redis package not available")
-        self._client = redis.Redis.from_url(url, decode_responses=True)
+    """
+    Redis counters. mode="script" (default) evaluates every tier in a single EVALSHA
+    (script loaded once and cached by SHA); mode="pipeline" sends the reads/INCRs for all
+    tiers in one pipeline, plus one round trip for EXPIREs and GCRA writes (the GCRA
+    read-then-write is not atomic in this mode).
+    """
 
-    def incr(self, key: str, ttl_seconds: int) -> int:
-        # INCR + set expiry on first hit
+    def __init__(self, url: str, mode: str = "script", client: Any = None) -> None:
+        if client is None:
+            if redis is None:
+                raise RuntimeError("redis package not available")
+            client = redis.Redis.from_url(url, decode_responses=True)
+        if mode not in REDIS_MODES:
+            raise ValueError(f"unknown redis mode: {mode}")
+        self._client = client
+        self.mode = mode
+        # redis-py Script: EVALSHA, with SCRIPT LOAD on NOSCRIPT (e.g. after a Redis restart).
+        self._hit_many_script = client.register_script(_HIT_MANY_LUA) if mode == "script" else None
+
+    def hit_many(self, hits: list[Hit], now_ms: int) -> list[tuple[int, int]]:
+        if self._hit_many_script is not None:
+            keys, args = _script_call(hits, now_ms)
+            return _script_pairs(self._hit_many_script(keys=keys, args=args))
         pipe = self._client.pipeline()
-        pipe.incr(key)
-        pipe.ttl(key)
-        value, ttl = pipe.execute()
-        if ttl == -1:
-            self._client.expire(key, ttl_seconds)
-        return int(value)
+        _queue_hits(pipe, hits)
+        out, followups = _pipeline_pairs(hits, pipe.execute(), now_ms)
+        if followups:
+            pipe = self._client.pipeline()
+            _queue_followups(pipe, followups)
+            pipe.execute()
+        return out
+
+    def read_many(self, keys: list[str], now_ms: int) -> list[int]:
+        return [int(v or 0) for v in self._client.mget(keys)]
+
+
+class AsyncRedisStorage(Storage):
+    """
+    Same protocol as RedisStorage on a `redis.asyncio` client: the event loop keeps
+    serving other requests while Redis answers. One connection pool per storage,
+    shared by every request of the worker.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        mode: str = "script",
+        client: Any = None,
+        timeout: float | None = None,
+        max_connections: int = 50,
+    ) -> None:
+        if client is None:
+            if redis_asyncio is None:
+                raise RuntimeError("redis.asyncio not available")
+            pool = redis_asyncio.ConnectionPool.from_url(url, decode_responses=True, max_connections=max_connections)
+            client = redis_asyncio.Redis(connection_pool=pool)
+        if mode not in REDIS_MODES:
+            raise ValueError(f"unknown redis mode: {mode}")
+        self._client = client
+        self.mode = mode
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._hit_many_script = client.register_script(_HIT_MANY_LUA) if mode == "script" else None
+
+    def hit_many(self, hits: list[Hit], now_ms: int) -> list[tuple[int, int]]:
+        raise RuntimeError("AsyncRedisStorage is async-only: use RateLimiter.check_with_context_async")
+
+    async def hit_many_async(self, hits: list[Hit], now_ms: int) -> list[tuple[int, int]]:
+        if self._hit_many_script is not None:
+            keys, args = _script_call(hits, now_ms)
+            return _script_pairs(await self._hit_many_script(keys=keys, args=args))
+        async with self._client.pipeline() as pipe:
+            _queue_hits(pipe, hits)
+            out, followups = _pipeline_pairs(hits, await pipe.execute(), now_ms)
+            if followups:
+                _queue_followups(pipe, followups)
+                await pipe.execute()
+        return out
+
+    async def read_many_async(self, keys: list[str], now_ms: int) -> list[int]:
+        return [int(v or 0) for v in await self._client.mget(keys)]
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "timeout_ms": int(self.timeout * 1000) if self.timeout else None,
+            "max_connections": self.max_connections,
+        }
+
+
+def _script_call(hits: list[Hit], now_ms: int) -> tuple[list[str], list[Any]]:
+    keys: list[str] = []
+    args: list[Any] = [now_ms]
+    for hit in hits:
+        keys += [hit.key, hit.prev_key or hit.key]
+        args += [hit.kind, hit.a, hit.b, hit.amount]
+    return keys, args
+
+
+def _script_pairs(reply: list[Any]) -> list[tuple[int, int]]:
+    """Flat [x, y, x, y, ...] script reply -> (x, y) pairs."""
+    return [(int(reply[i]), int(reply[i + 1])) for i in range(0, len(reply), 2)]
+
+
+def _queue_hits(pipe: Any, hits: list[Hit]) -> None:
+    for hit in hits:
+        if hit.kind == "gcra":
+            pipe.get(hit.key)
+            continue
+        pipe.incrby(hit.key, hit.amount)
+        pipe.ttl(hit.key)
+        if hit.kind == "sliding":
+            pipe.get(hit.prev_key)
+
+
+def _pipeline_pairs(hits: list[Hit], reply: list[Any], now_ms: int) -> tuple[list[tuple[int, int]], list[tuple[str, str, int, int]]]:
+    """Pipeline reply -> pairs (same as the script) and the writes left to send: (op, key, value, ttl)."""
+    out: list[tuple[int, int]] = []
+    followups: list[tuple[str, str, int, int]] = []
+    i = 0
+    for hit in hits:
+        if hit.kind == "gcra":
+            tat = max(int(reply[i] or now_ms), now_ms)
+            i += 1
+            if tat - now_ms > hit.b:
+                out.append((0, tat))
+            else:
+                tat += hit.a
+                followups.append(("set", hit.key, tat, tat - now_ms))
+                out.append((1, tat))
+            continue
+        count, ttl = int(reply[i]), int(reply[i + 1])
+        i += 2
+        if ttl < 0:
+            followups.append(("expire", hit.key, 0, hit.a))
+            ttl = hit.a
+        if hit.kind == "sliding":
+            out.append((count, int(reply[i] or 0)))
+            i += 1
+        else:
+            out.append((count, ttl))
+    return out, followups
+
+
+def _queue_followups(pipe: Any, followups: list[tuple[str, str, int, int]]) -> None:
+    for op, key, value, ttl in followups:
+        if op == "set":
+            pipe.set(key, value, px=ttl)
+        else:
+            pipe.expire(key, ttl)
+
+
+class GlobalCounter:
+    """
+    Global tier (fixed window) spread over `shards` keys, reserved `lease` units at a time.
+
+    Each storage round trip adds `lease` units to one shard (round robin) and the worker
+    hands them out locally until they run out. The total is estimated as shard count x
+    shards; once that estimate, or the last known total, reaches `SUM_MARGIN` of the
+    limit, every reservation sums the shards exactly (one extra read). Trade-off: up to
+    `lease` - 1 unused units per worker and window, and admissions based on the
+    estimate below the margin, so shards skewed by more than the margin can still let
+    a few requests past the limit.
+    """
+
+    SUM_MARGIN = 0.8
+
+    def __init__(self, limit: Limit, shards: int = 1, lease: int = 1) -> None:
+        if limit.algorithm != "fixed":
+            raise ValueError("RATE_LIMIT_GLOBAL_SHARDS / RATE_LIMIT_GLOBAL_LEASE require the fixed algorithm")
+        self.limit = limit
+        self.capacity = limit.requests + limit.burst
+        self.shards = max(int(shards), 1)
+        self.lease = max(int(lease), 1)
+        self._next_shard = itertools.count()
+        self._lock = threading.Lock()
+        self._window: int | None = None
+        self._tokens = 0  # reserved units not handed out yet
+        self._total = 0  # last known units reserved by every worker
+        self._stats = {"local": 0, "reservations": 0, "sums": 0, "denied": 0}
+
+    def _roll(self, w: int) -> None:
+        if w != self._window:
+            self._window, self._tokens, self._total = w, 0, 0
+
+    def take_local(self, now_ms: int) -> Decision | None:
+        """Decision from the local lease, or None when a reservation is needed."""
+        ts = now_ms // 1000
+        with self._lock:
+            self._roll(_window_key(self.limit.window_seconds, ts))
+            if self._tokens <= 0:
+                return None
+            self._tokens -= 1
+            self._stats["local"] += 1
+            return self._decision(True, ts)
+
+    def hit(self, now_ms: int) -> Hit:
+        ts = now_ms // 1000
+        w = _window_key(self.limit.window_seconds, ts)
+        shard = next(self._next_shard) % self.shards
+        return Hit("fixed", f"rl:global:all:{w}:{shard}", max((w + 1) * self.limit.window_seconds - ts, 1), amount=self.lease)
+
+    def sum_keys(self, hit: Hit, count: int) -> list[str]:
+        """Shard keys to read once the estimate nears the limit, else []."""
+        threshold = self.capacity * self.SUM_MARGIN
+        if self.shards == 1 or max(count * self.shards, self._total) < threshold:
+            return []
+        base = hit.key.rsplit(":", 1)[0]
+        return [f"{base}:{i}" for i in range(self.shards)]
+
+    def settle(self, count: int, now_ms: int, shard_counts: list[int] | None = None) -> Decision:
+        """Decision after a reservation: `count` units on the shard, or the exact shard counts."""
+        ts = now_ms // 1000
+        total = sum(shard_counts) if shard_counts is not None else count * self.shards
+        granted = min(max(self.capacity - (total - self.lease), 0), self.lease)
+        with self._lock:
+            self._roll(_window_key(self.limit.window_seconds, ts))
+            self._total = max(self._total, total)
+            self._stats["reservations"] += 1
+            self._stats["sums"] += shard_counts is not None
+            if granted <= 0:
+                self._stats["denied"] += 1
+                return self._decision(False, ts)
+            self._tokens += granted - 1
+            return self._decision(True, ts)
+
+    def _decision(self, allowed: bool, ts: int) -> Decision:
+        reset_time = (_window_key(self.limit.window_seconds, ts) + 1) * self.limit.window_seconds
+        return Decision(
+            allowed=allowed,
+            limit=self.capacity,
+            remaining=max(self.capacity - self._total, 0) + self._tokens if allowed else 0,
+            reset_time=reset_time,
+            window_seconds=self.limit.window_seconds,
+            retry_after=0 if allowed else max(reset_time - ts, 1),
+        )
+
+    def peek_hits(self, now_ms: int) -> list[Hit]:
+        """Every shard of the current window, read as-is (amount 0)."""
+        base = self.hit(now_ms)
+        prefix = base.key.rsplit(":", 1)[0]
+        return [Hit("fixed", f"{prefix}:{i}", base.a, amount=0) for i in range(self.shards)]
+
+    def peek(self, shard_counts: list[int], now_ms: int) -> Decision:
+        """Quota left (units not reserved yet + this worker's lease), nothing consumed."""
+        ts = now_ms // 1000
+        with self._lock:
+            self._roll(_window_key(self.limit.window_seconds, ts))
+            remaining = max(self.capacity - sum(shard_counts), 0) + self._tokens
+        reset_time = (_window_key(self.limit.window_seconds, ts) + 1) * self.limit.window_seconds
+        return Decision(
+            allowed=remaining > 0,
+            limit=self.capacity,
+            remaining=remaining,
+            reset_time=reset_time,
+            window_seconds=self.limit.window_seconds,
+            retry_after=0 if remaining > 0 else max(reset_time - ts, 1),
+        )
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"shards": self.shards, "lease": self.lease, "tokens": self._tokens, **self._stats}
+
+
+# Endpoint tiers in priority order (first match wins), as (settings suffix, tier).
+_ENDPOINT_TIERS = (("UPLOAD", "upload"), ("CHAT", "chat"), ("SEARCH", "search"))
+_TIER_MEMO_MAX = 4096
+
+
+class RouteClassifier:
+    """
+    (method, path) -> endpoint tier, compiled once from the configured prefixes.
+
+    One segment trie per method: a lookup walks the path's segments, whatever the
+    number of configured prefixes. A prefix matches the path itself or any sub-path
+    ("/api/chat" matches "/api/chat" and "/api/chat/x"; "/api/search/" only the
+    latter). Results are memoised per exact (method, path), FIFO-bounded.
+    """
+
+    def __init__(self, rules: list[tuple[str, set[str], list[str]]], memo_size: int = _TIER_MEMO_MAX) -> None:
+        self._tiers = [tier for tier, _methods, _prefixes in rules]
+        # node: [children, rank if the prefix matches with nothing after it, rank for sub-paths]
+        self._tries: dict[str, list] = {}
+        for rank, (_tier, methods, prefixes) in enumerate(rules):
+            for method in methods:
+                root = self._tries.setdefault(method, [{}, None, None])
+                for prefix in prefixes:
+                    stripped = prefix.rstrip("/")
+                    node = root
+                    for segment in (stripped[1:].split("/") if stripped else ()):
+                        node = node[0].setdefault(segment, [{}, None, None])
+                    if stripped == prefix:
+                        node[1] = rank if node[1] is None else min(node[1], rank)
+                    node[2] = rank if node[2] is None else min(node[2], rank)
+        self._memo: dict[tuple[str, str], str | None] = {}
+        self._memo_lock = threading.Lock()
+        self.memo_size = memo_size
+
+    def classify(self, method: str, path: str) -> str | None:
+        key = (method, path)
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        tier = self._walk(method, path)
+        # Lock-free lookups; eviction + insert serialised (sync checks run in the threadpool).
+        with self._memo_lock:
+            while len(self._memo) >= max(self.memo_size, 1):
+                del self._memo[next(iter(self._memo))]
+            self._memo[key] = tier
+        return tier
+
+    def _walk(self, method: str, path: str) -> str | None:
+        node = self._tries.get(method)
+        if node is None or not path.startswith("/"):
+            return None
+        segments = path[1:].split("/")
+        best = None
+        for depth in range(len(segments) + 1):
+            rank = node[1] if depth == len(segments) else node[2]
+            if rank is not None and (best is None or rank < best):
+                best = rank
+            if depth == len(segments):
+                break
+            node = node[0].get(segments[depth])
+            if node is None:
+                break
+        return self._tiers[best] if best is not None else None
 
 
 class RateLimiter:
@@ -93,18 +753,47 @@ class RateLimiter:
         self.settings = settings
         self.limits = get_limits(settings)
         self.storage, self.backend = self._init_storage(settings)
+        self.fallbacks = 0
+        self.classifier = RouteClassifier([
+            (
+                tier,
+                getattr(settings, f"RATE_LIMIT_{suffix}_METHODS_SET"),
+                getattr(settings, f"RATE_LIMIT_{suffix}_PATHS_LIST"),
+            )
+            for suffix, tier in _ENDPOINT_TIERS
+        ])
+        self.global_counter: GlobalCounter | None = None
+        if settings.RATE_LIMIT_GLOBAL_SHARDS > 1 or settings.RATE_LIMIT_GLOBAL_LEASE > 1:
+            self.global_counter = GlobalCounter(
+                self.limits["global"], settings.RATE_LIMIT_GLOBAL_SHARDS, settings.RATE_LIMIT_GLOBAL_LEASE
+            )
 
     def _init_storage(self, settings: Settings) -> tuple[Storage, str]:
         url = (settings.RATE_LIMIT_STORAGE_URL or "").strip()
+        if url.startswith("sqlite:///"):
+            # Explicit choice, dev or prod: counters shared by the local worker processes.
+            return SQLiteStorage(url[len("sqlite:///"):]), "sqlite"
         if settings.is_production and url.startswith("redis"):
             try:
-                return RedisStorage(url), "redis"
+                if settings.RATE_LIMIT_REDIS_ASYNC and redis_asyncio is not None:
+                    timeout = settings.RATE_LIMIT_REDIS_TIMEOUT_MS / 1000
+                    storage = AsyncRedisStorage(
+                        url,
+                        mode=settings.RATE_LIMIT_REDIS_MODE,
+                        timeout=timeout if timeout > 0 else None,
+                        max_connections=settings.RATE_LIMIT_REDIS_MAX_CONNECTIONS,
+                    )
+                    return storage, "redis"
+                return RedisStorage(url, mode=settings.RATE_LIMIT_REDIS_MODE), "redis"
             except Exception:
-                return MemoryStorage(), "memory"
-        return MemoryStorage(), "memory"
+                return MemoryStorage(settings.RATE_LIMIT_MEMORY_MAX_ENTRIES), "memory"
+        return MemoryStorage(settings.RATE_LIMIT_MEMORY_MAX_ENTRIES), "memory"
 
     def exempt(self, request: Request) -> bool:
-        path = request.url.path
+        return self.exempt_path(request.url.path)
+
+    @staticmethod
+    def exempt_path(path: str) -> bool:
         return (
             path.startswith("/health")
             or path == "/metrics"
@@ -120,99 +809,330 @@ class RateLimiter:
         client = request.client
         return (client.host if client else "unknown") or "unknown"
 
-    def _evaluate(self, key_prefix: str, limit: Limit, identity: str) -> Decision:
-        ts = _now()
-        w = _window_key(limit.window_seconds, ts)
-        reset_time = (w + 1) * limit.window_seconds
-        ttl = max(reset_time - ts, 1)
-        key = f"rl:{key_prefix}:{identity}:{w}"
-        count = self.storage.incr(key, ttl_seconds=ttl)
-
-        allowed = count <= (limit.requests + limit.burst)
-        remaining = max((limit.requests + limit.burst) - count, 0)
-        retry_after = max(reset_time - ts, 1) if not allowed else 0
+    @staticmethod
+    def client_ip_from_scope(scope: dict[str, Any]) -> str:
+        """get_client_ip on a raw ASGI scope (no Request object)."""
+        for name, value in scope.get("headers") or ():
+            if name == b"x-forwarded-for":
+                xff = value.decode("latin-1")
+                if xff:
+                    return xff.split(",")[0].strip()
+                break
+        client = scope.get("client")
+        return (client[0] if client else "unknown") or "unknown"
+
+    def _hit(self, key_prefix: str, limit: Limit, identity: str, now_ms: int) -> Hit:
+        """Storage operation for one tier, according to its algorithm."""
+        ts = now_ms // 1000
+        window = limit.window_seconds
+        if limit.algorithm == "gcra":
+            # Nominal rate requests/window; requests + burst may arrive at once.
+            interval = max(window * 1000 // limit.requests, 1)
+            return Hit("gcra", f"rl:{key_prefix}:{identity}", interval, interval * (limit.requests + limit.burst - 1))
+        w = _window_key(window, ts)
+        if limit.algorithm == "sliding":
+            # The current counter must outlive its window: it is the previous one for the next window.
+            return Hit("sliding", f"rl:{key_prefix}:{identity}:{w}", (w + 2) * window - ts, prev_key=f"rl:{key_prefix}:{identity}:{w - 1}")
+        return Hit("fixed", f"rl:{key_prefix}:{identity}:{w}", max((w + 1) * window - ts, 1))
+
+    def _decision(self, limit: Limit, hit: Hit, reply: tuple[int, int], now_ms: int) -> Decision:
+        capacity = limit.requests + limit.burst
+        ts = now_ms // 1000
+        if hit.kind == "gcra":
+            allowed, tat = reply
+            reset_time = -(-tat // 1000)  # bucket full again
+            if allowed:
+                remaining = max((hit.b + hit.a - (tat - now_ms)) // hit.a, 0)
+                retry_after = 0
+            else:
+                remaining = 0
+                retry_after = max(-(-(tat - now_ms - hit.b) // 1000), 1)
+        elif hit.kind == "sliding":
+            current, previous = reply
+            window_ms = limit.window_seconds * 1000
+            elapsed = now_ms % window_ms
+            estimate = previous * (window_ms - elapsed) / window_ms + current
+            allowed = estimate <= capacity
+            remaining = max(int(capacity - estimate), 0)
+            reset_time = (ts // limit.window_seconds + 1) * limit.window_seconds
+            retry_after = 0
+            if not allowed:
+                if current <= capacity and previous:
+                    # The previous window's weight decays enough within this window.
+                    wait_ms = window_ms * (1 - (capacity - current) / previous) - elapsed
+                else:
+                    # Next window: the current count becomes the (decaying) previous one.
+                    wait_ms = window_ms - elapsed + window_ms * max(1 - (capacity - 1) / current, 0)
+                retry_after = max(-(-int(wait_ms) // 1000), 1)
+        else:
+            count, _ttl = reply
+            allowed = count <= capacity
+            remaining = max(capacity - count, 0)
+            reset_time = (ts // limit.window_seconds + 1) * limit.window_seconds
+            retry_after = max(reset_time - ts, 1) if not allowed else 0
         return Decision(
-            allowed=allowed,
-            limit=(limit.requests + limit.burst),
-            remaining=remaining,
+            allowed=bool(allowed),
+            limit=capacity,
+            remaining=int(remaining),
             reset_time=reset_time,
             window_seconds=limit.window_seconds,
             retry_after=retry_after,
         )
 
+    def _plan(self, tiers: list[tuple[str, str, str]], now_ms: int) -> tuple[dict[str, Decision], list[str], list[Hit]]:
+        """Decisions known locally (global lease), and the tiers/hits left for the storage."""
+        local: dict[str, Decision] = {}
+        names: list[str] = []
+        hits: list[Hit] = []
+        for name, prefix, identity in tiers:
+            if name == "global" and self.global_counter is not None:
+                decision = self.global_counter.take_local(now_ms)
+                if decision is not None:
+                    local[name] = decision
+                    continue
+                hit = self.global_counter.hit(now_ms)
+            else:
+                hit = self._hit(prefix, self.limits[name], identity, now_ms)
+            names.append(name)
+            hits.append(hit)
+        return local, names, hits
+
+    def _sum_keys(self, names: list[str], hits: list[Hit], replies: list[tuple[int, int]]) -> list[str]:
+        if self.global_counter is None or "global" not in names:
+            return []
+        i = names.index("global")
+        return self.global_counter.sum_keys(hits[i], replies[i][0])
+
+    def _exchange(self, names: list[str], hits: list[Hit], now_ms: int) -> tuple[list[tuple[int, int]], list[int] | None]:
+        replies = self.storage.hit_many(hits, now_ms) if hits else []
+        keys = self._sum_keys(names, hits, replies)
+        return replies, (self.storage.read_many(keys, now_ms) if keys else None)
+
+    async def _exchange_async(
+        self, names: list[str], hits: list[Hit], now_ms: int
+    ) -> tuple[list[tuple[int, int]], list[int] | None]:
+        replies = await self.storage.hit_many_async(hits, now_ms) if hits else []
+        keys = self._sum_keys(names, hits, replies)
+        return replies, (await self.storage.read_many_async(keys, now_ms) if keys else None)
+
+    def _evaluate_many(self, tiers: list[tuple[str, str, str]]) -> dict[str, Decision]:
+        """(name, key prefix, identity) per tier -> decisions, in one storage call."""
+        now_ms = _now_ms()
+        local, names, hits = self._plan(tiers, now_ms)
+        replies, shard_counts = self._exchange(names, hits, now_ms)
+        return self._decisions(tiers, local, names, hits, replies, shard_counts, now_ms)
+
+    async def _evaluate_many_async(self, tiers: list[tuple[str, str, str]]) -> dict[str, Decision]:
+        now_ms = _now_ms()
+        local, names, hits = self._plan(tiers, now_ms)
+        timeout = getattr(self.storage, "timeout", None)
+        try:
+            if timeout:
+                replies, shard_counts = await asyncio.wait_for(self._exchange_async(names, hits, now_ms), timeout)
+            else:
+                replies, shard_counts = await self._exchange_async(names, hits, now_ms)
+        except _STORAGE_ERRORS as exc:
+            # Redis lent ou indisponible : décision configurée plutôt qu'une requête bloquée.
+            self.fallbacks += 1
+            logger.warning("Rate limit storage unavailable (%s), fail_open=%s", type(exc).__name__, self.settings.RATE_LIMIT_FAIL_OPEN)
+            return self._fallback_decisions(tiers, now_ms // 1000)
+        return self._decisions(tiers, local, names, hits, replies, shard_counts, now_ms)
+
+    def _decisions(
+        self,
+        tiers: list[tuple[str, str, str]],
+        local: dict[str, Decision],
+        names: list[str],
+        hits: list[Hit],
+        replies: list[tuple[int, int]],
+        shard_counts: list[int] | None,
+        now_ms: int,
+    ) -> dict[str, Decision]:
+        out = dict(local)
+        for name, hit, reply in zip(names, hits, replies):
+            if name == "global" and self.global_counter is not None:
+                out[name] = self.global_counter.settle(reply[0], now_ms, shard_counts)
+            else:
+                out[name] = self._decision(self.limits[name], hit, reply, now_ms)
+        return {name: out[name] for name, _prefix, _identity in tiers}
+
+    def _fallback_decisions(self, tiers: list[tuple[str, str, str]], ts: int) -> dict[str, Decision]:
+        """Decisions when the storage did not answer: allow everything or deny with Retry-After: 1."""
+        allow = self.settings.RATE_LIMIT_FAIL_OPEN
+        out = {}
+        for name, _prefix, _identity in tiers:
+            limit = self.limits[name]
+            capacity = limit.requests + limit.burst
+            out[name] = Decision(
+                allowed=allow,
+                limit=capacity,
+                remaining=capacity if allow else 0,
+                reset_time=(ts // limit.window_seconds + 1) * limit.window_seconds,
+                window_seconds=limit.window_seconds,
+                retry_after=0 if allow else 1,
+            )
+        return out
+
     def check(self, request: Request) -> dict[str, Decision]:
         decisions, _ = self.check_with_context(request)
         return decisions
 
-    def _path_matches_any(self, path: str, prefixes: list[str]) -> bool:
-        for prefix in prefixes:
-            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
-                return True
-        return False
-
     def _endpoint_tier(self, request: Request) -> str | None:
-        path = request.url.path
-        method = request.method.upper()
-        if method in self.settings.RATE_LIMIT_UPLOAD_METHODS_SET and self._path_matches_any(path, self.settings.RATE_LIMIT_UPLOAD_PATHS_LIST):
-            return "upload"
-        if method in self.settings.RATE_LIMIT_CHAT_METHODS_SET and self._path_matches_any(path, self.settings.RATE_LIMIT_CHAT_PATHS_LIST):
-            return "chat"
-        if method in self.settings.RATE_LIMIT_SEARCH_METHODS_SET and self._path_matches_any(path, self.settings.RATE_LIMIT_SEARCH_PATHS_LIST):
-            return "search"
-        return None
+        return self.classifier.classify(request.method.upper(), request.url.path)
 
-    def check_with_context(self, request: Request) -> tuple[dict[str, Decision], str | None]:
-        ip = self.get_client_ip(request)
+    def _tiers(self, request: Request) -> tuple[list[tuple[str, str, str]], str | None]:
+        return self._tiers_for(request.method, request.url.path, self.get_client_ip(request))
+
+    def _tiers_for(self, method: str, path: str, ip: str) -> tuple[list[tuple[str, str, str]], str | None]:
         ip_id = _hash_ip(ip)
-        endpoint_key = request.url.path
-        endpoint_tier = self._endpoint_tier(request)
-        # Tier decisions
-        out: dict[str, Decision] = {}
-        out["global"] = self._evaluate("global", self.limits["global"], "all")
-        out["ip"] = self._evaluate("ip", self.limits["ip"], ip_id)
+        endpoint_tier = self.classifier.classify(method.upper(), path)
+        tiers = [("global", "global", "all"), ("ip", "ip", ip_id)]
         if endpoint_tier:
-            out[endpoint_tier] = self._evaluate(endpoint_tier, self.limits[endpoint_tier], f"{ip_id}:{endpoint_key}")
-        return out, endpoint_tier
+            tiers.append((endpoint_tier, endpoint_tier, f"{ip_id}:{path}"))
+        return tiers, endpoint_tier
+
+    def check_with_context(self, request: Request) -> tuple[dict[str, Decision], str | None]:
+        # Tier decisions, all counters updated in a single storage round trip
+        tiers, endpoint_tier = self._tiers(request)
+        return self._evaluate_many(tiers), endpoint_tier
+
+    async def check_with_context_async(self, request: Request) -> tuple[dict[str, Decision], str | None]:
+        """Same as check_with_context without blocking the event loop; storage errors and time-outs use the fallback."""
+        tiers, endpoint_tier = self._tiers(request)
+        return await self._evaluate_many_async(tiers), endpoint_tier
+
+    async def check_scope_async(self, scope: dict[str, Any]) -> tuple[dict[str, Decision], str | None]:
+        """check_with_context_async on a raw ASGI HTTP scope."""
+        tiers, endpoint_tier = self._tiers_for(scope["method"], scope["path"], self.client_ip_from_scope(scope))
+        return await self._evaluate_many_async(tiers), endpoint_tier
+
+    def _peek_plan(self, tiers: list[tuple[str, str, str]], now_ms: int) -> list[Hit]:
+        hits: list[Hit] = []
+        for name, prefix, identity in tiers:
+            if name == "global" and self.global_counter is not None:
+                hits += self.global_counter.peek_hits(now_ms)
+            else:
+                hits.append(self._hit(prefix, self.limits[name], identity, now_ms))
+        return hits
+
+    def _peek_decisions(
+        self, tiers: list[tuple[str, str, str]], hits: list[Hit], replies: list[tuple[int, int]], now_ms: int
+    ) -> dict[str, Decision]:
+        out: dict[str, Decision] = {}
+        i = 0
+        for name, _prefix, _identity in tiers:
+            if name == "global" and self.global_counter is not None:
+                n = self.global_counter.shards
+                out[name] = self.global_counter.peek([count for count, _ttl in replies[i:i + n]], now_ms)
+                i += n
+                continue
+            # Decision the next request would get; remaining counted before that request.
+            decision = self._decision(self.limits[name], hits[i], replies[i], now_ms)
+            if decision.allowed:
+                decision.remaining = min(decision.remaining + 1, decision.limit)
+            out[name] = decision
+            i += 1
+        return out
+
+    def peek_with_context(self, request: Request) -> tuple[dict[str, Decision], str | None]:
+        """Current quota of every tier for this request, without consuming any (status endpoint)."""
+        tiers, endpoint_tier = self._tiers(request)
+        now_ms = _now_ms()
+        hits = self._peek_plan(tiers, now_ms)
+        return self._peek_decisions(tiers, hits, self.storage.peek(hits, now_ms), now_ms), endpoint_tier
+
+    async def peek_with_context_async(self, request: Request) -> tuple[dict[str, Decision], str | None]:
+        tiers, endpoint_tier = self._tiers(request)
+        now_ms = _now_ms()
+        hits = self._peek_plan(tiers, now_ms)
+        timeout = getattr(self.storage, "timeout", None)
+        try:
+            if timeout:
+                replies = await asyncio.wait_for(self.storage.peek_async(hits, now_ms), timeout)
+            else:
+                replies = await self.storage.peek_async(hits, now_ms)
+        except _STORAGE_ERRORS as exc:
+            self.fallbacks += 1
+            logger.warning("Rate limit storage unavailable (%s), fail_open=%s", type(exc).__name__, self.settings.RATE_LIMIT_FAIL_OPEN)
+            return self._fallback_decisions(tiers, now_ms // 1000), endpoint_tier
+        return self._peek_decisions(tiers, hits, replies, now_ms), endpoint_tier
+
+    async def aclose(self) -> None:
+        close = getattr(self.storage, "aclose", None)
+        if close is not None:
+            await close()
 
     def apply_headers(self, response: Response, decision: Decision) -> None:
-        response.headers["X-RateLimit-Limit"] = str(decision.limit)
-        response.headers["X-RateLimit-Remaining"] = str(decision.remaining)
-        response.headers["X-RateLimit-Reset"] = str(decision.reset_time)
+        for name, value in self.header_items(decision):
+            response.headers[name.decode("latin-1")] = value.decode("latin-1")
+
+    @staticmethod
+    def header_items(decision: Decision) -> list[tuple[bytes, bytes]]:
+        """X-RateLimit-* (and Retry-After when denied) as raw ASGI headers."""
+        items = [
+            (b"x-ratelimit-limit", b"%d" % decision.limit),
+            (b"x-ratelimit-remaining", b"%d" % decision.remaining),
+            (b"x-ratelimit-reset", b"%d" % decision.reset_time),
+        ]
         if not decision.allowed:
-            response.headers["Retry-After"] = str(decision.retry_after)
+            items.append((b"retry-after", b"%d" % decision.retry_after))
+        return items
+
+
+# 429 body, prebuilt per tier (same JSON as JSONResponse would render); %d = retry_after.
+_DENIED_BODY = (
+    b'{"error":"Too many requests","message":"Rate limit exceeded. Please retry later.",'
+    b'"retry_after":%d,"limit_type":"%s"}'
+)
+
 
+class RateLimitMiddleware:
+    """
+    Pure ASGI rate limiting (global -> ip -> endpoint). No Request object and no
+    BaseHTTPMiddleware task/stream per request: exempt paths go straight through, the
+    X-RateLimit-* headers are added to `http.response.start` by wrapping `send`
+    (streamed bodies are untouched), and a refusal is a prebuilt 429.
+    """
 
-def rate_limit_middleware(settings: Settings):
-    limiter = RateLimiter(settings)
+    def __init__(self, app: Any, limiter: RateLimiter) -> None:
+        self.app = app
+        self.limiter = limiter
+        self._denied = {
+            name: _DENIED_BODY.replace(b"%s", name.encode("ascii")) for name in limiter.limits
+        }
 
-    async def middleware(request: Request, call_next):
-        if not settings.RATE_LIMIT_ENABLED or limiter.exempt(request):
-            return await call_next(request)
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        limiter = self.limiter
+        if scope["type"] != "http" or not limiter.settings.RATE_LIMIT_ENABLED or limiter.exempt_path(scope["path"]):
+            await self.app(scope, receive, send)
+            return
 
-        decisions, endpoint_tier = limiter.check_with_context(request)
+        decisions, endpoint_tier = await limiter.check_scope_async(scope)
         # Enforce in order: global -> ip -> endpoint
-        enforce_order = ["global", "ip"]
-        if endpoint_tier:
-            enforce_order.append(endpoint_tier)
-        for name in enforce_order:
+        for name in ("global", "ip", endpoint_tier):
+            if name is None:
+                continue
             d = decisions[name]
             if not d.allowed:
-                payload = {
-                    "error": "Too many requests",
-                    "message": "Rate limit exceeded. Please retry later.",
-                    "retry_after": d.retry_after,
-                    "limit_type": name,
-                }
-                resp = JSONResponse(payload, status_code=429)
-                limiter.apply_headers(resp, d)
-                return resp
-
-        response = await call_next(request)
+                await self._reject(send, name, d)
+                return
+
         # Headers du tier le plus spécifique actif; sinon tier IP.
-        header_tier = endpoint_tier if endpoint_tier else "ip"
-        limiter.apply_headers(response, decisions[header_tier])
-        return response
+        extra = limiter.header_items(decisions[endpoint_tier or "ip"])
+
+        async def send_with_headers(message: dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", ()), *extra]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
-    # Expose for /api/rate-limit
-    middleware.limiter = limiter  # type: ignore[attr-defined]
-    return middleware
+    async def _reject(self, send: Any, name: str, decision: Decision) -> None:
+        body = self._denied[name] % decision.retry_after
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", b"%d" % len(body)),
+            *self.limiter.header_items(decision),
+        ]
+        await send({"type": "http.response.start", "status": 429, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
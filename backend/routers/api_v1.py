@@ -1,24 +1,65 @@
 """
-Routeur API v1 — articles, projets, expériences.
+Routeur API v1 — articles, projets, expériences, recherche.
 Données chargées depuis backend/data/*.yml (YAML) avec fallback legacy.
 """
-from fastapi import APIRouter, HTTPException, Query
+from collections.abc import Awaitable, Callable
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from starlette.concurrency import run_in_threadpool
 
 from backend.data.loader import (
-    load_articles,
+    article_facets,
+    load_articles_page,
     load_experiences,
     load_projects,
     get_article_by_id,
+    get_article_by_slug,
     get_project_by_id,
+    get_project_by_slug,
     get_experience_by_id,
+    get_experience_by_slug,
+    pin_articles_fingerprint,
+    request_content_version,
 )
-from backend.schemas import ArticleOut, ExperienceOut, ProjectOut
-from backend.schemas import ArticlesListOut, ExperiencesListOut, ProjectsListOut
+from backend.data.search import search as search_content
+from backend.schemas import ArticleFacetsOut, ArticleOut, ExperienceOut, ProjectOut, SearchHitOut
+from backend.schemas import ArticlesListOut, ExperiencesListOut, ProjectsListOut, SearchResultsOut
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Comparaison faible (RFC 9110) d'un en-tête If-None-Match avec `etag`."""
+    candidates = {t.strip().removeprefix("W/") for t in (if_none_match or "").split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def content_etag(scope: str | None = None) -> Callable[[Request, Response], Awaitable[None]]:
+    """
+    Dépendance posant un ETag faible dérivé de la version du contenu (`scope` : voir
+    content_version) : 304 sans corps (ni chargement) si le client présente déjà cette
+    version via If-None-Match.
+    """
+
+    async def dependency(request: Request, response: Response) -> None:
+        fp, version = await run_in_threadpool(request_content_version, scope)
+        # Le handler réutilise ce fingerprint : un seul parcours des posts par requête.
+        pin_articles_fingerprint(fp)
+        etag = f'W/"{version}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return dependency
+
+
+_CONTENT_ETAG = [Depends(content_etag())]
+_PROJECTS_ETAG = [Depends(content_etag("projects"))]
+_EXPERIENCES_ETAG = [Depends(content_etag("experiences"))]
 
 router = APIRouter()
 
 
-@router.get("/articles/", response_model=ArticlesListOut)
+@router.get("/articles/", response_model=ArticlesListOut, dependencies=_CONTENT_ETAG)
 def list_articles(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
@@ -26,21 +67,50 @@ def list_articles(
     tag: str | None = Query(None, description="Filtre exact sur tag (case-insensitive)"),
     category: str | None = Query(None, description="Filtre exact sur catégorie (case-insensitive)"),
     lang: str | None = Query(None, description="Langue du contenu (ex: fr, en)"),
+    cursor: str | None = Query(None, max_length=512, description="Reprise après un article (next_cursor de la page précédente)"),
 ):
     """Liste des articles (YAML + Markdown sous public/posts et public/blog_content/posts)."""
-    items, total = load_articles(
-        skip=skip, limit=limit, q=q, tag=tag, category=category, lang=lang
-    )
+    try:
+        page = load_articles_page(
+            skip=skip, limit=limit, q=q, tag=tag, category=category, lang=lang, cursor=cursor
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     return {
-        "items": [ArticleOut(**x).model_dump() for x in items],
-        "total": total,
+        "items": [ArticleOut(**x).model_dump() for x in page["items"]],
+        "total": page["total"],
         "skip": skip,
         "limit": limit,
         "filters": {"q": q, "tag": tag, "category": category, "lang": lang},
+        "next_cursor": page["next_cursor"],
     }
 
 
-@router.get("/articles/{article_id}", response_model=ArticleOut)
+@router.get("/articles/facets", response_model=ArticleFacetsOut, dependencies=_CONTENT_ETAG)
+def list_article_facets(
+    q: str | None = Query(None, description="Recherche texte (mêmes règles que /articles/)"),
+    tag: str | None = Query(None, description="Filtre exact sur tag (case-insensitive)"),
+    category: str | None = Query(None, description="Filtre exact sur catégorie (case-insensitive)"),
+    lang: str | None = Query(None, description="Langue du contenu (ex: fr, en)"),
+):
+    """Comptes par tag, catégorie, année et langue sur tout le corpus filtré (pas seulement une page)."""
+    facets = article_facets(q=q, tag=tag, category=category, lang=lang)
+    return {**facets, "filters": {"q": q, "tag": tag, "category": category, "lang": lang}}
+
+
+@router.get("/articles/by-slug/{slug}", response_model=ArticleOut, dependencies=_CONTENT_ETAG)
+def get_article_by_slug_route(
+    slug: str,
+    lang: str | None = Query(None, description="Langue si plusieurs traductions partagent le slug"),
+):
+    """Détail d'un article par slug (index en mémoire)."""
+    it = get_article_by_slug(slug, lang=lang)
+    if it:
+        return ArticleOut(**it).model_dump()
+    raise HTTPException(status_code=404, detail="Article not found")
+
+
+@router.get("/articles/{article_id}", response_model=ArticleOut, dependencies=_CONTENT_ETAG)
 def get_article(article_id: int):
     """Détail d'un article par ID (index 1-based depuis le YAML)."""
     it = get_article_by_id(article_id)
@@ -49,7 +119,7 @@ def get_article(article_id: int):
     raise HTTPException(status_code=404, detail="Article not found")
 
 
-@router.get("/projects/", response_model=ProjectsListOut)
+@router.get("/projects/", response_model=ProjectsListOut, dependencies=_PROJECTS_ETAG)
 def list_projects(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
@@ -64,7 +134,16 @@ def list_projects(
     }
 
 
-@router.get("/projects/{project_id}", response_model=ProjectOut)
+@router.get("/projects/by-slug/{slug}", response_model=ProjectOut, dependencies=_PROJECTS_ETAG)
+def get_project_by_slug_route(slug: str):
+    """Détail d'un projet par slug."""
+    it = get_project_by_slug(slug)
+    if it:
+        return ProjectOut(**it).model_dump()
+    raise HTTPException(status_code=404, detail="Project not found")
+
+
+@router.get("/projects/{project_id}", response_model=ProjectOut, dependencies=_PROJECTS_ETAG)
 def get_project(project_id: int):
     """Détail d'un projet par ID."""
     it = get_project_by_id(project_id)
@@ -73,7 +152,7 @@ def get_project(project_id: int):
     raise HTTPException(status_code=404, detail="Project not found")
 
 
-@router.get("/experiences/", response_model=ExperiencesListOut)
+@router.get("/experiences/", response_model=ExperiencesListOut, dependencies=_EXPERIENCES_ETAG)
 def list_experiences(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
@@ -88,10 +167,38 @@ def list_experiences(
     }
 
 
-@router.get("/experiences/{experience_id}", response_model=ExperienceOut)
+@router.get("/experiences/by-slug/{slug}", response_model=ExperienceOut, dependencies=_EXPERIENCES_ETAG)
+def get_experience_by_slug_route(slug: str):
+    """Détail d'une expérience par slug."""
+    it = get_experience_by_slug(slug)
+    if it:
+        return ExperienceOut(**it).model_dump()
+    raise HTTPException(status_code=404, detail="Experience not found")
+
+
+@router.get("/experiences/{experience_id}", response_model=ExperienceOut, dependencies=_EXPERIENCES_ETAG)
 def get_experience(experience_id: int):
     """Détail d'une expérience par ID."""
     it = get_experience_by_id(experience_id)
     if it:
         return ExperienceOut(**it).model_dump()
     raise HTTPException(status_code=404, detail="Experience not found")
+
+
+@router.get("/search", response_model=SearchResultsOut, dependencies=_CONTENT_ETAG)
+def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Requête plein texte (FR/EN, accents ignorés)"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    type: str | None = Query(None, pattern="^(article|project|experience)$", description="Restreint à un type de contenu"),
+    lang: str | None = Query(None, description="Langue des articles (ex: fr, en)"),
+):
+    """Recherche classée (BM25) sur le corps des articles, les projets et les expériences."""
+    items, total = search_content(q, skip=skip, limit=limit, kind=type, lang=lang)
+    return {
+        "items": [SearchHitOut(**x).model_dump() for x in items],
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "q": q,
+    }
@@ -28,6 +28,7 @@ class ProjectOut(BaseModel):
     id: Optional[int] = None
     name: Optional[str] = None
     title: Optional[str] = None
+    slug: Optional[str] = None
     description: Optional[str] = None
     tags: list[str] = Field(default_factory=list)
     categories: list[str] = Field(default_factory=list)  # normalisé en str dans le loader
@@ -43,6 +44,7 @@ class ExperienceOut(BaseModel):
     id: Optional[int] = None
     title: str = ""
     company: str = ""
+    slug: Optional[str] = None
     company_url: Optional[str] = None
     location: Optional[str] = None
     description: Optional[str] = None
@@ -51,6 +53,7 @@ class ExperienceOut(BaseModel):
     end_date: Optional[str] = None
     current: bool = False
     employment_type: Optional[str] = None
+    permalink: Optional[str] = None
 
 class ArticlesListOut(BaseModel):
     items: list[ArticleOut]
@@ -58,6 +61,22 @@ class ArticlesListOut(BaseModel):
     skip: int
     limit: int
     filters: dict[str, Optional[str]]
+    next_cursor: Optional[str] = None
+
+
+class FacetOut(BaseModel):
+    value: str
+    label: str
+    count: int
+
+
+class ArticleFacetsOut(BaseModel):
+    total: int
+    tags: list[FacetOut]
+    categories: list[FacetOut]
+    years: list[FacetOut]
+    langs: list[FacetOut]
+    filters: dict[str, Optional[str]]
 
 
 class ProjectsListOut(BaseModel):
@@ -72,3 +91,22 @@ class ExperiencesListOut(BaseModel):
     total: int
     skip: int
     limit: int
+
+
+class SearchHitOut(BaseModel):
+    type: str
+    id: int
+    title: str
+    score: float
+    snippet: str = ""
+    lang: Optional[str] = None
+    slug: Optional[str] = None
+    permalink: Optional[str] = None
+
+
+class SearchResultsOut(BaseModel):
+    items: list[SearchHitOut]
+    total: int
+    skip: int
+    limit: int
+    q: str
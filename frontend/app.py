@@ -4,7 +4,8 @@ Point d'entrée : flask --app frontend.app run --port 3000
 Ou : python -m flask --app frontend.app run --port 3000
 """
 import os
-from collections import defaultdict
+import threading
+from collections import OrderedDict, defaultdict
 from datetime import datetime
 from pathlib import Path
 
@@ -19,6 +20,8 @@ STATIC = FRONTEND_DIR / "static"
 # URL du backend FastAPI (env)
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8080")
 API_TIMEOUT = float(os.getenv("API_TIMEOUT", "5"))
+# Réponses API revalidées par ETag gardées en mémoire (LRU)
+ETAG_CACHE_MAX = int(os.getenv("FRONTEND_ETAG_CACHE_MAX", "256"))
 
 
 def create_app():
@@ -45,6 +48,44 @@ def create_app():
             app.logger.warning("Backend API unreachable for %s: %s", path, exc)
             return None, "Backend indisponible"
 
+    # Réponses API revalidées par ETag : (chemin, params) -> (etag, payload), LRU bornée
+    etag_cache: OrderedDict[tuple, tuple[str, dict]] = OrderedDict()
+    etag_lock = threading.Lock()
+
+    def _api_get_cached(path: str, params: dict | None = None):
+        """
+        Comme _api_get, mais réutilise la dernière réponse si le backend répond 304.
+        Les recherches texte (`q`, libre et rarement répétée) ne sont pas mises en cache.
+        """
+        if (params or {}).get("q"):
+            return _api_get(path, params=params)
+        key = (path, tuple(sorted((params or {}).items())))
+        with etag_lock:
+            cached = etag_cache.get(key)
+            if cached:
+                etag_cache.move_to_end(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        url = f"{app.config['BACKEND_URL']}{path}"
+        try:
+            response = requests.get(url, params=params, headers=headers, timeout=API_TIMEOUT)
+            if response.status_code == 304 and cached:
+                return cached[1], None
+            if not response.ok:
+                app.logger.warning("Backend API status %s for %s", response.status_code, path)
+                return None, f"API status {response.status_code}"
+            payload = response.json()
+        except requests.RequestException as exc:
+            app.logger.warning("Backend API unreachable for %s: %s", path, exc)
+            return None, "Backend indisponible"
+        etag = response.headers.get("ETag")
+        if etag:
+            with etag_lock:
+                etag_cache[key] = (etag, payload)
+                etag_cache.move_to_end(key)
+                while len(etag_cache) > ETAG_CACHE_MAX:
+                    etag_cache.popitem(last=False)
+        return payload, None
+
     @app.route("/")
     def index():
         health_payload, health_error = _api_get("/health")
@@ -117,13 +158,12 @@ def create_app():
             by_year[year_key].append(a)
         blog_sections = sorted(by_year.items(), key=lambda x: x[0], reverse=True)
 
-        popular_tags = {}
-        popular_categories = {}
-        for a in articles:
-            for t in a.get("tags") or []:
-                popular_tags[t] = popular_tags.get(t, 0) + 1
-            for c in a.get("categories") or []:
-                popular_categories[c] = popular_categories.get(c, 0) + 1
+        # Facettes sur tous les articles filtrés (pas seulement la page courante), revalidées par ETag.
+        facet_params = {k: v for k, v in params.items() if k not in ("skip", "limit")}
+        facets, _facets_error = _api_get_cached("/api/v1/articles/facets", params=facet_params)
+        facets = facets or {}
+        popular_tags = [(f["label"], f["count"]) for f in facets.get("tags", [])]
+        popular_categories = [(f["label"], f["count"]) for f in facets.get("categories", [])]
 
         return render_template(
             "blog_list.html",
@@ -141,8 +181,9 @@ def create_app():
             tag_filter=tag_filter,
             category_filter=category_filter,
             lang=lang,
-            popular_tags=sorted(popular_tags.items(), key=lambda x: x[1], reverse=True)[:12],
-            popular_categories=sorted(popular_categories.items(), key=lambda x: x[1], reverse=True)[:8],
+            popular_tags=popular_tags[:12],
+            popular_categories=popular_categories[:8],
+            year_counts={f["value"]: f["count"] for f in facets.get("years", [])},
         )
 
     @app.route("/blog/<int:article_id>")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark du préchauffage parallèle (backend.data.warmup) sur un corpus synthétique.
+
+Génère N articles Markdown dans un dossier temporaire, puis mesure parse + rendu
+pour 1, 2, 4… processus jusqu'au nombre de CPU.
+
+Usage :
+    python scripts/bench/bench_content_warmup.py [--posts 10000] [--max-workers 8] [--no-render]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from backend.data import blog_posts, loader, warmup  # noqa: E402
+
+_BODY = """
+## Section {i}
+
+Paragraphe d'introduction de l'article {i}, avec du **gras**, de l'*italique* et un [lien](https://example.org/{i}).
+
+| Colonne | Valeur |
+|---------|--------|
+| a       | {i}    |
+
+```python
+def f(x):
+    return x * {i}
+```
+"""
+
+
+def write_corpus(root: Path, posts: int) -> None:
+    root.mkdir(parents=True, exist_ok=True)
+    for i in range(posts):
+        lang = ".en" if i % 3 == 0 else ""
+        front = (
+            f"---\ntitle: Article {i}\ndate: 20{10 + i % 15}-{1 + i % 12:02d}-{1 + i % 28:02d}\n"
+            f"tags: [tag{i % 40}, tag{i % 7}]\ncategories: [cat{i % 9}]\n---\n"
+        )
+        body = "".join(_BODY.format(i=i * 10 + k) for k in range(4))
+        (root / f"post-{i:05d}{lang}.md").write_text(front + body, encoding="utf-8")
+
+
+def _worker_counts(max_workers: int) -> list[int]:
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    return counts + [max_workers]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--no-render", action="store_true")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        posts = Path(tmp) / "posts"
+        data = Path(tmp) / "data"
+        data.mkdir()
+        write_corpus(posts, args.posts)
+        os.environ["BACKEND_DATA_DIR"] = str(data)
+        blog_posts.POSTS_ROOTS = (posts,)
+
+        print(f"{args.posts} articles, rendu={'non' if args.no_render else 'oui'}, CPU={os.cpu_count()}")
+        print(f"{'workers':>8} {'parse+rendu (s)':>16} {'total (s)':>10} {'speedup':>8}")
+        baseline = None
+        for workers in _worker_counts(max(args.max_workers, 1)):
+            loader.clear_yaml_cache()
+            blog_posts.configure_html_cache(1 << 30)
+            result = warmup.warm_content(workers=workers, render=not args.no_render)
+            assert result["articles"] == args.posts
+            baseline = baseline or result["parse_seconds"]
+            speedup = baseline / result["parse_seconds"] if result["parse_seconds"] else 0.0
+            print(f"{workers:>8} {result['parse_seconds']:>16.3f} {result['total_seconds']:>10.3f} {speedup:>7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Débit de rendu Markdown (rendus/s) par moteur sur les articles du dépôt.
+
+Compare l'ancien appel markdown.markdown() (nouvelle instance à chaque rendu) aux moteurs
+de blog_posts (instance réutilisée par thread) : markdown, markdown-it, mistune s'ils
+sont installés.
+
+Usage :
+    python scripts/bench/bench_markdown_engines.py [--seconds 2]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from backend.data import blog_posts  # noqa: E402
+
+
+def _throughput(render, bodies: list[str], seconds: float) -> tuple[float, float]:
+    renders, total_bytes = 0, 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        for body in bodies:
+            render(body)
+            total_bytes += len(body)
+        renders += len(bodies)
+    elapsed = time.perf_counter() - started
+    return renders / elapsed, total_bytes / elapsed / 1e6
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=2.0, help="durée de mesure par moteur")
+    args = parser.parse_args(argv)
+
+    bodies = [blog_posts.read_markdown_body(p) for p in blog_posts.iter_markdown_post_files()]
+    bodies = [b for b in bodies if b]
+    if not bodies:
+        print("Aucun article Markdown trouvé", file=sys.stderr)
+        return 1
+    print(f"{len(bodies)} articles, {sum(map(len, bodies)) / 1024:.0f} Kio")
+    print(f"{'moteur':<24} {'rendus/s':>10} {'Mo/s':>8}")
+
+    cases = []
+    if blog_posts.markdown is not None:
+        def fresh(body: str) -> str:
+            return blog_posts.markdown.markdown(
+                body, extensions=blog_posts._MARKDOWN_EXTENSIONS, output_format="html"
+            )
+        cases.append(("markdown (sans réemploi)", fresh))
+    previous = blog_posts.get_markdown_engine()
+    try:
+        for engine in blog_posts.available_markdown_engines():
+            blog_posts.set_markdown_engine(engine)
+            cases.append((engine, blog_posts._thread_renderer(engine)))
+        for name, render in cases:
+            per_second, mb_per_second = _throughput(render, bodies, args.seconds)
+            print(f"{name:<24} {per_second:>10.1f} {mb_per_second:>8.2f}")
+    finally:
+        blog_posts.set_markdown_engine(previous)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Débit (requêtes/s) du rate limiting FastAPI : ancien middleware `app.middleware("http")`
+(BaseHTTPMiddleware) contre RateLimitMiddleware (ASGI pur).
+
+Les requêtes sont envoyées directement à l'application ASGI (sans réseau ni serveur),
+en séquence puis par lots concurrents, sur une réponse JSON et une réponse en flux.
+
+Usage :
+    python scripts/bench/bench_rate_limit_middleware.py [--requests 5000] [--concurrency 32]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.responses import JSONResponse, StreamingResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from backend.config import Settings  # noqa: E402
+from backend.rate_limiter import RateLimiter, RateLimitMiddleware  # noqa: E402
+
+
+async def _json(_request):
+    return JSONResponse({"items": [], "total": 0})
+
+
+async def _stream(_request):
+    async def chunks():
+        for _ in range(4):
+            yield b"x" * 256
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+def _limiter() -> RateLimiter:
+    settings = Settings()
+    # Limites hors d'atteinte : on mesure le chemin « autorisé ».
+    for tier in ("GLOBAL", "IP", "SEARCH"):
+        setattr(settings, f"RATE_LIMIT_{tier}_REQUESTS", 10**9)
+    return RateLimiter(settings)
+
+
+def build_http_app() -> Starlette:
+    """Avant : fonction async enregistrée par app.middleware("http") (= BaseHTTPMiddleware)."""
+    app = Starlette(routes=[Route("/api/v1/articles/", _json), Route("/api/stream", _stream)])
+    limiter = _limiter()
+
+    async def middleware(request, call_next):
+        if limiter.exempt(request):
+            return await call_next(request)
+        decisions, endpoint_tier = await limiter.check_with_context_async(request)
+        for name in ("global", "ip", endpoint_tier):
+            if name is not None and not decisions[name].allowed:
+                resp = JSONResponse({"error": "Too many requests", "limit_type": name}, status_code=429)
+                limiter.apply_headers(resp, decisions[name])
+                return resp
+        response = await call_next(request)
+        limiter.apply_headers(response, decisions[endpoint_tier or "ip"])
+        return response
+
+    app.add_middleware(BaseHTTPMiddleware, dispatch=middleware)
+    return app
+
+
+def build_asgi_app() -> Starlette:
+    """Après : RateLimitMiddleware."""
+    app = Starlette(routes=[Route("/api/v1/articles/", _json), Route("/api/stream", _stream)])
+    app.add_middleware(RateLimitMiddleware, limiter=_limiter())
+    return app
+
+
+async def _call(app, path: str, i: int) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"bench")], "client": (f"10.0.{i // 256 % 256}.{i % 256}", 1234),
+        "server": ("bench", 80),
+    }
+    status = 0
+    sent = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        # Comme un serveur : le corps une fois, puis attente de la déconnexion.
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    disconnected.set()
+    return status
+
+
+async def _run(app, path: str, total: int, concurrency: int) -> float:
+    started = time.perf_counter()
+    for start in range(0, total, concurrency):
+        statuses = await asyncio.gather(*(_call(app, path, i) for i in range(start, min(start + concurrency, total))))
+        assert all(s == 200 for s in statuses), statuses
+    return total / (time.perf_counter() - started)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args(argv)
+
+    print(f"{'middleware':<12} {'route':<20} {'concurrence':>11} {'req/s':>10}")
+    for path in ("/api/v1/articles/", "/api/stream"):
+        for concurrency in (1, args.concurrency):
+            results = {}
+            for name, build in (("http", build_http_app), ("asgi", build_asgi_app)):
+                app = build()
+                asyncio.run(_run(app, path, min(args.requests, 500), concurrency))  # échauffement
+                results[name] = asyncio.run(_run(app, path, args.requests, concurrency))
+                print(f"{name:<12} {path:<20} {concurrency:>11} {results[name]:>10.0f}")
+            print(f"{'':<12} {'':<20} {'':>11} {'x%.2f' % (results['asgi'] / results['http']):>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Benchmark du rate limiter FastAPI (backend.rate_limiter) : décisions/s, latence p99 de
+check_with_context et mémoire par client, avec contrôle de régression sur une baseline.
+
+Scénarios : stockage x concurrence x IP distinctes.
+    memory     MemoryStorage, check_with_context depuis N threads (comme le threadpool) ;
+               latences en temps CPU du thread (hors attente du GIL)
+    fakeredis  AsyncRedisStorage sur fakeredis (script Lua), check_with_context_async
+               depuis N tâches asyncio (comme le middleware)
+Avant la passe chronométrée, les compteurs des `ips` clients sont créés directement dans
+le stockage (par lots) ; les requêtes mesurées tirent ensuite leurs clients uniformément
+dans tout cet ensemble. Les scénarios 1M IP (hors --quick) demandent quelques centaines
+de Mo et environ une minute de préparation par stockage.
+La mémoire par client est mesurée avec tracemalloc en créant les compteurs de M
+clients distincts (3 tiers par requête).
+
+--check compare chaque scénario à la baseline (débit plus bas ou p99 plus haut que la
+tolérance, mémoire par client plus haute) et sort en erreur en cas de régression.
+La baseline dépend de la machine : la régénérer avec --update-baseline.
+
+Usage :
+    python scripts/bench/bench_rate_limiter.py [--quick] [--check] [--update-baseline]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from starlette.requests import Request  # noqa: E402
+
+from backend.config import Settings  # noqa: E402
+from backend.rate_limiter import AsyncRedisStorage, Hit, MemoryStorage, RateLimiter, _now_ms  # noqa: E402
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None  # type: ignore
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "rate_limiter.json"
+CONCURRENCY = (1, 8, 64)
+IPS = (1_000, 10_000, 100_000, 1_000_000)
+QUICK_IPS = (1_000, 100_000)
+PATH = "/api/v1/articles/"
+POPULATE_BATCH = 2_000
+
+
+def _limiter(storage: str, ips: int) -> RateLimiter:
+    settings = Settings()
+    # Limites hors d'atteinte (on mesure la décision, pas les refus) et aucune éviction.
+    for tier in ("GLOBAL", "IP", "SEARCH"):
+        setattr(settings, f"RATE_LIMIT_{tier}_REQUESTS", 10**9)
+    limiter = RateLimiter(settings)
+    if storage == "fakeredis":
+        limiter.storage = AsyncRedisStorage("redis://bench", client=fakeredis.FakeAsyncRedis(decode_responses=True))
+    else:
+        # Clés ip + endpoint par client, sur deux fenêtres au plus : aucune éviction LRU.
+        limiter.storage = MemoryStorage(max(100_000, 4 * ips + 16))
+    return limiter
+
+
+def _client_ip(i: int) -> str:
+    return f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+
+
+def _request(ip: str) -> Request:
+    # Route du tier search : 3 compteurs par décision (global, ip, endpoint).
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": PATH,
+        "query_string": b"",
+        "headers": [],
+        "client": (ip, 1234),
+    })
+
+
+def _requests(count: int, ips: int, seed: int = 0) -> list[Request]:
+    """`count` requêtes de clients tirés uniformément parmi `ips` (graine fixe)."""
+    rng = random.Random(seed)
+    return [_request(_client_ip(rng.randrange(ips))) for _ in range(count)]
+
+
+def _population(limiter: RateLimiter, ips: int) -> Iterator[list[Hit]]:
+    """Compteurs ip + endpoint des `ips` clients, par lots (mêmes clés que check_with_context)."""
+    now_ms = _now_ms()
+    batch: list[Hit] = []
+    for i in range(ips):
+        tiers, _tier = limiter._tiers_for("GET", PATH, _client_ip(i))
+        batch += limiter._plan(tiers[1:], now_ms)[2]
+        if len(batch) >= POPULATE_BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def populate(limiter: RateLimiter, storage: str, ips: int) -> None:
+    """
+    Crée les compteurs des `ips` clients avant la passe chronométrée. Sur fakeredis, un
+    MSET par lot (le script Lua y traite ~1k clients/s) : clés à 1, sans TTL.
+    """
+    if storage == "fakeredis":
+        async def run() -> None:
+            for batch in _population(limiter, ips):
+                await limiter.storage._client.mset({hit.key: 1 for hit in batch})
+
+        asyncio.run(run())
+        return
+    for batch in _population(limiter, ips):
+        limiter.storage.hit_many(batch, _now_ms())
+
+
+def _run_threads(limiter: RateLimiter, requests: list[Request], concurrency: int) -> tuple[list[int], float]:
+    chunks = [requests[i::concurrency] for i in range(concurrency)]
+    latencies: list[list[int]] = [[] for _ in chunks]
+    barrier = threading.Barrier(concurrency + 1)
+
+    def work(chunk: list[Request], out: list[int]) -> None:
+        check = limiter.check_with_context
+        # Temps CPU du thread : sans l'attente du GIL (passation inéquitable, queue de
+        # plusieurs dizaines de ms dès 8 threads) qui mesure l'interpréteur, pas le limiteur.
+        clock = time.thread_time_ns
+        barrier.wait()
+        for request in chunk:
+            started = clock()
+            check(request)
+            out.append(clock() - started)
+
+    threads = [threading.Thread(target=work, args=(c, o)) for c, o in zip(chunks, latencies)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    return [ns for out in latencies for ns in out], time.perf_counter() - started
+
+
+def _run_tasks(limiter: RateLimiter, requests: list[Request], concurrency: int) -> tuple[list[int], float]:
+    chunks = [requests[i::concurrency] for i in range(concurrency)]
+    latencies: list[int] = []
+
+    async def work(chunk: list[Request]) -> None:
+        clock = time.perf_counter_ns
+        for request in chunk:
+            started = clock()
+            await limiter.check_with_context_async(request)
+            latencies.append(clock() - started)
+
+    async def run() -> float:
+        await limiter.check_with_context_async(requests[0])  # chargement du script Lua
+        latencies.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(work(c) for c in chunks))
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+    return latencies, elapsed
+
+
+def _summary(latencies: list[int], elapsed: float) -> dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "ops_per_sec": round(len(ordered) / elapsed, 1),
+        "p50_us": round(ordered[len(ordered) // 2] / 1000, 1),
+        "p99_us": round(ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)] / 1000, 1),
+    }
+
+
+def run_scenario(
+    storage: str, concurrency: int, ips: int, requests: int, repeat: int = 1, limiter: RateLimiter | None = None
+) -> dict[str, float]:
+    """
+    Meilleur de `repeat` passes (débit max, latences min) : écarte le bruit de l'ordonnanceur.
+    `limiter` : limiteur déjà peuplé des `ips` clients, partagé entre scénarios (limites
+    hors d'atteinte, seuls les compteurs avancent).
+    """
+    if limiter is None:
+        limiter = _limiter(storage, ips)
+        populate(limiter, storage, ips)
+    runner: Callable = _run_tasks if storage == "fakeredis" else _run_threads
+    runs = []
+    for seed in range(max(repeat, 1)):
+        batch = _requests(requests, ips, seed)
+        # Comme timeit : pas de passe du GC (coûteuse avec 1M clients) pendant la mesure.
+        gc.collect()
+        gc.disable()
+        try:
+            runs.append(_summary(*runner(limiter, batch, concurrency)))
+        finally:
+            gc.enable()
+    return {
+        "ops_per_sec": max(r["ops_per_sec"] for r in runs),
+        "p50_us": min(r["p50_us"] for r in runs),
+        "p99_us": min(r["p99_us"] for r in runs),
+    }
+
+
+def memory_per_client(storage: str, clients: int) -> float:
+    """Octets Python alloués par client distinct (compteurs global + ip + endpoint)."""
+    limiter = _limiter(storage, clients)
+    batch = [_request(_client_ip(i)) for i in range(clients)]
+    check: Callable[[Request], Any]
+    if storage == "fakeredis":
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(limiter.check_with_context_async(batch[0]))
+
+        def check(request: Request) -> Any:
+            return loop.run_until_complete(limiter.check_with_context_async(request))
+    else:
+        check = limiter.check_with_context
+        check(batch[0])
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for request in batch[1:]:
+        check(request)
+    grown = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    if storage == "fakeredis":
+        loop.close()
+    return round(grown / (clients - 1), 1)
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], tolerance: float, p99_tolerance: float, p99_slack_us: float = 0.0
+) -> list[str]:
+    """
+    Régressions de `results` par rapport à `baseline` (scénarios communs seulement).
+    `p99_slack_us` : écart absolu de p99 toujours toléré (attente du GIL entre threads).
+    """
+    failures = []
+    for key, base in baseline.get("scenarios", {}).items():
+        current = results.get("scenarios", {}).get(key)
+        if current is None:
+            continue
+        if current["ops_per_sec"] < base["ops_per_sec"] * (1 - tolerance):
+            failures.append(f"{key}: {current['ops_per_sec']:.0f} décisions/s < baseline {base['ops_per_sec']:.0f}")
+        if current["p99_us"] > base["p99_us"] * (1 + p99_tolerance) + p99_slack_us:
+            failures.append(f"{key}: p99 {current['p99_us']:.1f} µs > baseline {base['p99_us']:.1f}")
+    for storage, base in baseline.get("bytes_per_client", {}).items():
+        current = results.get("bytes_per_client", {}).get(storage)
+        if current is not None and current > base * (1 + tolerance):
+            failures.append(f"{storage}: {current:.0f} octets/client > baseline {base:.0f}")
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--quick", action="store_true", help="moins de requêtes et d'IP (CI)")
+    parser.add_argument("--storage", action="append", choices=("memory", "fakeredis"), help="défaut : les deux")
+    parser.add_argument("--concurrency", type=int, action="append", help=f"défaut : {CONCURRENCY}")
+    parser.add_argument("--ips", type=int, action="append", help=f"défaut : {IPS} ({QUICK_IPS} avec --quick)")
+    parser.add_argument("--requests", type=int, help="décisions par scénario (défaut 20000 / 5000 fakeredis, divisé par 5 avec --quick)")
+    parser.add_argument("--memory-clients", type=int, help="clients pour la mesure mémoire (défaut 50000 / 5000)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--check", action="store_true", help="échoue si régression par rapport à la baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="écrit les résultats comme nouvelle baseline")
+    parser.add_argument("--repeat", type=int, default=3, help="passes par scénario, meilleure retenue (défaut 3)")
+    parser.add_argument("--tolerance", type=float, default=0.35, help="baisse de débit / hausse mémoire tolérée (0.35 = 35 %%)")
+    parser.add_argument("--p99-tolerance", type=float, default=1.0, help="hausse de p99 tolérée (1.0 = x2)")
+    parser.add_argument("--p99-slack-us", type=float, default=100.0, help="écart absolu de p99 toléré en plus (µs)")
+    args = parser.parse_args(argv)
+
+    storages = args.storage or ["memory", "fakeredis"]
+    if "fakeredis" in storages and fakeredis is None:
+        print("fakeredis non installé : scénarios Redis ignorés (pip install 'fakeredis[lua]')", file=sys.stderr)
+        storages = [s for s in storages if s != "fakeredis"]
+    ips_list = args.ips or list(QUICK_IPS if args.quick else IPS)
+    # fakeredis (Lua dans le processus) est ~20x plus lent : moins de décisions par scénario.
+    requests = {storage: args.requests or (20_000 if storage == "memory" else 5_000) // (5 if args.quick else 1) for storage in storages}
+    clients = args.memory_clients or (5_000 if args.quick else 50_000)
+
+    results: dict[str, Any] = {
+        "machine": f"{platform.machine()} {platform.python_implementation()} {platform.python_version()}",
+        "requests": requests,
+        "scenarios": {},
+        "bytes_per_client": {},
+    }
+    print(f"{'scénario':<32} {'décisions/s':>12} {'p50 µs':>8} {'p99 µs':>8}")
+    for storage in storages:
+        for ips in ips_list:
+            limiter = _limiter(storage, ips)
+            started = time.perf_counter()
+            populate(limiter, storage, ips)
+            print(f"{storage}/ips{ips} : {ips} clients créés en {time.perf_counter() - started:.1f} s")
+            for concurrency in args.concurrency or CONCURRENCY:
+                key = f"{storage}/c{concurrency}/ips{ips}"
+                summary = run_scenario(storage, concurrency, ips, requests[storage], args.repeat, limiter)
+                results["scenarios"][key] = summary
+                print(f"{key:<32} {summary['ops_per_sec']:>12.0f} {summary['p50_us']:>8.1f} {summary['p99_us']:>8.1f}")
+        results["bytes_per_client"][storage] = memory_per_client(storage, clients)
+        print(f"{storage + ' : mémoire par client':<32} {results['bytes_per_client'][storage]:>12.0f} octets")
+
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline écrite : {args.baseline}")
+    if args.check:
+        if not args.baseline.exists():
+            print(f"Baseline absente : {args.baseline}", file=sys.stderr)
+            return 2
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        failures = compare(results, baseline, args.tolerance, args.p99_tolerance, args.p99_slack_us)
+        for failure in failures:
+            print(f"RÉGRESSION {failure}", file=sys.stderr)
+        if failures:
+            return 1
+        print(f"Aucune régression (tolérance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
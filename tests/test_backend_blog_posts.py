@@ -0,0 +1,212 @@
+import os
+import re
+import threading
+import time
+from html.parser import HTMLParser
+
+import pytest
+import yaml
+
+from backend.data import blog_posts
+
+
+def _write_post(path, title: str, body: str) -> dict:
+    fm = yaml.safe_dump({"title": title}, sort_keys=False)
+    path.write_text(f"---\n{fm}---\n\n{body}\n", encoding="utf-8")
+    return {"_md_path": str(path.resolve())}
+
+
+@pytest.fixture
+def render_calls(monkeypatch):
+    calls = []
+    render = blog_posts.markdown_body_to_html
+    previous = blog_posts._HTML_CACHE["current"]
+
+    def counting(body: str) -> str:
+        calls.append(body)
+        return render(body)
+
+    monkeypatch.setattr(blog_posts, "markdown_body_to_html", counting)
+    yield calls
+    blog_posts._HTML_CACHE["current"] = previous
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_html_cache_hits_until_file_changes(tmp_path, render_calls, compress):
+    cache = blog_posts.configure_html_cache(1024 * 1024, compress=compress)
+    row = _write_post(tmp_path / "a.md", "A", "Premier **paragraphe**.")
+
+    first = blog_posts.html_for_article_row(row)
+    assert blog_posts.html_for_article_row(row) == first
+    assert len(render_calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    _write_post(tmp_path / "a.md", "A", "Texte modifié.")
+    ns = time.time_ns() + 1_000_000
+    os.utime(tmp_path / "a.md", ns=(ns, ns))
+    assert "modifié" in blog_posts.html_for_article_row(row)
+    assert len(render_calls) == 2
+    assert cache.stats()["entries"] == 1
+
+
+def test_html_cache_is_bounded_in_bytes(tmp_path, render_calls):
+    body = "Lorem ipsum dolor sit amet. " * 40
+    rows = [_write_post(tmp_path / f"p{i}.md", f"P{i}", body) for i in range(5)]
+    size = len(blog_posts.markdown_body_to_html(body + "\n").encode("utf-8"))
+    cache = blog_posts.configure_html_cache(size * 3)
+
+    for row in rows:
+        blog_posts.html_for_article_row(row)
+    stats = cache.stats()
+    assert stats["entries"] == 3 and stats["evictions"] == 2
+    assert stats["bytes"] <= stats["max_bytes"]
+
+    # LRU : le plus récemment lu survit, le plus ancien a été évincé.
+    blog_posts.html_for_article_row(rows[2])
+    blog_posts.html_for_article_row(rows[0])
+    assert cache.stats()["hits"] == 1
+    assert cache.get(rows[2]["_md_path"], os.stat(rows[2]["_md_path"]).st_mtime_ns) is not None
+    assert cache.get(rows[3]["_md_path"], os.stat(rows[3]["_md_path"]).st_mtime_ns) is None
+
+
+def test_gzip_html_cache_reduces_resident_bytes(tmp_path, render_calls):
+    row = _write_post(tmp_path / "a.md", "A", "Contenu très répétitif. " * 200)
+    plain = blog_posts.configure_html_cache(1024 * 1024)
+    html = blog_posts.html_for_article_row(row)
+    compressed = blog_posts.configure_html_cache(1024 * 1024, compress=True)
+    assert blog_posts.html_for_article_row(row) == html
+    assert compressed.stats()["bytes"] * 4 < plain.stats()["bytes"]
+
+
+def _full_read(path):
+    """Référence : l'ancien parsing sur le fichier entier."""
+    fm, body = blog_posts._split_front_matter(path.read_text(encoding="utf-8"))
+    return fm, blog_posts._excerpt_from_body(body), body
+
+
+_EDGE_CASES = {
+    "plain.md": "---\ntitle: T\n---\n\n# Titre\n\n```\ncode\n```\nPremier *paragraphe*.\n",
+    "bom.md": "﻿---\ntitle: BOM\n---\nCorps.\n",
+    "crlf.md": "---\r\ntitle: CRLF\r\n---\r\n\r\nLigne **un**.\r\n",
+    "none.md": "Pas de front matter.\n",
+    "unclosed.md": "---\ntitle: x\nCorps sans fermeture.\n",
+    "excerpt.md": "---\ntitle: E\nexcerpt: Déjà là\n---\nCorps.\n",
+    "invalid-yaml.md": "---\n: [\n---\nCorps.\n",
+    "empty.md": "",
+}
+
+
+def test_streaming_front_matter_matches_full_read(tmp_path):
+    for name, text in _EDGE_CASES.items():
+        (tmp_path / name).write_text(text, encoding="utf-8", newline="")
+    paths = sorted(tmp_path.glob("*.md")) + blog_posts.iter_markdown_post_files()
+    assert len(paths) > len(_EDGE_CASES)
+    for path in paths:
+        fm, excerpt, offset, _mtime = blog_posts.read_front_matter(path)
+        full_fm, full_excerpt, full_body = _full_read(path)
+        assert fm == full_fm, path
+        if not (fm.get("excerpt") or fm.get("description")):
+            assert excerpt == full_excerpt, path
+        assert blog_posts.read_markdown_body(path, offset) == full_body, path
+
+
+def test_listing_parse_does_not_decode_the_whole_body(tmp_path):
+    path = tmp_path / "long.md"
+    path.write_bytes(b"---\ntitle: Long\n---\n\nIntro.\n\n" + b"\xff\xfe invalide\n" * 10_000)
+    row = blog_posts.parse_markdown_article(path)
+    assert row["excerpt"] == "Intro."
+    with open(path, "rb") as f:
+        f.seek(row["_body_offset"])
+        assert f.read(8) == b"\n\nIntro."
+
+
+def _repo_bodies() -> list[str]:
+    bodies = [blog_posts.read_markdown_body(p) for p in blog_posts.iter_markdown_post_files()]
+    return [b for b in bodies if b]
+
+
+class _Structure(HTMLParser):
+    """Texte visible et balises de structure : base de comparaison entre moteurs."""
+
+    _BLOCKS = {
+        "h1", "h2", "h3", "h4", "h5", "h6",
+        "pre", "table", "tr", "ul", "ol", "li", "blockquote",
+    }
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.text: list[str] = []
+        self.blocks: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._BLOCKS:
+            self.blocks.append(tag)
+
+    def handle_data(self, data):
+        self.text.extend(data.split())
+
+
+# python-markdown exige une ligne vide avant une liste, pas CommonMark : "texte :\n- a" y reste
+# un paragraphe (marqueurs et ** littéraux). On compare donc le texte sans ces marqueurs et
+# les blocs hors listes.
+_MARKERS = re.compile(r"(?:^|(?<=\s))(?:[-*+]|\d+[.)])(?=\s|$)|[*_`]")
+
+
+def _structure(html: str) -> tuple[str, list[str]]:
+    parser = _Structure()
+    parser.feed(html)
+    text = "".join(_MARKERS.sub("", " ".join(parser.text)).split())
+    return text, [b for b in parser.blocks if b not in ("ul", "ol", "li")]
+
+
+def test_reused_renderer_matches_fresh_markdown():
+    markdown = pytest.importorskip("markdown")
+    assert blog_posts.get_markdown_engine() == "markdown"
+    bodies = _repo_bodies() + [
+        "# T\n\n| a | b |\n|---|---|\n| 1 | 2 |\n\n```py\nx = 1\n```\nligne\nsuivante\n"
+    ]
+    for _ in range(2):  # deux passes : l'état de l'instance est bien remis à zéro
+        for body in bodies:
+            fresh = markdown.markdown(
+                body, extensions=["fenced_code", "tables", "nl2br"], output_format="html"
+            )
+            assert blog_posts.markdown_body_to_html(body) == fresh
+
+
+def test_renderer_instances_are_per_thread():
+    pytest.importorskip("markdown")
+    renderers = []
+
+    def render():
+        blog_posts.markdown_body_to_html("*x*")
+        renderers.append(blog_posts._THREAD_RENDERERS.renderer[1])
+
+    threads = [threading.Thread(target=render) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    render()
+    render()
+    assert len({id(r) for r in renderers[:3]}) == 3
+    assert renderers[3] is renderers[4]
+
+
+def test_unknown_engine_falls_back_to_markdown():
+    assert blog_posts.set_markdown_engine("no-such-engine") == "markdown"
+    assert blog_posts.set_markdown_engine(None) == "markdown"
+
+
+@pytest.mark.parametrize("engine", ["markdown-it", "mistune"])
+def test_alternative_engine_parity(engine):
+    if engine not in blog_posts.available_markdown_engines():
+        pytest.skip(f"{engine} non installé")
+    pytest.importorskip("markdown")
+    bodies = _repo_bodies()
+    reference = [blog_posts.markdown_body_to_html(b) for b in bodies]
+    try:
+        assert blog_posts.set_markdown_engine(engine) == engine
+        for body, expected in zip(bodies, reference):
+            assert _structure(blog_posts.markdown_body_to_html(body)) == _structure(expected)
+    finally:
+        blog_posts.set_markdown_engine("markdown")
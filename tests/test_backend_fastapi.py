@@ -130,3 +130,93 @@ class TestBackendApiV1:
         for article in data["items"]:
             tags = [str(t).lower() for t in article.get("tags", [])]
             assert tag.lower() in tags
+
+    def test_search_endpoint_shape(self, backend_client):
+        r = backend_client.get("/api/v1/search?q=python&limit=5")
+        assert r.status_code == 200
+        data = r.json()
+        assert data["q"] == "python"
+        assert data["limit"] == 5
+        assert isinstance(data["items"], list)
+        for hit in data["items"]:
+            assert hit["type"] in {"article", "project", "experience"}
+            assert "snippet" in hit and "score" in hit
+
+    def test_search_endpoint_requires_query(self, backend_client):
+        r = backend_client.get("/api/v1/search")
+        assert r.status_code == 422
+
+    def test_article_by_slug_matches_detail_by_id(self, backend_client):
+        base = backend_client.get("/api/v1/articles/?limit=1")
+        items = base.json().get("items", [])
+        if not items or not items[0].get("slug"):
+            pytest.skip("Aucun article avec slug dans les données de test")
+        first = items[0]
+        r = backend_client.get(f"/api/v1/articles/by-slug/{first['slug']}?lang={first['lang']}")
+        assert r.status_code == 200
+        assert r.json() == backend_client.get(f"/api/v1/articles/{first['id']}").json()
+
+    def test_by_slug_not_found_returns_404(self, backend_client):
+        for kind in ("articles", "projects", "experiences"):
+            r = backend_client.get(f"/api/v1/{kind}/by-slug/no-such-slug-xyz")
+            assert r.status_code == 404
+
+    def test_articles_cursor_pagination(self, backend_client):
+        r = backend_client.get("/api/v1/articles/?limit=1")
+        data = r.json()
+        if data["total"] < 2:
+            pytest.skip("Moins de deux articles dans les données de test")
+        nxt = backend_client.get(
+            "/api/v1/articles/", params={"limit": 1, "cursor": data["next_cursor"]}
+        )
+        assert nxt.status_code == 200
+        offset = backend_client.get("/api/v1/articles/?limit=1&skip=1").json()
+        assert nxt.json()["items"] == offset["items"]
+        assert backend_client.get("/api/v1/articles/?cursor=%25%25").status_code == 400
+
+    def test_etag_and_conditional_get(self, backend_client):
+        r = backend_client.get("/api/v1/articles/?limit=1")
+        etag = r.headers.get("etag")
+        assert etag and etag.startswith('W/"')
+        # Projets et expériences : version de leur seul YAML.
+        projects = backend_client.get("/api/v1/projects/").headers.get("etag")
+        assert projects and projects.startswith('W/"') and projects != etag
+        cached_projects = backend_client.get(
+            "/api/v1/projects/", headers={"If-None-Match": projects}
+        )
+        assert cached_projects.status_code == 304
+        cached = backend_client.get("/api/v1/articles/?limit=1", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers.get("etag") == etag
+        stale = backend_client.get("/api/v1/articles/?limit=1", headers={"If-None-Match": 'W/"0"'})
+        assert stale.status_code == 200
+
+    def test_content_etag_walks_posts_tree_once_per_request(self, backend_client, monkeypatch):
+        from backend.data import blog_posts
+
+        walks = []
+        real = blog_posts.posts_tree_fingerprint
+        monkeypatch.setattr(blog_posts, "posts_tree_fingerprint", lambda: walks.append(1) or real())
+        for url, expected in (
+            ("/api/v1/articles/?limit=1", 1),
+            ("/api/v1/search?q=data", 1),
+            ("/api/v1/articles/facets", 1),
+            ("/api/v1/projects/", 0),
+            ("/api/v1/experiences/", 0),
+        ):
+            walks.clear()
+            assert backend_client.get(url).status_code == 200
+            assert len(walks) == expected, url
+
+    def test_article_facets_endpoint(self, backend_client):
+        r = backend_client.get("/api/v1/articles/facets")
+        assert r.status_code == 200
+        data = r.json()
+        for key in ("tags", "categories", "years", "langs"):
+            assert isinstance(data[key], list)
+        assert data["total"] == backend_client.get("/api/v1/articles/?limit=1").json()["total"]
+        assert sum(f["count"] for f in data["langs"]) == data["total"]
+        scoped = backend_client.get("/api/v1/articles/facets?lang=en").json()
+        assert scoped["filters"]["lang"] == "en"
+        assert [f["value"] for f in scoped["langs"]] in ([], ["en"])
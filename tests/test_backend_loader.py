@@ -1,9 +1,11 @@
+import os
 import time
 from pathlib import Path
 
+import pytest
 import yaml
 
-from backend.data import loader
+from backend.data import blog_posts, loader
 
 
 def _write_articles(path: Path, titles: list[str]) -> None:
@@ -20,6 +22,8 @@ def test_loader_cache_invalidation_on_file_change(monkeypatch, tmp_path):
     _write_articles(articles, ["A"])
     monkeypatch.setenv("BACKEND_DATA_DIR", str(data_dir))
     monkeypatch.setenv("BACKEND_DATA_DIR_STRICT", "false")
+    # Isole le test des articles Markdown du dépôt.
+    monkeypatch.setattr(blog_posts, "POSTS_ROOTS", (tmp_path / "posts",))
     loader.clear_yaml_cache()
 
     _, total_before = loader.load_articles(skip=0, limit=100)
@@ -41,3 +45,404 @@ def test_loader_strict_mode_uses_backend_data(monkeypatch):
     resolved = loader._data_dir().resolve()
     expected = (Path(loader.__file__).resolve().parent.parent / "data").resolve()
     assert resolved == expected
+
+
+def _write_post(root: Path, name: str, front_matter: dict, body: str = "Contenu.") -> Path:
+    root.mkdir(parents=True, exist_ok=True)
+    path = root / name
+    fm = yaml.safe_dump(front_matter, sort_keys=False, allow_unicode=True)
+    path.write_text(f"---\n{fm}---\n\n{body}\n", encoding="utf-8")
+    return path
+
+
+def _linear_filter(rows, q=None, tag=None, category=None, lang=None):
+    """Référence : l'ancien scan linéaire de load_articles."""
+    out = []
+    for r in rows:
+        tags = [str(t).lower() for t in r.get("tags") or []]
+        cats = [str(c).lower() for c in r.get("categories") or []]
+        fields = [str(r.get(k) or "").lower() for k in ("title", "excerpt", "slug", "author")]
+        text = " ".join(fields + tags + cats)
+        if lang and str(r.get("lang") or "fr").lower() != lang.lower():
+            continue
+        if tag and tag.lower() not in tags:
+            continue
+        if category and category.lower() not in cats:
+            continue
+        if q and q.lower() not in text:
+            continue
+        out.append(r["id"])
+    return out
+
+
+def _sample_corpus(monkeypatch, tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    rows = [
+        {
+            "title": "Alpha", "permalink": "/alpha", "tags": ["Python", "API"],
+            "categories": ["Dev"], "date": "2024-01-01",
+        },
+        {
+            "title": "Beta", "permalink": "/beta", "tags": ["python"],
+            "categories": ["Data"], "date": "2024-02-01", "lang": "en",
+        },
+    ]
+    with open(data_dir / "articles.yml", "w", encoding="utf-8") as f:
+        yaml.safe_dump(rows, f, sort_keys=False)
+    posts = tmp_path / "posts"
+    _write_post(posts, "gamma.md", {
+        "title": "Gamma", "tags": ["Data", "API"], "categories": ["Data"], "date": "2024-03-01",
+    })
+    _write_post(posts, "gamma.en.md", {
+        "title": "Gamma EN", "tags": ["data", "data"], "categories": ["dev"], "date": "2024-03-02",
+    })
+    monkeypatch.setenv("BACKEND_DATA_DIR", str(data_dir))
+    monkeypatch.setattr(blog_posts, "POSTS_ROOTS", (posts,))
+    loader.clear_yaml_cache()
+
+
+def test_article_index_postings_are_sorted_and_unique(monkeypatch, tmp_path):
+    _sample_corpus(monkeypatch, tmp_path)
+    rows, index = loader._article_snapshot()
+
+    assert len(rows) == 4
+    for field in ("tag", "category", "lang"):
+        for postings in index[field].values():
+            assert list(postings) == sorted(set(postings))
+    assert len(index["tag"]["data"]) == 2
+    assert set(index["lang"]) == {"fr", "en"}
+    assert len(index["search"]) == len(rows)
+
+
+def test_load_articles_index_matches_linear_scan(monkeypatch, tmp_path):
+    _sample_corpus(monkeypatch, tmp_path)
+    rows, _ = loader._article_snapshot()
+
+    cases = [
+        {},
+        {"tag": "PYTHON"},
+        {"tag": "api", "category": "dev"},
+        {"category": "data", "lang": "en"},
+        {"lang": "fr", "q": "gam"},
+        {"q": "python"},
+        {"tag": "missing"},
+    ]
+    for filters in cases:
+        items, total = loader.load_articles(skip=0, limit=100, **filters)
+        expected = _linear_filter(rows, **filters)
+        assert [it["id"] for it in items] == expected, filters
+        assert total == len(expected)
+        assert all(not k.startswith("_") for it in items for k in it)
+
+
+def test_lookup_indexes_by_id_slug_and_permalink(monkeypatch, tmp_path):
+    _sample_corpus(monkeypatch, tmp_path)
+    data_dir = tmp_path / "data"
+    with open(data_dir / "projects.yml", "w", encoding="utf-8") as f:
+        yaml.safe_dump(
+            [{"name": "Tableau de Bord Énergie", "tags": ["BI"]}, "ignored", {"title": "API"}], f
+        )
+    with open(data_dir / "experiences.yml", "w", encoding="utf-8") as f:
+        yaml.safe_dump([{"title": "Data Engineer", "company": "Acme", "skills": ["SQL"]}], f)
+
+    assert loader.get_article_by_id(1)["id"] == 1
+    assert loader.get_article_by_id(0) is None
+    assert loader.get_article_by_id(99) is None
+    assert loader.get_article_by_slug("GAMMA", lang="en")["title"] == "Gamma EN"
+    assert loader.get_article_by_slug("gamma", lang="fr")["title"] == "Gamma"
+    assert loader.get_article_by_slug("gamma", lang="de") is None
+    assert loader.get_article_by_permalink("/beta")["title"] == "Beta"
+
+    project = loader.get_project_by_slug("tableau-de-bord-energie")
+    assert project == loader.get_project_by_id(1)
+    assert project["tags"] == ["BI"]
+    # Les ids restent les positions YAML d'origine (entrées invalides incluses).
+    assert loader.get_project_by_id(3)["slug"] == "api"
+    assert loader.get_experience_by_slug("data-engineer-acme")["skills"] == ["SQL"]
+
+    # Le snapshot est immuable : les dicts renvoyés sont des copies.
+    project["tags"].append("mutated")
+    assert loader.get_project_by_id(1)["tags"] == ["BI"]
+    snap = loader._projects_snapshot()
+    assert snap is loader._projects_snapshot()
+    with pytest.raises(TypeError):
+        snap["items"][0]["name"] = "x"
+
+
+def test_collection_snapshot_invalidated_by_mtime(monkeypatch, tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    projects = data_dir / "projects.yml"
+    projects.write_text("- name: One\n", encoding="utf-8")
+    monkeypatch.setenv("BACKEND_DATA_DIR", str(data_dir))
+    loader.clear_yaml_cache()
+
+    assert loader.get_project_by_slug("two") is None
+    time.sleep(0.01)
+    projects.write_text("- name: One\n- name: Two\n", encoding="utf-8")
+    assert loader.get_project_by_slug("two")["id"] == 2
+
+
+def _synthetic_snapshot(monkeypatch, n: int) -> None:
+    rows = tuple(
+        loader._freeze({
+            "id": i + 1,
+            "title": f"Post {i}",
+            "excerpt": "x" * 200,
+            "tags": ["common", f"t{i % 10}"],
+            "categories": ["data"],
+            "date": f"2024-01-{i % 28 + 1:02d}",
+            "lang": "fr",
+            "slug": f"post-{i}",
+            "source": "yaml",
+        })
+        for i in range(n)
+    )
+    snapshot = (rows, loader._build_article_index(rows))
+    monkeypatch.setattr(loader, "_merged_articles_fingerprint", lambda: ("synthetic", n))
+    monkeypatch.setitem(loader._MERGED_ARTICLES, "fp", ("synthetic", n))
+    monkeypatch.setitem(loader._MERGED_ARTICLES, "snapshot", snapshot)
+
+
+def _peak_alloc(**kwargs) -> int:
+    import tracemalloc
+
+    loader.load_articles(**kwargs)  # warm-up (caches d'interpréteur)
+    tracemalloc.start()
+    try:
+        loader.load_articles(**kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("filters", [{}, {"tag": "common"}, {"tag": "t3", "lang": "fr"}])
+def test_load_articles_allocation_is_page_sized(monkeypatch, filters):
+    peaks = {}
+    for n in (1_000, 20_000):
+        _synthetic_snapshot(monkeypatch, n)
+        peaks[n] = _peak_alloc(skip=10, limit=10, **filters)
+    # Allocation indépendante de la taille du corpus : O(page), pas O(corpus).
+    assert peaks[20_000] < 32 * 1024
+    assert peaks[20_000] < peaks[1_000] * 2
+
+
+def test_article_snapshot_is_read_only_and_shared(monkeypatch, tmp_path):
+    _sample_corpus(monkeypatch, tmp_path)
+    rows, _ = loader._article_snapshot()
+    assert loader._article_snapshot()[0] is rows
+    with pytest.raises(TypeError):
+        rows[0]["title"] = "mutated"
+    assert isinstance(rows[0]["tags"], tuple)
+
+    items, _ = loader.load_articles(limit=1)
+    items[0]["tags"].append("mutated")
+    assert "mutated" not in loader.load_articles(limit=1)[0][0]["tags"]
+
+
+def _touch(path: Path, step: int) -> None:
+    ns = time.time_ns() + step * 1_000_000
+    os.utime(path, ns=(ns, ns))
+
+
+def _rebuild_and_compare_to_full() -> dict:
+    incremental = [dict(r) for r in loader._all_article_rows()]
+    stats = dict(loader._MERGE_STATE["stats"])
+    loader.clear_yaml_cache()
+    full = [dict(r) for r in loader._all_article_rows()]
+    assert incremental == full
+    return stats
+
+
+def test_incremental_rebuild_matches_full_rebuild(monkeypatch, tmp_path):
+    _sample_corpus(monkeypatch, tmp_path)
+    posts = tmp_path / "posts"
+    # Égalités (date, titre) pour vérifier l'ordre d'origine YAML puis fichiers.
+    _write_post(posts, "tie-a.md", {"title": "Beta", "date": "2024-02-01"})
+    _write_post(posts, "tie-b.md", {"title": "Beta", "date": "2024-02-01"})
+    _write_post(posts, "dup.md", {"title": "Dup", "permalink": "/alpha", "date": "2030-01-01"})
+    loader.clear_yaml_cache()
+    first = loader._all_article_rows()
+    assert loader._MERGE_STATE["stats"]["mode"] == "full"
+    assert [r["title"] for r in first][:2] == ["Gamma EN", "Gamma"]
+    assert "Dup" not in [r["title"] for r in first]
+
+    # Modification d'un fichier : un seul parse, insertion à la nouvelle position.
+    _write_post(posts, "gamma.md", {"title": "Gamma", "tags": ["moved"], "date": "2023-06-01"})
+    _touch(posts / "gamma.md", 1)
+    stats = _rebuild_and_compare_to_full()
+    assert stats == {"parsed": 1, "reused": 4, "mode": "incremental"}
+
+    # Ajout (avec égalité) + suppression.
+    _write_post(posts, "tie-0.md", {"title": "Beta", "date": "2024-02-01"})
+    (posts / "tie-b.md").unlink()
+    stats = _rebuild_and_compare_to_full()
+    assert stats["mode"] == "incremental" and stats["parsed"] == 1
+
+    # Fichier devenu invalide puis dupliquant un permalink YAML : retiré du résultat.
+    _write_post(posts, "gamma.en.md", {"title": "Gamma EN", "permalink": "/beta"})
+    _touch(posts / "gamma.en.md", 2)
+    _rebuild_and_compare_to_full()
+    assert "Gamma EN" not in [r["title"] for r in loader._all_article_rows()]
+
+    # Un changement d'articles.yml repasse en reconstruction complète, sans reparser.
+    loader._all_article_rows()
+    with open(tmp_path / "data" / "articles.yml", "a", encoding="utf-8") as f:
+        f.write("- title: Zeta\n  date: '2024-02-01'\n")
+    _touch(tmp_path / "data" / "articles.yml", 3)
+    loader._all_article_rows()
+    assert loader._MERGE_STATE["stats"] == {"parsed": 0, "reused": 5, "mode": "full"}
+
+
+def _walk_cursor(limit: int, **filters) -> list:
+    seen, cursor = [], None
+    while True:
+        page = loader.load_articles_page(limit=limit, cursor=cursor, **filters)
+        seen += [it["title"] for it in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize("filters", [{}, {"lang": "fr"}, {"tag": "data", "lang": "fr"}, {"q": "a"}])
+def test_cursor_pagination_matches_offset_pagination(monkeypatch, tmp_path, filters):
+    _sample_corpus(monkeypatch, tmp_path)
+    tie = {"title": "Beta", "tags": ["data"], "date": "2024-02-01"}
+    _write_post(tmp_path / "posts", "tie.md", tie)
+    loader.clear_yaml_cache()
+    expected = [it["title"] for it in loader.load_articles(limit=100, **filters)[0]]
+    for limit in (1, 2, 3):
+        assert _walk_cursor(limit, **filters) == expected
+
+
+def test_cursor_is_stable_when_new_articles_are_published(monkeypatch, tmp_path):
+    _sample_corpus(monkeypatch, tmp_path)
+    posts = tmp_path / "posts"
+    first = loader.load_articles_page(limit=2)
+    assert [it["title"] for it in first["items"]] == ["Gamma EN", "Gamma"]
+
+    # Un article plus récent décale skip/id, pas le curseur.
+    _write_post(posts, "new.md", {"title": "Newest", "date": "2025-01-01"})
+    loader.clear_yaml_cache()
+    second = loader.load_articles_page(limit=2, cursor=first["next_cursor"])
+    assert [it["title"] for it in second["items"]] == ["Beta", "Alpha"]
+    assert second["total"] == 5 and second["next_cursor"] is None
+
+    with pytest.raises(ValueError):
+        loader.load_articles_page(cursor="pas-un-curseur")
+
+
+def test_article_facets_count_whole_filtered_corpus(monkeypatch, tmp_path):
+    _sample_corpus(monkeypatch, tmp_path)
+    rows, _ = loader._article_snapshot()
+
+    facets = loader.article_facets()
+    assert facets["total"] == 4
+    # Ex æquo triés par valeur ; libellé = première graphie dans l'ordre du snapshot.
+    assert facets["tags"] == [
+        {"value": "api", "label": "API", "count": 2},
+        {"value": "data", "label": "data", "count": 2},
+        {"value": "python", "label": "python", "count": 2},
+    ]
+    assert {f["value"]: f["count"] for f in facets["years"]} == {"2024": 4}
+    assert {f["value"]: f["count"] for f in facets["langs"]} == {"fr": 2, "en": 2}
+
+    for filters in ({"lang": "fr"}, {"tag": "api", "q": "gam"}, {"category": "data", "lang": "en"}):
+        scoped = loader.article_facets(**filters)
+        ids = set(_linear_filter(rows, **filters))
+        assert scoped["total"] == len(ids)
+        expected: dict[str, int] = {}
+        for r in rows:
+            if r["id"] in ids:
+                for t in {str(t).lower() for t in r.get("tags") or []}:
+                    expected[t] = expected.get(t, 0) + 1
+        assert {f["value"]: f["count"] for f in scoped["tags"]} == expected, filters
+
+    # Un calcul par snapshot et par jeu de filtres, invalidé avec le contenu.
+    assert loader.article_facets(lang="FR") is not loader.article_facets(lang="fr")
+    assert len(loader._FACETS_CACHE["entries"]) == 4
+    _write_post(tmp_path / "posts", "new.md", {"title": "Newest", "date": "2025-01-01"})
+    assert loader.article_facets()["years"][0] == {"value": "2025", "label": "2025", "count": 1}
+
+
+def test_content_version_tracks_content(monkeypatch, tmp_path):
+    _sample_corpus(monkeypatch, tmp_path)
+    before = loader.content_version()
+    assert loader.content_version() == before
+    _write_post(tmp_path / "posts", "new.md", {"title": "Newest", "date": "2025-01-01"})
+    assert loader.content_version() != before
+
+
+def _slow_builder(monkeypatch, delay: float = 0.2, gate=None):
+    """Builder lent ; avec `gate` (threading.Event), bloqué jusqu'à ce qu'il soit levé."""
+    import threading
+
+    calls = []
+    real = loader._build_merged_article_rows
+    started = threading.Event()
+
+    def slow():
+        calls.append(threading.get_ident())
+        started.set()
+        if gate is not None:
+            assert gate.wait(5)
+        else:
+            time.sleep(delay)
+        return real()
+
+    monkeypatch.setattr(loader, "_build_merged_article_rows", slow)
+    return calls, started
+
+
+def _run_concurrently(fn, n: int) -> list:
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        return list(pool.map(lambda _: fn(), range(n)))
+
+
+def test_single_flight_rebuild_serves_stale_snapshot(monkeypatch, tmp_path):
+    _sample_corpus(monkeypatch, tmp_path)
+    calls, _ = _slow_builder(monkeypatch)
+
+    # Premier build : tout le monde attend l'unique construction.
+    totals = _run_concurrently(lambda: loader.load_articles()[1], 16)
+    assert totals == [4] * 16
+    assert len(calls) == 1
+
+    metrics = loader._ARTICLES_FLIGHT.metrics
+    stale_before = metrics["stale_serves"]
+    _write_post(tmp_path / "posts", "delta.md", {"title": "Delta", "date": "2025-01-01"})
+    totals = _run_concurrently(lambda: loader.load_articles()[1], 16)
+    # Un seul thread reconstruit ; les autres servent l'ancien snapshot sans attendre.
+    assert len(calls) == 2
+    assert 5 in totals and set(totals) <= {4, 5}
+    assert metrics["stale_serves"] - stale_before == totals.count(4)
+    assert metrics["last_rebuild_seconds"] >= 0.2
+    assert loader.load_articles()[1] == 5
+    assert "articles" in loader.get_data_source_info()["refresh"]
+
+
+def test_background_refresh_never_blocks_readers(monkeypatch, tmp_path):
+    _sample_corpus(monkeypatch, tmp_path)
+    loader.load_articles()
+    import threading
+
+    gate = threading.Event()
+    calls, started = _slow_builder(monkeypatch, gate=gate)
+    monkeypatch.setenv("CONTENT_BACKGROUND_REFRESH", "true")
+
+    _write_post(tmp_path / "posts", "delta.md", {"title": "Delta", "date": "2025-01-01"})
+    assert loader.load_articles()[1] == 4  # périmé, sans attendre le builder
+    assert started.wait(2)
+    # Builder toujours bloqué : les lecteurs servent l'ancien snapshot.
+    assert loader.load_articles()[1] == 4
+    assert not gate.is_set()
+    gate.set()
+
+    deadline = time.monotonic() + 5
+    while loader.load_articles()[1] != 5 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert loader.load_articles()[1] == 5
+    assert len(calls) == 1
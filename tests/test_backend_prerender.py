@@ -0,0 +1,175 @@
+import gzip
+import json
+
+import pytest
+import yaml
+from fastapi.testclient import TestClient
+
+from backend.data import blog_posts, loader, prerender
+
+
+@pytest.fixture
+def corpus(monkeypatch, tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    with open(data_dir / "articles.yml", "w", encoding="utf-8") as f:
+        yaml.safe_dump(
+            [{"title": "Yaml post", "permalink": "/yaml", "date": "2024-05-01", "tags": ["Ops"]}],
+            f,
+        )
+    posts = tmp_path / "posts"
+    posts.mkdir()
+    for i, lang in enumerate(("", ".en", "")):
+        (posts / f"post-{i}{lang}.md").write_text(
+            f"---\ntitle: Post {i}\ndate: 2024-06-0{i + 1}\ntags: [Data]\n"
+            f"categories: [Data Eng]\n---\n\nCorps **{i}**.\n",
+            encoding="utf-8",
+        )
+    monkeypatch.setenv("BACKEND_DATA_DIR", str(data_dir))
+    monkeypatch.setattr(blog_posts, "POSTS_ROOTS", (posts,))
+    loader.clear_yaml_cache()
+    yield tmp_path
+    prerender.activate_prerendered(None)
+
+
+@pytest.fixture
+def client():
+    from backend.main import app
+
+    return TestClient(app)
+
+
+_URLS = [
+    "/api/v1/articles/",
+    "/api/v1/articles/?lang=fr&limit=2",
+    "/api/v1/articles/?tag=data&skip=2&limit=2",
+    "/api/v1/articles/?category=data%20eng&lang=en",
+    "/api/v1/articles/1",
+    "/api/v1/articles/3",
+]
+
+
+def test_prerendered_artifacts_match_dynamic_responses(corpus, client, monkeypatch):
+    expected = {url: client.get(url).json() for url in _URLS}
+    info = prerender.build_artifacts(corpus / "out", limits=(2, 20))
+    assert info["articles"] == 4 and info["version"] == loader.content_version()
+    detail = json.loads((corpus / "out" / "articles" / "2.json").read_text(encoding="utf-8"))
+    assert detail["content_html"].startswith("<p>Corps")
+    assert not list((corpus / "out").rglob("*.html*"))
+    assert prerender.activate_prerendered(corpus / "out") is True
+
+    def unreachable(*args, **kwargs):
+        raise AssertionError("load_articles appelé malgré l'artefact")
+
+    monkeypatch.setattr(loader, "_public_article_dict", unreachable)
+    for url, body in expected.items():
+        r = client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert r.status_code == 200, url
+        assert r.headers["content-encoding"] == "gzip"
+        assert r.json() == body, url
+    assert prerender.active_prerendered().stats["served"] == len(_URLS)
+
+    raw = client.get("/api/v1/articles/1", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in raw.headers
+    gz = (corpus / "out" / "articles" / "1.json.gz").read_bytes()
+    assert gzip.decompress(gz) == raw.content
+
+    cached = client.get("/api/v1/articles/", headers={"If-None-Match": raw.headers["etag"]})
+    assert cached.status_code == 304 and cached.content == b""
+
+
+def test_stale_or_unknown_requests_fall_back_to_api(corpus, client):
+    prerender.build_artifacts(corpus / "out")
+    # Sans watcher ni snapshot : revérification sur disque à chaque requête.
+    prerender.activate_prerendered(corpus / "out", recheck=0)
+    artifacts = prerender.active_prerendered()
+
+    # Recherche, curseur, valeurs non canoniques : pas d'artefact.
+    for url in (
+        "/api/v1/articles/?q=post",
+        "/api/v1/articles/?tag=DATA",
+        "/api/v1/articles/?limit=7",
+    ):
+        assert client.get(url).status_code == 200
+    assert artifacts.stats["served"] == 0
+
+    # Contenu modifié après le build : la version ne correspond plus.
+    (corpus / "posts" / "post-9.md").write_text(
+        "---\ntitle: Nouveau\ndate: 2025-01-01\n---\nx\n", encoding="utf-8"
+    )
+    r = client.get("/api/v1/articles/")
+    assert r.json()["items"][0]["title"] == "Nouveau"
+    assert artifacts.stats == {"served": 0, "not_modified": 0, "stale": 1}
+
+
+def test_activate_prerendered_without_manifest(tmp_path):
+    assert prerender.activate_prerendered("") is False
+    assert prerender.activate_prerendered(tmp_path / "missing") is False
+    assert prerender.active_prerendered() is None
+
+
+def test_version_check_uses_watcher_state_without_tree_walks(corpus, client, monkeypatch):
+    prerender.build_artifacts(corpus / "out")
+    prerender.activate_prerendered(corpus / "out")
+    artifacts = prerender.active_prerendered()
+    loader.set_watched_state(loader.scan_content_state())
+    try:
+        walks = []
+        real = blog_posts.posts_tree_fingerprint
+        monkeypatch.setattr(blog_posts, "posts_tree_fingerprint", lambda: walks.append(1) or real())
+        for _ in range(5):
+            assert client.get("/api/v1/articles/1").status_code == 200
+        assert artifacts.stats["served"] == 5 and walks == []
+
+        # Contenu modifié : détecté dès que le watcher publie le nouvel état.
+        posts = corpus / "posts"
+        (posts / "post-9.md").write_text("---\ntitle: Nouveau\n---\nx\n", encoding="utf-8")
+        assert client.get("/api/v1/articles/1").status_code == 200
+        assert artifacts.stats["stale"] == 0
+        loader.set_watched_state(loader.scan_content_state())
+        walks.clear()
+        client.get("/api/v1/articles/1")
+        assert artifacts.stats == {"served": 6, "not_modified": 0, "stale": 1}
+        assert len(walks) == 0
+    finally:
+        loader.set_watched_state(None)
+
+
+def test_version_is_rechecked_on_disk_at_most_every_interval(corpus, monkeypatch):
+    prerender.build_artifacts(corpus / "out")
+    prerender.activate_prerendered(corpus / "out", recheck=60)
+    artifacts = prerender.active_prerendered()
+    versions = []
+    real = loader.content_version
+    monkeypatch.setattr(loader, "content_version", lambda: versions.append(1) or real())
+    for _ in range(10):
+        assert artifacts.lookup("/api/v1/articles/1", {}) is not None
+    assert len(versions) == 1
+
+
+def test_app_has_no_base_http_middleware():
+    from starlette.middleware.base import BaseHTTPMiddleware
+
+    from backend.main import app
+
+    classes = [m.cls for m in app.user_middleware]
+    assert prerender.PrerenderedMiddleware in classes
+    assert BaseHTTPMiddleware not in classes
+
+
+def test_non_candidate_requests_skip_the_threadpool(corpus, client, monkeypatch):
+    prerender.build_artifacts(corpus / "out")
+    prerender.activate_prerendered(corpus / "out")
+    hops = []
+    real = prerender.run_in_threadpool
+
+    async def counting(fn, *args):
+        hops.append(fn.__name__)
+        return await real(fn, *args)
+
+    monkeypatch.setattr(prerender, "run_in_threadpool", counting)
+    for url in ("/health", "/api/v1/projects/", "/api/v1/articles/?q=post"):
+        assert client.get(url).status_code == 200, url
+    assert hops == []
+    assert client.get("/api/v1/articles/1").status_code == 200
+    assert hops == ["locate"]
@@ -0,0 +1,676 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+
+import pytest
+from starlette.requests import Request
+
+from backend import rate_limiter
+from backend.config import Settings
+from backend.rate_limiter import (
+    AsyncRedisStorage,
+    MemoryStorage,
+    RateLimiter,
+    RedisStorage,
+    SQLiteStorage,
+)
+
+
+def _request(path: str = "/api/v1/articles/", ip: str = "1.2.3.4", method: str = "GET") -> Request:
+    return Request({
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": b"",
+        "headers": [],
+        "client": (ip, 1234),
+    })
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"t": 1_000_000}
+    monkeypatch.setattr(rate_limiter, "_now_ms", lambda: int(now["t"] * 1000))
+    return now
+
+
+def test_memory_storage_drops_expired_windows_wholesale(clock):
+    storage = MemoryStorage()
+    assert [storage.incr("a", 10) for _ in range(3)] == [1, 2, 3]
+    storage.incr("b", 10)
+    storage.incr("c", 60)
+    assert storage.stats()["entries"] == 3 and storage.stats()["buckets"] == 2
+
+    clock["t"] += 10
+    assert storage.incr("a", 10) == 1
+    stats = storage.stats()
+    assert stats["expired"] == 2 and stats["entries"] == 2
+    clock["t"] += 60
+    storage.incr("d", 10)
+    assert storage.stats()["entries"] == 1
+
+
+def test_memory_storage_caps_entries_with_lru_eviction(clock):
+    storage = MemoryStorage(max_entries=3)
+    for key in ("k0", "k1", "k2"):
+        storage.incr(key, 60)
+    storage.incr("k0", 60)  # k0 redevient le plus récent
+    storage.incr("k3", 60)
+    assert storage.stats()["evictions"] == 1
+    assert storage.incr("k0", 60) == 3
+    assert storage.incr("k1", 60) == 1  # évincé puis recréé
+
+    stats = storage.stats()
+    assert stats["entries"] == 3 and stats["bytes"] > 0
+
+
+def test_memory_storage_is_thread_safe(clock):
+    storage = MemoryStorage()
+
+    def hammer():
+        for _ in range(2000):
+            storage.incr("hot", 60)
+
+    threads = [threading.Thread(target=hammer) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert storage.incr("hot", 60) == 8 * 2000 + 1
+
+
+def test_limiter_memory_is_bounded_under_ip_scan(clock, monkeypatch):
+    monkeypatch.setattr(Settings, "RATE_LIMIT_MEMORY_MAX_ENTRIES", 500)
+    limiter = RateLimiter(Settings())
+    for i in range(5000):
+        limiter.check_with_context(_request(ip=f"10.0.{i // 256}.{i % 256}"))
+    stats = limiter.storage.stats()
+    assert stats["entries"] <= 500
+    assert stats["evictions"] >= 4500
+    # Le compteur global, toujours récent, n'est jamais évincé.
+    decisions, _ = limiter.check_with_context(_request())
+    assert decisions["global"].remaining == decisions["global"].limit - 5001
+
+
+def _fake_redis():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    client = fakeredis.FakeRedis(decode_responses=True)
+    commands: list[str] = []
+    execute = client.execute_command
+
+    def counting(*args, **kwargs):
+        commands.append(str(args[0]).upper())
+        return execute(*args, **kwargs)
+
+    client.execute_command = counting
+    return client, commands
+
+
+@pytest.mark.parametrize("mode", ["script", "pipeline"])
+def test_redis_storage_incr_many_sets_ttl_on_first_hit(mode):
+    client, _ = _fake_redis()
+    storage = RedisStorage("redis://unused", mode=mode, client=client)
+    assert storage.incr_many([("a", 10), ("b", 60)]) == [(1, 10), (1, 60)]
+    assert storage.incr_many([("a", 10), ("b", 60)]) == [(2, 10), (2, 60)]
+    assert client.ttl("a") == 10 and client.ttl("b") == 60
+
+
+def test_limiter_checks_all_tiers_in_one_redis_round_trip(clock):
+    client, commands = _fake_redis()
+    limiter = RateLimiter(Settings())
+    limiter.storage = RedisStorage("redis://unused", client=client)
+    memory = RateLimiter(Settings())
+
+    request = _request(path="/api/v1/articles/", method="POST")
+    for i in range(3):
+        commands.clear()
+        decisions, tier = limiter.check_with_context(request)
+        # Script chargé au premier appel (NOSCRIPT -> SCRIPT LOAD),
+        # puis un seul EVALSHA par requête.
+        assert commands == (["EVALSHA", "SCRIPT LOAD", "EVALSHA"] if i == 0 else ["EVALSHA"])
+        expected, _ = memory.check_with_context(request)
+        assert tier is not None and set(decisions) == {"global", "ip", tier}
+        assert decisions == expected
+
+
+def _slow_async_redis(delay: float):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    execute = client.execute_command
+
+    async def slow(*args, **kwargs):
+        await asyncio.sleep(delay)  # latence réseau simulée, sans bloquer la boucle
+        return await execute(*args, **kwargs)
+
+    client.execute_command = slow
+    return client
+
+
+def test_async_storage_keeps_event_loop_responsive_while_redis_is_slow(clock):
+    limiter = RateLimiter(Settings())
+    limiter.storage = AsyncRedisStorage("redis://unused", client=_slow_async_redis(0.1))
+
+    async def scenario():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def heartbeat():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        await limiter.check_with_context_async(_request())  # chargement du script
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(limiter.check_with_context_async(_request(ip=f"10.0.0.{i}")) for i in range(20))
+        )
+        elapsed = time.perf_counter() - started
+        done.set()
+        await beat
+        return results, elapsed, ticks
+
+    results, elapsed, ticks = asyncio.run(scenario())
+    # 20 requêtes concurrentes : ~1 latence Redis au total, pas 20,
+    # et la boucle a continué de tourner.
+    assert elapsed < 1.0
+    assert ticks >= 20
+    assert sorted(d["global"].remaining for d, _ in results) == [
+        results[0][0]["global"].limit - n for n in range(21, 1, -1)
+    ]
+
+
+@pytest.mark.parametrize("fail_open", [True, False])
+def test_async_storage_timeout_falls_back_to_configured_decision(clock, monkeypatch, fail_open):
+    monkeypatch.setattr(Settings, "RATE_LIMIT_FAIL_OPEN", fail_open)
+    limiter = RateLimiter(Settings())
+    limiter.storage = AsyncRedisStorage(
+        "redis://unused", client=_slow_async_redis(0.5), timeout=0.02
+    )
+
+    started = time.perf_counter()
+    decisions, _ = asyncio.run(limiter.check_with_context_async(_request()))
+    assert time.perf_counter() - started < 0.4
+    assert limiter.fallbacks == 1
+    assert {d.allowed for d in decisions.values()} == {fail_open}
+    ip = decisions["ip"]
+    assert ip.retry_after == (0 if fail_open else 1)
+    assert ip.remaining == (ip.limit if fail_open else 0)
+
+
+def _storage(kind: str):
+    if kind == "memory":
+        return MemoryStorage()
+    client, _ = _fake_redis()
+    return RedisStorage("redis://unused", mode=kind, client=client)
+
+
+def _ip_limiter(monkeypatch, algorithm: str, storage_kind: str = "memory") -> RateLimiter:
+    """Tier IP : 10 requêtes / 60 s, sans burst ni multiplicateur de dev."""
+    monkeypatch.setattr(Settings, "RATE_LIMIT_DEV_MULTIPLIER", 1.0)
+    monkeypatch.setattr(Settings, "RATE_LIMIT_IP_REQUESTS", 10)
+    monkeypatch.setattr(Settings, "RATE_LIMIT_IP_WINDOW", 60)
+    monkeypatch.setattr(Settings, "RATE_LIMIT_IP_BURST", 0)
+    monkeypatch.setattr(Settings, "RATE_LIMIT_IP_ALGORITHM", algorithm)
+    limiter = RateLimiter(Settings())
+    limiter.storage = _storage(storage_kind)
+    return limiter
+
+
+def _allowed(limiter: RateLimiter, n: int) -> int:
+    return sum(limiter.check(_request())["ip"].allowed for _ in range(n))
+
+
+@pytest.mark.parametrize("algorithm, expected", [("fixed", 20), ("sliding", 10), ("gcra", 10)])
+def test_algorithms_at_window_boundary(clock, monkeypatch, algorithm, expected):
+    limiter = _ip_limiter(monkeypatch, algorithm)
+    clock["t"] = 60 * 1000 + 59  # dernière seconde de la fenêtre
+    first = _allowed(limiter, 10)
+    clock["t"] += 1  # nouvelle fenêtre fixe
+    assert first + _allowed(limiter, 10) == expected
+
+
+def test_gcra_spaces_requests_and_keeps_one_key(clock, monkeypatch):
+    limiter = _ip_limiter(monkeypatch, "gcra")
+    decisions = [limiter.check(_request())["ip"] for _ in range(11)]
+    assert [d.remaining for d in decisions[:10]] == list(range(9, -1, -1))
+    denied = decisions[10]
+    assert not denied.allowed and denied.retry_after == 6 and denied.limit == 10
+    assert denied.reset_time == clock["t"] + 60
+
+    clock["t"] += 6  # un intervalle d'émission (60 s / 10)
+    assert _allowed(limiter, 2) == 1
+    clock["t"] += 600
+    assert _allowed(limiter, 10) == 10
+    ip_keys = [k for k in limiter.storage._data if k.startswith("rl:ip:")]
+    assert len(ip_keys) == 1 and not ip_keys[0].rsplit(":", 1)[-1].isdigit()
+
+
+def test_sliding_window_weights_previous_bucket(clock, monkeypatch):
+    limiter = _ip_limiter(monkeypatch, "sliding")
+    clock["t"] = 60 * 1000
+    assert _allowed(limiter, 10) == 10
+    clock["t"] += 90  # mi-fenêtre suivante : 10 * 0.5 + n <= 10
+    assert _allowed(limiter, 10) == 5
+    denied = limiter.check(_request())["ip"]
+    assert not denied.allowed and denied.remaining == 0
+    assert denied.retry_after >= 1 and denied.reset_time == 60 * 1002
+
+
+@pytest.mark.parametrize("algorithm", ["fixed", "sliding", "gcra"])
+@pytest.mark.parametrize("storage_kind", ["script", "pipeline"])
+def test_redis_algorithms_match_memory(clock, monkeypatch, algorithm, storage_kind):
+    redis_limiter = _ip_limiter(monkeypatch, algorithm, storage_kind)
+    memory_limiter = _ip_limiter(monkeypatch, algorithm)
+    for step in (0, 0, 0, 3, 0, 7, 0, 0, 30, 0, 0, 0, 0, 0, 45, 0):
+        clock["t"] += step
+        for _ in range(3):
+            assert redis_limiter.check(_request()) == memory_limiter.check(_request())
+
+
+def test_unknown_algorithm_is_rejected(monkeypatch):
+    monkeypatch.setattr(Settings, "RATE_LIMIT_CHAT_ALGORITHM", "leaky")
+    with pytest.raises(ValueError, match="leaky"):
+        RateLimiter(Settings())
+
+
+def _global_limiter(
+    monkeypatch, storage, shards: int = 1, lease: int = 1, requests: int = 25
+) -> RateLimiter:
+    monkeypatch.setattr(Settings, "RATE_LIMIT_DEV_MULTIPLIER", 1.0)
+    monkeypatch.setattr(Settings, "RATE_LIMIT_GLOBAL_REQUESTS", requests)
+    monkeypatch.setattr(Settings, "RATE_LIMIT_GLOBAL_BURST", 0)
+    monkeypatch.setattr(Settings, "RATE_LIMIT_GLOBAL_SHARDS", shards)
+    monkeypatch.setattr(Settings, "RATE_LIMIT_GLOBAL_LEASE", lease)
+    limiter = RateLimiter(Settings())
+    limiter.storage = storage
+    return limiter
+
+
+def _global_allowed(limiter: RateLimiter, n: int) -> int:
+    return sum(limiter.check(_request(ip=f"10.1.0.{i % 200}"))["global"].allowed for i in range(n))
+
+
+def test_global_shards_spread_writes_and_stop_at_the_exact_limit(clock, monkeypatch):
+    storage = MemoryStorage()
+    limiter = _global_limiter(monkeypatch, storage, shards=4)
+    assert _global_allowed(limiter, 40) == 25
+    shard_keys = sorted(k for k in storage._data if k.startswith("rl:global:"))
+    assert len(shard_keys) == 4 and {storage._data[k][0] for k in shard_keys} == {10}
+    stats = limiter.global_counter.stats()
+    assert stats["reservations"] == 40 and 0 < stats["sums"] < 40
+
+
+def test_global_shards_sum_exactly_near_the_limit_when_skewed(clock, monkeypatch):
+    storage = MemoryStorage()
+    limiter = _global_limiter(monkeypatch, storage, shards=4)
+    now_ms = rate_limiter._now_ms()
+    window = rate_limiter._window_key(limiter.global_counter.limit.window_seconds, now_ms // 1000)
+    # Shards déséquilibrés par d'autres workers : 5 + 7 + 7 + 7 = 26 > 25.
+    skewed = enumerate((5, 7, 7, 7))
+    storage.hit_many(
+        [rate_limiter.Hit("fixed", f"rl:global:all:{window}:{i}", 60, amount=n) for i, n in skewed],
+        now_ms,
+    )
+    # Estimation 6 x 4 = 24 <= 25, mais >= 80 % de la limite : somme exacte, refus.
+    assert limiter.check(_request())["global"].allowed is False
+    assert limiter.global_counter.stats()["sums"] == 1
+
+
+def test_global_lease_shares_the_limit_between_workers(clock, monkeypatch):
+    client, commands = _fake_redis()
+    storage = RedisStorage("redis://unused", client=client)
+    workers = [_global_limiter(monkeypatch, storage, lease=10) for _ in range(2)]
+    allowed = sum(_global_allowed(workers[i % 2], 1) for i in range(60))
+    assert allowed == 25
+    # 10 + 10 + 5 unités accordées : 25, puis refus sans dépasser la limite.
+    reservations = sum(w.global_counter.stats()["reservations"] for w in workers)
+    local = sum(w.global_counter.stats()["local"] for w in workers)
+    assert local == 22 and reservations == 60 - local
+
+
+def test_global_lease_cuts_storage_operations(clock, monkeypatch):
+    storage = MemoryStorage()
+    leased = _global_limiter(monkeypatch, storage, lease=50, requests=1000)
+    assert _global_allowed(leased, 200) == 200
+    assert leased.global_counter.stats()["reservations"] == 4
+    decision = leased.check(_request())["global"]
+    assert decision.remaining == 1000 - 250 + 49
+
+
+def test_global_counter_requires_fixed_window(monkeypatch):
+    monkeypatch.setattr(Settings, "RATE_LIMIT_GLOBAL_LEASE", 10)
+    monkeypatch.setattr(Settings, "RATE_LIMIT_GLOBAL_ALGORITHM", "gcra")
+    with pytest.raises(ValueError, match="fixed"):
+        RateLimiter(Settings())
+
+
+def _sqlite_worker(path: str, hits: int) -> None:
+    storage = SQLiteStorage(path)
+    for _ in range(hits):
+        storage.incr("shared", 60)
+
+
+def test_sqlite_storage_counts_across_processes(tmp_path):
+    path = str(tmp_path / "rl" / "counters.db")
+    SQLiteStorage(path)
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_sqlite_worker, args=(path, 200)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+        assert p.exitcode == 0
+    assert SQLiteStorage(path).incr("shared", 60) == 4 * 200 + 1
+
+
+def test_sqlite_storage_expires_rows(clock, tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "counters.db"))
+    limiter = RateLimiter(Settings())
+    limiter.storage = storage
+    limiter.check(_request())
+    assert storage.stats()["entries"] == 3
+    clock["t"] += 3600
+    limiter.check(_request())
+    stats = storage.stats()
+    assert stats["entries"] == 3 and stats["expired"] == 3
+
+
+@pytest.mark.parametrize("algorithm", ["fixed", "sliding", "gcra"])
+def test_sqlite_algorithms_match_memory(clock, monkeypatch, tmp_path, algorithm):
+    sqlite_limiter = _ip_limiter(monkeypatch, algorithm)
+    sqlite_limiter.storage = SQLiteStorage(str(tmp_path / "counters.db"))
+    memory_limiter = _ip_limiter(monkeypatch, algorithm)
+    for step in (0, 0, 3, 0, 7, 0, 30, 0, 0, 0, 45, 0):
+        clock["t"] += step
+        for _ in range(3):
+            assert sqlite_limiter.check(_request()) == memory_limiter.check(_request())
+
+
+def test_limiter_uses_sqlite_url(monkeypatch, tmp_path):
+    monkeypatch.setattr(Settings, "RATE_LIMIT_STORAGE_URL", f"sqlite:///{tmp_path}/rl.db")
+    limiter = RateLimiter(Settings())
+    assert limiter.backend == "sqlite" and isinstance(limiter.storage, SQLiteStorage)
+
+
+@pytest.mark.parametrize("algorithm", ["fixed", "sliding", "gcra"])
+@pytest.mark.parametrize("storage_kind", ["memory", "script"])
+def test_peek_reports_quota_without_consuming(clock, monkeypatch, algorithm, storage_kind):
+    limiter = _ip_limiter(monkeypatch, algorithm, storage_kind)
+    for step in (0, 0, 0, 0, 2, 0, 0, 0, 0, 0, 0, 0, 30):
+        clock["t"] += step
+        before, _ = limiter.peek_with_context(_request())
+        assert limiter.peek_with_context(_request())[0] == before
+        after = limiter.check(_request())
+        for name, decision in after.items():
+            assert before[name].allowed == decision.allowed, name
+            if decision.allowed:
+                assert before[name].remaining == decision.remaining + 1, name
+
+
+def test_peek_global_counter_sums_shards_and_lease(clock, monkeypatch):
+    limiter = _global_limiter(monkeypatch, MemoryStorage(), shards=4, lease=5)
+    _global_allowed(limiter, 3)
+    decision = limiter.peek_with_context(_request())[0]["global"]
+    # 5 unités réservées sur 25, dont 2 encore détenues localement.
+    assert decision.remaining == 20 + 2 and decision.allowed
+    assert limiter.global_counter.stats()["reservations"] == 1
+
+
+def test_status_endpoint_never_consumes_quota(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from backend.main import _limiter as limiter
+    from backend.main import app
+    from backend.rate_limit_config import Limit
+
+    monkeypatch.setattr(limiter, "storage", MemoryStorage())
+    monkeypatch.setattr(limiter, "global_counter", None)
+    monkeypatch.setattr(limiter, "limits", {**limiter.limits, "ip": Limit(3, 60, 0)})
+    client = TestClient(app)
+
+    for _ in range(50):
+        r = client.get("/api/rate-limit")
+        assert r.status_code == 200
+        assert r.json()["rate_limits"]["ip"]["remaining"] == 3
+    assert limiter.storage.stats()["entries"] == 0
+
+    assert client.get("/health").status_code == 200
+    assert client.get("/api/v1/articles/?limit=1").status_code == 200
+    ip = client.get("/api/rate-limit").json()["rate_limits"]["ip"]
+    assert ip["remaining"] == 2 and ip["allowed"] is True
+
+
+def _linear_tier(settings: Settings, method: str, path: str) -> str | None:
+    """Ancien classement : parcours des préfixes tier par tier."""
+    for suffix, tier in (("UPLOAD", "upload"), ("CHAT", "chat"), ("SEARCH", "search")):
+        prefixes = getattr(settings, f"RATE_LIMIT_{suffix}_PATHS_LIST")
+        if method in getattr(settings, f"RATE_LIMIT_{suffix}_METHODS_SET") and any(
+            path == p or path.startswith(p.rstrip("/") + "/") for p in prefixes
+        ):
+            return tier
+    return None
+
+
+def test_route_classifier_matches_linear_scan(monkeypatch):
+    monkeypatch.setattr(
+        Settings, "RATE_LIMIT_SEARCH_PATHS", "/api/v1/articles,/api/v1/search/,/api/chat/history,/"
+    )
+    monkeypatch.setattr(Settings, "RATE_LIMIT_UPLOAD_PATHS", "/api/upload,/api/v1/articles/import")
+    settings = Settings()
+    limiter = RateLimiter(settings)
+    paths = [
+        "/", "/x", "/api", "/api/chat", "/api/chat/", "/api/chat/history", "/api/chatx",
+        "/api/v1/search", "/api/v1/search/", "/api/v1/search/q", "/api/v1/articles",
+        "/api/v1/articles/1", "/api/v1/articles/import", "/api/v1/articles/import/x",
+        "/api/upload", "/api/uploads", "//api/chat", "/api/v1/chat/x",
+    ]
+    for method in ("GET", "POST", "PUT", "DELETE"):
+        for path in paths:
+            expected = _linear_tier(settings, method, path)
+            assert limiter.classifier.classify(method, path) == expected, (method, path)
+            assert limiter.classifier.classify(method, path) == expected  # via le mémo
+
+
+def test_route_classifier_memo_is_bounded():
+    from backend.rate_limiter import RouteClassifier
+
+    classifier = RouteClassifier([("search", {"GET"}, ["/api/search"])], memo_size=100)
+    for i in range(1000):
+        assert classifier.classify("GET", f"/api/search/{i}") == "search"
+    assert len(classifier._memo) == 100
+
+
+def test_route_classifier_memo_eviction_is_thread_safe():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from backend.rate_limiter import RouteClassifier
+
+    class SlowDelete(dict):
+        # Cède la main entre le choix de l'entrée à évincer et sa suppression.
+        def __delitem__(self, key):
+            time.sleep(0.0005)
+            super().__delitem__(key)
+
+    classifier = RouteClassifier([("search", {"GET"}, ["/api/search"])], memo_size=1)
+    classifier._memo = SlowDelete()
+
+    def worker(n: int) -> int:
+        paths = (f"/api/search/{n}/{i}" for i in range(200))
+        return sum(classifier.classify("GET", path) == "search" for path in paths)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert list(pool.map(worker, range(8))) == [200] * 8
+    assert len(classifier._memo) == 1
+
+
+def _count_trie_steps(classifier) -> list[int]:
+    """Remplace les enfants de chaque nœud par un dict qui compte les descentes (get)."""
+    steps = [0]
+
+    class Counting(dict):
+        def get(self, key, default=None):
+            steps[0] += 1
+            return super().get(key, default)
+
+    def swap(node: list) -> list:
+        node[0] = Counting({segment: swap(child) for segment, child in node[0].items()})
+        return node
+
+    for root in classifier._tries.values():
+        swap(root)
+    return steps
+
+
+def test_route_classifier_cost_does_not_grow_with_configured_paths(monkeypatch):
+    """Nœuds visités par recherche (sans mémo) : bornés par la profondeur du chemin."""
+    paths = [f"/api/v1/articles/{i}/comments" for i in range(100)]
+
+    def steps_per_lookup(prefixes: list[str]) -> float:
+        monkeypatch.setattr(Settings, "RATE_LIMIT_SEARCH_PATHS", ",".join(prefixes))
+        classifier = RateLimiter(Settings()).classifier
+        steps = _count_trie_steps(classifier)
+        for path in paths:
+            assert classifier._walk("GET", path) == "search"
+        return steps[0] / len(paths)
+
+    few = steps_per_lookup(["/api/v1/articles", "/api/search", "/api/v1/search"])
+    sections = [f"/api/v1/section{i}/search" for i in range(2000)]
+    many = steps_per_lookup(sections + ["/api/v1/articles"])
+    assert few == many
+    assert many <= len(paths[0].split("/")) - 1
+
+
+def _asgi_app(monkeypatch, requests: int = 2):
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse, StreamingResponse
+    from starlette.routing import Route
+
+    from backend.rate_limiter import RateLimitMiddleware
+
+    async def stream(_request):
+        async def chunks():
+            for i in range(3):
+                yield f"chunk-{i};"
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    async def health(_request):
+        return PlainTextResponse("ok")
+
+    monkeypatch.setattr(Settings, "RATE_LIMIT_DEV_MULTIPLIER", 1.0)
+    monkeypatch.setattr(Settings, "RATE_LIMIT_IP_REQUESTS", requests)
+    monkeypatch.setattr(Settings, "RATE_LIMIT_IP_BURST", 0)
+    limiter = RateLimiter(Settings())
+    app = Starlette(routes=[Route("/api/stream", stream), Route("/health", health)])
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    return app, limiter
+
+
+def test_asgi_middleware_headers_streaming_and_prebuilt_429(clock, monkeypatch):
+    from fastapi.testclient import TestClient
+    from starlette.responses import JSONResponse
+
+    app, limiter = _asgi_app(monkeypatch)
+    client = TestClient(app)
+    for remaining in (1, 0):
+        r = client.get("/api/stream")
+        assert r.status_code == 200 and r.text == "chunk-0;chunk-1;chunk-2;"
+        assert r.headers["x-ratelimit-limit"] == "2"
+        assert r.headers["x-ratelimit-remaining"] == str(remaining)
+        assert "retry-after" not in r.headers
+
+    denied = client.get("/api/stream")
+    assert denied.status_code == 429
+    decision = limiter.peek_with_context(_request(path="/api/stream", ip="testclient"))[0]["ip"]
+    expected = JSONResponse({
+        "error": "Too many requests",
+        "message": "Rate limit exceeded. Please retry later.",
+        "retry_after": decision.retry_after,
+        "limit_type": "ip",
+    })
+    assert denied.content == expected.body
+    assert denied.headers["content-type"] == "application/json"
+    assert denied.headers["retry-after"] == str(decision.retry_after)
+
+    # Chemin exempté : ni décompte ni en-têtes.
+    for _ in range(5):
+        r = client.get("/health")
+        assert r.status_code == 200 and "x-ratelimit-limit" not in r.headers
+
+
+def test_asgi_middleware_never_builds_a_request_for_exempt_paths(clock, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    app, limiter = _asgi_app(monkeypatch)
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError("Request construit pour un chemin exempté")
+
+    monkeypatch.setattr(RateLimiter, "get_client_ip", forbidden)
+    monkeypatch.setattr(limiter, "check_scope_async", forbidden)
+    assert TestClient(app).get("/health").status_code == 200
+
+
+def test_bench_flags_regressions_against_baseline():
+    import importlib.util
+    from pathlib import Path
+
+    path = Path(__file__).resolve().parents[1] / "scripts" / "bench" / "bench_rate_limiter.py"
+    spec = importlib.util.spec_from_file_location("bench_rate_limiter", path)
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+
+    summary = bench.run_scenario("memory", 2, 50, 200)
+    assert summary["ops_per_sec"] > 0 and summary["p99_us"] >= summary["p50_us"]
+    assert bench.memory_per_client("memory", 200) > 0
+
+    baseline = {
+        "scenarios": {"memory/c1/ips1000": {"ops_per_sec": 1000, "p50_us": 10, "p99_us": 50}},
+        "bytes_per_client": {"memory": 1000},
+    }
+    same = {"scenarios": {"memory/c1/ips1000": {"ops_per_sec": 900, "p50_us": 10, "p99_us": 90}},
+            "bytes_per_client": {"memory": 1100}}
+    assert bench.compare(same, baseline, 0.35, 1.0) == []
+    worse = {"scenarios": {"memory/c1/ips1000": {"ops_per_sec": 500, "p50_us": 10, "p99_us": 200}},
+             "bytes_per_client": {"memory": 2000}}
+    assert len(bench.compare(worse, baseline, 0.35, 1.0)) == 3
+    assert bench.compare({"scenarios": {}}, baseline, 0.35, 1.0) == []
+
+
+@pytest.mark.parametrize("fail_open", [True, False])
+def test_sqlite_lock_uses_fallback_without_blocking_loop(monkeypatch, tmp_path, fail_open):
+    import sqlite3
+
+    monkeypatch.setattr(Settings, "RATE_LIMIT_FAIL_OPEN", fail_open)
+    path = str(tmp_path / "counters.db")
+    limiter = RateLimiter(Settings())
+    limiter.storage = SQLiteStorage(path, busy_timeout=0.3)
+    holder = sqlite3.connect(path, isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")  # verrou d'écriture tenu par un autre processus
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        decisions, _ = await limiter.check_with_context_async(_request())
+        task.cancel()
+        return decisions, ticks
+
+    decisions, ticks = asyncio.run(run())
+    holder.execute("ROLLBACK")
+    assert limiter.fallbacks == 1
+    assert all(d.allowed is fail_open for d in decisions.values())
+    # La boucle a continué de tourner pendant l'attente du verrou.
+    assert ticks >= 10
+    assert asyncio.run(limiter.check_with_context_async(_request()))[0]["ip"].allowed
+    assert limiter.storage.stats()["entries"] == 3
@@ -0,0 +1,138 @@
+import os
+import time
+from pathlib import Path
+
+import yaml
+
+from backend.data import blog_posts, loader, search
+
+
+def _write_post(root: Path, name: str, front_matter: dict, body: str) -> Path:
+    root.mkdir(parents=True, exist_ok=True)
+    path = root / name
+    fm = yaml.safe_dump(front_matter, sort_keys=False, allow_unicode=True)
+    path.write_text(f"---\n{fm}---\n\n{body}\n", encoding="utf-8")
+    return path
+
+
+def _corpus(monkeypatch, tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    with open(data_dir / "projects.yml", "w", encoding="utf-8") as f:
+        yaml.safe_dump(
+            [{"name": "Dashboard Power BI", "description": "Tableau de bord des ventes"}], f
+        )
+    with open(data_dir / "experiences.yml", "w", encoding="utf-8") as f:
+        yaml.safe_dump(
+            [{"title": "Data Engineer", "company": "Acme", "description": "Pipelines Airflow"}],
+            f,
+        )
+    posts = tmp_path / "posts"
+    _write_post(
+        posts, "pipelines.md", {"title": "Architecture de pipelines", "date": "2024-01-01"},
+        "## Intro\n\nLes données brutes arrivent dans BigQuery via Airflow.\n",
+    )
+    _write_post(
+        posts, "async.en.md", {"title": "Python async", "date": "2024-02-01"},
+        "The event loop schedules coroutines. "
+        + "Filler sentence. " * 40
+        + "Zanzibar appears late.",
+    )
+    monkeypatch.setenv("BACKEND_DATA_DIR", str(data_dir))
+    monkeypatch.setattr(blog_posts, "POSTS_ROOTS", (posts,))
+    loader.clear_yaml_cache()
+    search.clear_search_index()
+    return posts
+
+
+def test_tokenize_folds_accents_and_drops_stopwords():
+    assert search.tokenize("Les Données de l'équipe") == ["donnee", "equipe"]
+    assert search.tokenize("The pipelines") == ["pipeline"]
+
+
+def test_search_matches_markdown_body_with_accent_folding(monkeypatch, tmp_path):
+    _corpus(monkeypatch, tmp_path)
+
+    items, total = search.search("donnees bigquery")
+    assert total == 1
+    assert items[0]["type"] == "article"
+    assert items[0]["slug"] == "pipelines"
+    assert "BigQuery" in items[0]["snippet"]
+
+
+def test_search_ranks_and_filters_across_collections(monkeypatch, tmp_path):
+    _corpus(monkeypatch, tmp_path)
+
+    items, total = search.search("airflow")
+    assert total == 2
+    assert {it["type"] for it in items} == {"article", "experience"}
+    assert items[0]["score"] >= items[1]["score"]
+
+    projects, _ = search.search("tableau", kind="project")
+    assert [p["title"] for p in projects] == ["Dashboard Power BI"]
+
+    en_only, _ = search.search("airflow", kind="article", lang="en")
+    assert en_only == []
+
+    page, total = search.search("airflow", skip=1, limit=1)
+    assert total == 2 and len(page) == 1
+
+
+def test_search_snippet_centers_on_match(monkeypatch, tmp_path):
+    _corpus(monkeypatch, tmp_path)
+
+    items, _ = search.search("zanzibar")
+    assert items[0]["snippet"].startswith("…")
+    assert "Zanzibar" in items[0]["snippet"]
+
+
+def test_search_index_rebuilds_incrementally(monkeypatch, tmp_path):
+    posts = _corpus(monkeypatch, tmp_path)
+    first = search.get_search_index()
+    assert first.stats["parsed"] == first.stats["docs"] == 4
+
+    changed = posts / "async.en.md"
+    time.sleep(0.01)
+    body = changed.read_text(encoding="utf-8") + "\nNew paragraph about kubernetes.\n"
+    changed.write_text(body, encoding="utf-8")
+    os.utime(changed, ns=(time.time_ns(), time.time_ns()))
+
+    second = search.get_search_index()
+    assert second is not first
+    assert second.stats == {"parsed": 1, "reused": 3, "docs": 4}
+    items, _ = search.search("kubernetes")
+    assert [it["slug"] for it in items] == ["async"]
+    assert search.get_search_index() is second
+
+
+def test_post_added_during_background_refresh_becomes_searchable(monkeypatch, tmp_path):
+    import threading
+
+    posts = _corpus(monkeypatch, tmp_path)
+    assert search.search("mango")[1] == 0
+    monkeypatch.setenv("CONTENT_BACKGROUND_REFRESH", "true")
+    gate = threading.Event()
+    real = loader._build_merged_article_rows
+
+    def gated():
+        assert gate.wait(5)
+        return real()
+
+    monkeypatch.setattr(loader, "_build_merged_article_rows", gated)
+    _write_post(posts, "fruits.md", {"title": "Fruits", "date": "2024-03-01"}, "Mango season.")
+
+    # Articles en reconstruction : la recherche sert l'ancien snapshot sans l'indexer
+    # sous le nouveau fingerprint.
+    assert search.search("mango")[1] == 0
+    with search._SEARCH_FLIGHT._lock:  # attend une éventuelle reconstruction de l'index
+        pass
+    gate.set()
+
+    def caught_up():
+        return loader.load_articles()[1] == 3 and search.search("mango")[1] == 1
+
+    deadline = time.monotonic() + 5
+    while not caught_up() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert loader.load_articles()[1] == 3
+    assert [it["slug"] for it in search.search("mango")[0]] == ["fruits"]
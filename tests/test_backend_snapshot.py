@@ -0,0 +1,105 @@
+import pytest
+import yaml
+
+from backend.data import blog_posts, loader, search, snapshot
+
+
+@pytest.fixture
+def corpus(monkeypatch, tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    with open(data_dir / "articles.yml", "w", encoding="utf-8") as f:
+        yaml.safe_dump(
+            [{"title": "Yaml post", "permalink": "/yaml", "date": "2024-05-01", "tags": ["Ops"]}],
+            f,
+        )
+    with open(data_dir / "projects.yml", "w", encoding="utf-8") as f:
+        yaml.safe_dump([{"name": "Pipeline", "description": "Ingestion Kafka"}], f)
+    with open(data_dir / "experiences.yml", "w", encoding="utf-8") as f:
+        yaml.safe_dump([{"title": "Engineer", "company": "Acme", "start_date": "2022-01-01"}], f)
+    posts = tmp_path / "posts"
+    posts.mkdir()
+    (posts / "hello.md").write_text(
+        "---\ntitle: Héllo\ndate: 2024-06-01\ntags: [Data]\n---\n\n"
+        "# Titre\n\nCorps **riche** en données.\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("BACKEND_DATA_DIR", str(data_dir))
+    monkeypatch.setattr(blog_posts, "POSTS_ROOTS", (posts,))
+    loader.clear_yaml_cache()
+    search.clear_search_index()
+    yield tmp_path
+    snapshot.deactivate_snapshot()
+
+
+def _responses():
+    return {
+        "articles": loader.load_articles(limit=100),
+        "tagged": loader.load_articles(tag="data"),
+        "detail": [loader.get_article_by_id(i) for i in (1, 2)],
+        "projects": loader.load_projects(),
+        "experience": loader.get_experience_by_slug("engineer-acme"),
+        "search": search.search("donnees kafka"),
+    }
+
+
+def test_compiled_snapshot_serves_identical_content(corpus):
+    expected = _responses()
+    path = corpus / "content.snap"
+    info = snapshot.build_snapshot(path)
+    assert info["articles"] == 2 and info["projects"] == 1 and info["experiences"] == 1
+
+    assert snapshot.activate_snapshot(path) is True
+    assert loader.get_data_source_info()["compiled_snapshot"] == str(path)
+    # Les sources ne sont plus lues : le contenu servi vient du fichier mappé.
+    loader.clear_yaml_cache()
+    search.clear_search_index()
+    (corpus / "posts" / "hello.md").unlink()
+    assert _responses() == expected
+    assert "<strong>riche</strong>" in loader.get_article_by_slug("hello")["content_html"]
+
+    snapshot.deactivate_snapshot()
+    assert loader.load_articles()[1] == 1
+
+
+def test_closed_snapshot_falls_back_to_markdown(corpus):
+    path = corpus / "content.snap"
+    snapshot.build_snapshot(path)
+    assert snapshot.activate_snapshot(path) is True
+    compiled = loader._COMPILED["active"]
+    row = next(r for r in compiled["articles"][0] if r.get("_html"))
+
+    # Requête en vol pendant un rechargement : le mmap est fermé sous ses pieds.
+    snapshot.deactivate_snapshot()
+    assert compiled["mmap"].closed
+    assert compiled["html"](row["_html"]) is None
+    loader.use_compiled_snapshot(compiled)
+    try:
+        detail = loader.get_article_by_slug("hello")
+    finally:
+        loader.use_compiled_snapshot(None)
+    assert "<strong>riche</strong>" in detail["content_html"]
+
+
+def test_invalid_snapshot_falls_back_to_sources(corpus):
+    assert snapshot.activate_snapshot(None) is False
+    assert snapshot.activate_snapshot(corpus / "missing.snap") is False
+
+    path = corpus / "content.snap"
+    snapshot.build_snapshot(path)
+    raw = bytearray(path.read_bytes())
+    raw[8] = snapshot.FORMAT_VERSION + 1  # version incompatible
+    path.write_bytes(bytes(raw))
+    assert snapshot.activate_snapshot(path) is False
+    assert loader._COMPILED["active"] is None
+    assert loader.load_articles()[1] == 2
+
+
+def test_cli_build_and_info(corpus, capsys):
+    path = corpus / "out" / "content.snap"
+    assert snapshot.main(["build", "--output", str(path)]) == 0
+    assert path.is_file()
+    assert snapshot.main(["info", str(path)]) == 0
+    assert '"version": 1' in capsys.readouterr().out
+    (corpus / "bad.snap").write_bytes(b"nope")
+    assert snapshot.main(["info", str(corpus / "bad.snap")]) == 1
@@ -0,0 +1,50 @@
+import pytest
+import yaml
+
+from backend.data import blog_posts, loader, warmup
+
+
+@pytest.fixture
+def corpus(monkeypatch, tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    posts = tmp_path / "posts"
+    posts.mkdir()
+    for i in range(6):
+        fm = yaml.safe_dump({"title": f"Post {i}", "date": f"2024-01-0{i + 1}", "tags": ["t"]})
+        (posts / f"post-{i}.md").write_text(f"---\n{fm}---\n\nCorps **{i}**.\n", encoding="utf-8")
+    (posts / "broken.md").write_text("", encoding="utf-8")
+    monkeypatch.setenv("BACKEND_DATA_DIR", str(data_dir))
+    monkeypatch.setattr(blog_posts, "POSTS_ROOTS", (posts,))
+    previous = blog_posts._HTML_CACHE["current"]
+    blog_posts.configure_html_cache(1024 * 1024)
+    loader.clear_yaml_cache()
+    yield posts
+    blog_posts._HTML_CACHE["current"] = previous
+    loader.clear_yaml_cache()
+
+
+def test_resolve_workers():
+    assert warmup.resolve_workers(None) == 0
+    assert warmup.resolve_workers("0") == 0
+    assert warmup.resolve_workers(" 3 ") == 3
+    assert warmup.resolve_workers("auto") >= 1
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_warm_content_matches_cold_build(corpus, workers):
+    cold = [dict(r) for r in loader._all_article_rows()]
+    loader.clear_yaml_cache()
+
+    result = warmup.warm_content(workers=workers)
+    assert result["files"] == 7 and result["articles"] == len(cold) == 7
+    assert loader._MERGE_STATE["stats"]["parsed"] == 0
+    assert [dict(r) for r in loader._all_article_rows()] == cold
+
+    # HTML déjà rendu : la page détail est un hit de cache.
+    stats = blog_posts.html_cache_stats()
+    assert "<strong>3</strong>" in loader.get_article_by_slug("post-3")["content_html"]
+    assert blog_posts.html_cache_stats()["hits"] == stats["hits"] + 1
+
+    # Deuxième passe : rien à refaire.
+    assert warmup.warm_content(workers=workers)["files"] == 0
@@ -0,0 +1,109 @@
+import os
+import pathlib
+import time
+
+import pytest
+import yaml
+
+from backend.data import blog_posts, loader, search, watcher
+
+
+def _write_articles(path, titles):
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump([{"title": t, "permalink": f"/{t.lower()}"} for t in titles], f)
+
+
+@pytest.fixture
+def content_dir(monkeypatch, tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    _write_articles(data_dir / "articles.yml", ["A"])
+    (data_dir / "projects.yml").write_text("- name: One\n", encoding="utf-8")
+    monkeypatch.setenv("BACKEND_DATA_DIR", str(data_dir))
+    monkeypatch.setattr(blog_posts, "POSTS_ROOTS", (tmp_path / "posts",))
+    loader.clear_yaml_cache()
+    search.clear_search_index()
+    yield data_dir
+    watcher.stop_content_watcher()
+    loader.set_watched_state(None)
+
+
+def _forbid_filesystem(monkeypatch):
+    def boom(*_args, **_kwargs):
+        raise AssertionError("appel disque sur le chemin de requête")
+
+    for name in ("stat", "exists", "is_dir", "rglob", "resolve"):
+        monkeypatch.setattr(pathlib.Path, name, boom)
+
+
+def test_watched_request_path_does_no_filesystem_calls(monkeypatch, content_dir):
+    w = watcher.ContentWatcher(mode="poll", interval=3600)
+    w.refresh()
+    # Préchauffe les snapshots, puis interdit tout accès disque.
+    loader.load_articles()
+    loader.load_projects()
+    search.search("one")
+
+    with monkeypatch.context() as m:
+        _forbid_filesystem(m)
+        assert loader.load_articles()[1] == 1
+        assert loader.load_projects()[1] == 1
+        assert loader.get_project_by_slug("one")["id"] == 1
+        assert search.search("one")[1] == 1
+
+    time.sleep(0.01)
+    _write_articles(content_dir / "articles.yml", ["A", "B"])
+    # Tant que le watcher n'a pas rescanné, l'ancien snapshot reste servi.
+    assert loader.load_articles()[1] == 1
+    assert w.refresh() is True
+    assert loader.load_articles()[1] == 2
+    assert w.refresh() is False
+
+
+def test_watched_article_detail_uses_recorded_mtime(monkeypatch, content_dir):
+    posts = content_dir.parent / "posts"
+    posts.mkdir()
+    post = posts / "hello.md"
+    post.write_text("---\ntitle: Hello\n---\n\nAvant **modif**.\n", encoding="utf-8")
+    w = watcher.ContentWatcher(mode="poll", interval=3600)
+    w.refresh()
+    assert "<strong>modif</strong>" in loader.get_article_by_slug("hello")["content_html"]
+
+    with monkeypatch.context() as m:
+        _forbid_filesystem(m)
+        m.setattr(os, "stat", lambda *_a, **_k: pytest.fail("os.stat sur le chemin de requête"))
+        assert "Avant" in loader.get_article_by_slug("hello")["content_html"]
+
+    # Modifié entre deux scans : HTML en cache servi jusqu'au rescan, puis relu entièrement.
+    time.sleep(0.01)
+    post.write_text("---\ntitle: Hello\nauthor: X\n---\n\nAprès.\n", encoding="utf-8")
+    assert "Avant" in loader.get_article_by_slug("hello")["content_html"]
+    blog_posts._HTML_CACHE["current"].clear()
+    assert loader.get_article_by_slug("hello")["content_html"] == "<p>Après.</p>"
+    assert w.refresh() is True
+    assert loader.get_article_by_slug("hello")["content_html"] == "<p>Après.</p>"
+
+
+def test_polling_thread_picks_up_changes(content_dir):
+    w = watcher.start_content_watcher("poll", interval=0.02)
+    assert w is not None and w.running
+    assert loader.load_articles()[1] == 1
+
+    time.sleep(0.01)
+    _write_articles(content_dir / "articles.yml", ["A", "B", "C"])
+    deadline = time.monotonic() + 5
+    while loader.load_articles()[1] != 3 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert loader.load_articles()[1] == 3
+    assert w.stats["changes"] >= 2
+
+    watcher.stop_content_watcher()
+    assert not w.running
+    assert loader._WATCHED["state"] is None
+
+
+def test_watch_mode_off_and_watchdog_fallback(monkeypatch, content_dir):
+    assert watcher.start_content_watcher("off") is None
+    monkeypatch.setattr(watcher, "Observer", None)
+    w = watcher.ContentWatcher(mode="watchdog")
+    assert w.mode == "poll"